@@ -0,0 +1,59 @@
+"""Renders/sec per email template: building the document through the
+EmailBuilder fluent API on every call (old behaviour) versus substituting
+into the precompiled template.
+
+Runs standalone, no services needed.
+"""
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.email.email_templates import TEMPLATES, SLOT_DEFAULTS, get_template_registry
+from src.core.config import get_settings
+
+RENDERS = 20000
+
+DATA = {
+    "name": "Ada Lovelace",
+    "code": "493021",
+    "book_title": "Notes on the Analytical Engine",
+    "due_date": "2025-06-01",
+    "timestamp": "2025-06-01 12:00",
+    "location": "London",
+    "ip_address": "203.0.113.7",
+    "device": "Firefox on Linux",
+    "old_email": "ada@example.com",
+    "new_email": "lovelace@example.com",
+    "verification_url": "https://example.com/verify?token=abc",
+    "reset_url": "https://example.com/reset?token=abc",
+    "reactivation_url": "https://example.com/reactivate?token=abc",
+    "unlock_url": "https://example.com/unlock?token=abc",
+    "secure_url": "https://example.com/secure",
+}
+
+
+def rate(render) -> float:
+    render()
+    start = time.perf_counter()
+    for _ in range(RENDERS):
+        render()
+    return RENDERS / (time.perf_counter() - start)
+
+
+def main():
+    settings = get_settings()
+    registry = get_template_registry()
+    print(f"{'template':<22} {'builder/s':>12} {'compiled/s':>12} {'speedup':>8}")
+    for name, build in TEMPLATES.items():
+        template = registry.get(name)
+        data = {slot: DATA.get(slot, SLOT_DEFAULTS.get(slot)) for slot in template.slots}
+        builder = rate(lambda: build(data, settings.company_name, settings.support_email))
+        compiled = rate(lambda: template.render(data))
+        print(f"{name:<22} {builder:12.0f} {compiled:12.0f} {compiled / builder:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
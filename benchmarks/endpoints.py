@@ -0,0 +1,305 @@
+"""Latency (p50/p99) and requests/sec of every API endpoint, driven
+in-process over ASGI against in-memory repositories and an in-memory
+notification queue.
+
+Runs standalone, no MongoDB or RabbitMQ needed, so it can run on every PR:
+
+    python benchmarks/endpoints.py --json results.json
+    python benchmarks/endpoints.py --baseline results.json
+
+With --baseline, endpoints whose p50 got more than --tolerance slower than
+in the baseline are listed and the script exits with status 1. Numbers
+cover routing, validation, services and rendering; storage is a dict, so
+they say nothing about query cost.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Nothing here talks to MongoDB: no transactions, no outbox, no caches
+os.environ["MONGO_TRANSACTIONS"] = "false"
+os.environ["NOTIFICATION_OUTBOX"] = "false"
+os.environ["LOOKUP_CACHE_MODE"] = "off"
+
+import httpx
+from bson import ObjectId
+from fastapi.routing import APIRoute
+
+from src.app import app
+from src.api.models import RentalStatus
+from src.api.modules.Book.InMemoryBookRepository import InMemoryBookRepository
+from src.api.modules.Person.InMemoryPersonRepository import InMemoryPersonRepository
+from src.api.modules.BookRental.InMemoryBookRentalRepository import (
+    InMemoryBookRentalRepository,
+)
+from src.core.container import ServiceContainer
+from src.core.message_brokers.memory import InMemoryQueue
+
+WARMUP = 10
+BULK_ITEMS = 100
+BATCH_ITEMS = 10
+
+unique = itertools.count()
+
+
+def book(isbn=True):
+    n = next(unique)
+    return {
+        "title": f"Book {n}",
+        "description": "A book about books, and the people who rent them.",
+        "isbn": f"978-{n:09d}" if isbn else None,
+        "author": "Ada Lovelace",
+        "genre": "Non-fiction",
+        "available_copies": 1_000_000,
+        "total_copies": 1_000_000,
+    }
+
+
+def person():
+    n = next(unique)
+    return {
+        "name": f"Person {n}",
+        "age": 36,
+        "email": f"person{n}@example.com",
+        "phone": "+44 20 7946 0000",
+        "address": "12 St James's Square, London",
+    }
+
+
+def seed(args):
+    """Fill the in-memory repositories and return them with the IDs the
+    requests use"""
+    books = InMemoryBookRepository()
+    persons = InMemoryPersonRepository()
+    rentals = InMemoryBookRentalRepository(books, persons)
+
+    books.collection.insert_many(
+        [{"_id": ObjectId(), **book()} for _ in range(args.books)]
+    )
+    persons.collection.insert_many(
+        [{"_id": ObjectId(), **person()} for _ in range(args.persons)]
+    )
+    book_ids = [str(book_id) for book_id in books.collection.documents]
+    person_ids = [str(person_id) for person_id in persons.collection.documents]
+
+    now = datetime.now()
+    returnable = args.requests + WARMUP
+    for i in range(args.rentals + returnable * (1 + BATCH_ITEMS)):
+        rentals.collection.insert(
+            {
+                "book_id": book_ids[i % len(book_ids)],
+                "person_id": person_ids[i % len(person_ids)],
+                "rental_date": now - timedelta(days=14),
+                # A tenth of the seeded rentals are overdue for the notification check
+                "due_date": now + timedelta(days=-1 if i % 10 == 0 else 14),
+                "return_date": None,
+                "status": RentalStatus.ACTIVE,
+            }
+        )
+    rental_ids = [str(rental_id) for rental_id in rentals.collection.documents]
+    return books, persons, rentals, {
+        "book": book_ids,
+        "person": person_ids,
+        "rental": rental_ids[: args.rentals],
+        "return": iter(rental_ids[args.rentals : args.rentals + returnable]),
+        "return_batch": iter(rental_ids[args.rentals + returnable :]),
+    }
+
+
+def cases(ids):
+    """(name, method, path, request kwargs) factories, one per endpoint"""
+    book_id = ids["book"][0]
+    person_id = ids["person"][0]
+    rental_id = ids["rental"][0]
+    due_date = (datetime.now() + timedelta(days=14)).isoformat()
+
+    def ndjson(items):
+        return "\n".join(json.dumps(item) for item in items)
+
+    return [
+        ("GET /", "GET", lambda: "/", dict),
+        ("GET /cache/stats", "GET", lambda: "/cache/stats", dict),
+        ("GET /books/", "GET", lambda: "/books/?limit=100", dict),
+        ("GET /books/{book_id}", "GET", lambda: f"/books/{book_id}", dict),
+        ("GET /books/{book_id}/availability", "GET", lambda: f"/books/{book_id}/availability", dict),
+        ("GET /books/available/list", "GET", lambda: "/books/available/list", dict),
+        ("GET /books/export", "GET", lambda: "/books/export", dict),
+        ("GET /persons/", "GET", lambda: "/persons/?limit=100", dict),
+        ("GET /persons/{person_id}", "GET", lambda: f"/persons/{person_id}", dict),
+        ("GET /persons/export", "GET", lambda: "/persons/export", dict),
+        ("GET /rentals/", "GET", lambda: "/rentals/?limit=100", dict),
+        ("GET /rentals/{rental_id}", "GET", lambda: f"/rentals/{rental_id}", dict),
+        ("GET /rentals/export", "GET", lambda: "/rentals/export", dict),
+        ("POST /books/", "POST", lambda: "/books/", lambda: {"json": book()}),
+        (
+            "POST /books/bulk",
+            "POST",
+            lambda: "/books/bulk",
+            lambda: {"json": [book(isbn=False) for _ in range(BULK_ITEMS)]},
+        ),
+        (
+            "POST /books/bulk/ndjson",
+            "POST",
+            lambda: "/books/bulk/ndjson",
+            lambda: {"content": ndjson(book(isbn=False) for _ in range(BULK_ITEMS))},
+        ),
+        ("POST /persons/", "POST", lambda: "/persons/", lambda: {"json": person()}),
+        (
+            "POST /persons/bulk",
+            "POST",
+            lambda: "/persons/bulk",
+            lambda: {"json": [person() for _ in range(BULK_ITEMS)]},
+        ),
+        (
+            "POST /persons/bulk/ndjson",
+            "POST",
+            lambda: "/persons/bulk/ndjson",
+            lambda: {"content": ndjson(person() for _ in range(BULK_ITEMS))},
+        ),
+        (
+            "POST /rentals/",
+            "POST",
+            lambda: "/rentals/",
+            lambda: {
+                "json": {"book_id": book_id, "person_id": person_id, "due_date": due_date}
+            },
+        ),
+        (
+            "POST /rentals/batch",
+            "POST",
+            lambda: "/rentals/batch",
+            lambda: {
+                "json": {
+                    "person_id": person_id,
+                    "book_ids": ids["book"][:BATCH_ITEMS],
+                    "due_date": due_date,
+                }
+            },
+        ),
+        (
+            "PUT /rentals/{rental_id}/return",
+            "PUT",
+            lambda: f"/rentals/{next(ids['return'])}/return",
+            dict,
+        ),
+        (
+            "PUT /rentals/return/batch",
+            "PUT",
+            lambda: "/rentals/return/batch",
+            lambda: {
+                "json": {
+                    "rental_ids": list(itertools.islice(ids["return_batch"], BATCH_ITEMS))
+                }
+            },
+        ),
+        ("POST /rentals/notifications/check", "POST", lambda: "/rentals/notifications/check", dict),
+    ]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure(client, method, path, kwargs, requests):
+    for _ in range(WARMUP):
+        (await client.request(method, path(), **kwargs())).raise_for_status()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        url, request_kwargs = path(), kwargs()
+        sent = time.perf_counter()
+        response = await client.request(method, url, **request_kwargs)
+        latencies.append(time.perf_counter() - sent)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return {
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "rps": requests / elapsed,
+    }
+
+
+def uncovered_routes(names):
+    routes = {
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    return sorted(routes - set(names))
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and result["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append((name, before["p50_ms"], result["p50_ms"]))
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--persons", type=int, default=1000)
+    parser.add_argument("--rentals", type=int, default=5000)
+    parser.add_argument("--endpoint", action="append", help="Only run endpoints containing this text")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Results file to compare p50 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    books, persons, rentals, ids = seed(args)
+    notification_queue = InMemoryQueue("book_rental_notifications")
+    app.state.container = ServiceContainer(books, persons, rentals, notification_queue)
+
+    selected = [
+        case
+        for case in cases(ids)
+        if not args.endpoint or any(text in case[0] for text in args.endpoint)
+    ]
+    missing = uncovered_routes(name for name, *_ in cases(ids))
+    if missing:
+        print(f"Endpoints not covered: {', '.join(missing)}\n")
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':<36} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+        for name, method, path, kwargs in selected:
+            result = await measure(client, method, path, kwargs, args.requests)
+            results[name] = result
+            print(
+                f"{name:<36} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                f"{result['rps']:>9.1f}"
+            )
+    print(f"\n{notification_queue.published} notifications published")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""Compare the Beanie read path with the projected raw read path for a
+1000-row page of books.
+
+Needs a running MongoDB (MONGO_URI). Data is seeded into a throwaway
+database which is dropped afterwards. With --mongomock it runs against
+mongomock-motor instead (pip install mongomock-motor), which has no network
+or BSON decoding, so only the Python-side cost of each path is measured.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ["MONGO_DB_NAME"] = "book-rental-bench"
+
+from pymongo import ASCENDING
+
+from src.core.db import init_db, get_client
+from src.api.models import BookModel
+from src.api.modules.Book.BookDtos import BookResponseDto
+from src.api.modules.Book.BookService import BookService
+
+PAGE_SIZE = 1000
+ROUNDS = 50
+
+
+async def beanie_page():
+    books = await BookModel.find().sort([("_id", ASCENDING)]).limit(PAGE_SIZE).to_list()
+    return [
+        BookResponseDto(
+            id=str(book.id),
+            title=book.title,
+            description=book.description,
+            isbn=book.isbn,
+            author=book.author,
+            genre=book.genre,
+            available_copies=book.available_copies,
+            total_copies=book.total_copies,
+        )
+        for book in books
+    ]
+
+
+async def measure(name, page):
+    await page()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        rows = await page()
+    elapsed = time.perf_counter() - start
+    per_row = elapsed / (ROUNDS * len(rows)) * 1e6
+    print(f"{name:<12} {elapsed / ROUNDS * 1e3:8.2f} ms/page  {per_row:6.2f} us/row")
+
+
+async def init_mongomock():
+    from beanie import init_beanie
+    from mongomock_motor import AsyncMongoMockClient
+
+    await init_beanie(
+        database=AsyncMongoMockClient()[os.environ["MONGO_DB_NAME"]],
+        document_models=[BookModel],
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongomock", action="store_true", help="Run without MongoDB")
+    args = parser.parse_args()
+
+    if args.mongomock:
+        await init_mongomock()
+    else:
+        await init_db()
+    await BookModel.get_motor_collection().delete_many({})
+    await BookModel.get_motor_collection().insert_many(
+        [
+            {
+                "title": f"Book {i}",
+                "description": "A description long enough to look like real data " * 3,
+                "isbn": f"isbn-{i}",
+                "author": f"Author {i % 100}",
+                "genre": "Fiction",
+                "available_copies": 1,
+                "total_copies": 1,
+            }
+            for i in range(PAGE_SIZE)
+        ]
+    )
+
+    service = BookService()
+    try:
+        await measure("beanie", beanie_page)
+        await measure("projected", lambda: service.get_all_books(0, PAGE_SIZE))
+    finally:
+        if not args.mongomock:
+            await get_client().drop_database(os.environ["MONGO_DB_NAME"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""Emails/sec through MailgunClient against a local fake Mailgun server,
+with a new httpx.AsyncClient per email (old behaviour) and with the pooled
+keep-alive client.
+
+Runs standalone: the fake server listens on 127.0.0.1 and answers every
+request with 200 after an optional delay (--latency, seconds).
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.email.mailgun import MailgunClient
+
+BODY = b'{"id":"<fake>","message":"Queued"}'
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: %d\r\n"
+    b"\r\n" % len(BODY)
+) + BODY
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, latency: float):
+    """Minimal HTTP/1.1 keep-alive responder"""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            if length:
+                await reader.readexactly(length)
+            if latency:
+                await asyncio.sleep(latency)
+            writer.write(RESPONSE)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+class UnpooledMailgunClient(MailgunClient):
+    """Opens a fresh client (and connection) for every email"""
+
+    async def send_email(self, *args, **kwargs) -> bool:
+        # MailgunClient.send_email reads self.client before its first await,
+        # so every concurrent call sends through the client set here
+        client = self._client = httpx.AsyncClient(
+            auth=("api", self.api_key), timeout=self._timeout, limits=self._limits
+        )
+        try:
+            return await super().send_email(*args, **kwargs)
+        finally:
+            await client.aclose()
+
+
+async def measure(name: str, mailgun: MailgunClient, emails: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(i: int):
+        async with semaphore:
+            return await mailgun.send_email(
+                to_email=f"person{i}@example.com",
+                subject="Book overdue",
+                html_content="<p>Please return the book.</p>",
+            )
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(send(i) for i in range(emails)))
+    elapsed = time.perf_counter() - start
+    await mailgun.aclose()
+    print(
+        f"{name:<10} {emails / elapsed:10.0f} emails/s"
+        f" ({sum(results)}/{emails} accepted)"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = await asyncio.start_server(
+        lambda r, w: handle(r, w, args.latency), "127.0.0.1", 0
+    )
+    port = server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}/v3"
+
+    async with server:
+        for name, client_class in (
+            ("unpooled", UnpooledMailgunClient),
+            ("pooled", MailgunClient),
+        ):
+            await measure(
+                name,
+                client_class("key", "example.com", base_url=base_url, http2=False),
+                args.emails,
+                args.concurrency,
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""Encode/decode throughput and body size of queue messages: stdlib json
+(old behaviour) against the json (orjson) and msgpack codecs, for an
+overdue notification, a template-based email message and a pre-rendered
+html email message.
+
+Runs standalone, no services needed. msgpack is skipped when the package
+isn't installed.
+"""
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.message_brokers.codecs import CODECS, get_codec, msgpack
+from src.core.email.email_templates import get_template_registry
+
+MESSAGES = 100000
+
+due_date = datetime(2025, 6, 1, 12, 0)
+TEMPLATE_DATA = {
+    "name": "Ada Lovelace",
+    "book_title": "Notes on the Analytical Engine",
+    "due_date": due_date.strftime("%Y-%m-%d"),
+}
+PAYLOADS = {
+    "notification": {
+        "type": "overdue",
+        "rental_id": "665f1c2e8b3e4a0012345678",
+        "book_title": "Notes on the Analytical Engine",
+        "person_name": "Ada Lovelace",
+        "person_email": "ada@example.com",
+        "due_date": due_date.isoformat(),
+        "rental_date": (due_date - timedelta(days=14)).isoformat(),
+        "timestamp": datetime.now().isoformat(),
+    },
+    "email (template)": {
+        "schema_version": 2,
+        "to_email": "ada@example.com",
+        "subject": "Book overdue",
+        "template_name": "book_overdue",
+        "template_data": TEMPLATE_DATA,
+        "from_email": "library@example.com",
+        "batch": True,
+    },
+    "email (html)": {
+        "to_email": "ada@example.com",
+        "subject": "Book overdue",
+        "html_content": get_template_registry().render("book_overdue", TEMPLATE_DATA),
+        "from_email": "library@example.com",
+    },
+}
+
+
+class StdlibJson:
+    """What the queues did before codecs"""
+
+    def encode(self, message):
+        return json.dumps(message).encode()
+
+    def decode(self, body):
+        return json.loads(body)
+
+
+def rate(fn, arg) -> float:
+    fn(arg)
+    start = time.perf_counter()
+    for _ in range(MESSAGES):
+        fn(arg)
+    return MESSAGES / (time.perf_counter() - start)
+
+
+def main():
+    codecs = {"stdlib json": StdlibJson()}
+    for name in CODECS:
+        if name == "msgpack" and msgpack is None:
+            print("msgpack not installed, skipping the msgpack codec\n")
+            continue
+        codecs[f"{name} codec"] = get_codec(name)
+
+    print(f"{'payload':<18} {'codec':<14} {'bytes':>7} {'encode/s':>12} {'decode/s':>12}")
+    for payload_name, payload in PAYLOADS.items():
+        for codec_name, codec in codecs.items():
+            body = codec.encode(payload)
+            assert codec.decode(body) == payload
+            encode = rate(codec.encode, payload)
+            decode = rate(codec.decode, body)
+            print(
+                f"{payload_name:<18} {codec_name:<14} {len(body):>7} "
+                f"{encode:>12,.0f} {decode:>12,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Mark N overdue rentals (default 1M) as overdue two ways: one update with
+every id in a single $in (old behaviour) and chunked $in updates, as
+mark_as_overdue does.
+
+Needs a running MongoDB (MONGO_URI). Data is seeded into a throwaway
+database which is dropped afterwards.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ["MONGO_DB_NAME"] = "book-rental-bench"
+
+from beanie import PydanticObjectId
+from bson.errors import InvalidDocument
+from pymongo.errors import PyMongoError
+
+from src.core.db import init_db, get_client
+from src.api.models import BookRentalModel, RentalStatus
+from src.api.modules.BookRental.BookRentalRepository import BookRentalRepository
+
+SEED_BATCH = 10000
+
+
+async def single_in(rental_ids):
+    result = await BookRentalModel.get_motor_collection().update_many(
+        {
+            "_id": {"$in": [PydanticObjectId(rental_id) for rental_id in rental_ids]},
+            "status": RentalStatus.ACTIVE,
+        },
+        {"$set": {"status": RentalStatus.OVERDUE}},
+    )
+    return result.modified_count
+
+
+async def measure(name, mark):
+    await BookRentalModel.get_motor_collection().update_many(
+        {}, {"$set": {"status": RentalStatus.ACTIVE}}
+    )
+    start = time.perf_counter()
+    try:
+        modified = await mark()
+    except (PyMongoError, InvalidDocument) as e:
+        print(f"{name:<14} failed: {type(e).__name__}: {str(e)[:80]}")
+        return
+    elapsed = time.perf_counter() - start
+    print(f"{name:<14} {elapsed:8.2f} s  {modified} marked")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rentals", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    await init_db()
+    collection = BookRentalModel.get_motor_collection()
+    await collection.delete_many({})
+    due_date = datetime.now() - timedelta(days=1)
+    for start in range(0, args.rentals, SEED_BATCH):
+        await collection.insert_many(
+            [
+                {
+                    "book_id": str(PydanticObjectId()),
+                    "person_id": str(PydanticObjectId()),
+                    "rental_date": due_date - timedelta(days=14),
+                    "due_date": due_date - timedelta(seconds=i),
+                    "return_date": None,
+                    "status": RentalStatus.ACTIVE,
+                }
+                for i in range(start, min(start + SEED_BATCH, args.rentals))
+            ],
+            ordered=False,
+        )
+    rental_ids = [str(document["_id"]) async for document in collection.find({}, {"_id": 1})]
+
+    repository = BookRentalRepository()
+    try:
+        await measure("single $in", lambda: single_in(rental_ids))
+        await measure("chunked $in", lambda: repository.mark_as_overdue(rental_ids))
+    finally:
+        await get_client().drop_database(os.environ["MONGO_DB_NAME"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""Requests/sec for GET /books/?limit=1000 and GET /rentals/?limit=1000 with
+FastAPI's default rendering (old behaviour: JSONResponse, the DTOs dumped
+and validated against response_model again) and with DtoRoute and
+ORJSONResponse.
+
+Runs standalone: requests go through the app in-process over ASGI, and the
+services are replaced by stubs returning prebuilt DTOs, so only routing
+and rendering are measured.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.app import app as fast_app
+from src.api.modules.Book.BookRouter import router as book_router
+from src.api.modules.BookRental.BookRentalRouter import router as rental_router
+from src.api.modules.Book.BookDtos import BookResponseDto
+from src.api.modules.BookRental.BookRentalDtos import BookRentalResponseDto
+from src.api.models.BookRental import RentalStatus
+
+PAGE = 1000
+now = datetime.now()
+BOOKS = [
+    BookResponseDto(
+        id=f"{i:024x}",
+        title=f"Book {i}",
+        description="A book about books, and the people who rent them.",
+        isbn=f"978-{i:09d}",
+        author="Ada Lovelace",
+        genre="Non-fiction",
+        available_copies=3,
+        total_copies=5,
+    )
+    for i in range(PAGE)
+]
+RENTALS = [
+    BookRentalResponseDto(
+        id=f"{i:024x}",
+        book_id=f"{i:024x}",
+        person_id=f"{i:024x}",
+        rental_date=now,
+        due_date=now + timedelta(days=14),
+        status=RentalStatus.ACTIVE,
+    )
+    for i in range(PAGE)
+]
+
+
+class StubBookService:
+    async def get_all_books(self, skip, limit, cursor):
+        return BOOKS[:limit]
+
+
+class StubRentalService:
+    async def get_all_rentals(self, skip, limit, cursor, order_by):
+        return RENTALS[:limit]
+
+
+def default_app() -> FastAPI:
+    """The same routes as plain APIRoutes rendered with JSONResponse"""
+    app = FastAPI(default_response_class=JSONResponse)
+    for source in (book_router, rental_router):
+        router = APIRouter()
+        for route in source.routes:
+            router.add_api_route(
+                route.path,
+                getattr(route.endpoint, "__wrapped__", route.endpoint),
+                methods=list(route.methods),
+                response_model=route.response_model,
+                route_class_override=APIRoute,
+            )
+        app.include_router(router)
+    return app
+
+
+async def measure(app: FastAPI, name: str, url: str, requests: int) -> bytes:
+    app.state.container = SimpleNamespace(
+        book_service=StubBookService(), rental_service=StubRentalService()
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        body = (await client.get(url)).content
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get(url)
+            response.raise_for_status()
+        elapsed = time.perf_counter() - start
+    print(f"{name:<10} {url:<22} {requests / elapsed:8.1f} req/s")
+    return body
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    before = default_app()
+    for url in (f"/books/?limit={PAGE}", f"/rentals/?limit={PAGE}"):
+        old = await measure(before, "default", url, args.requests)
+        new = await measure(fast_app, "DtoRoute", url, args.requests)
+        assert old == new, f"{url} renders differently"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
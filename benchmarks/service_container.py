@@ -0,0 +1,109 @@
+"""Per-request latency (p50/p99) and requests/sec of the rental endpoints
+when the rental service is built for every request (old behaviour: a new
+service and notification queue per request) and when it is read from the
+app-scoped ServiceContainer.
+
+Requests go through the app in-process over ASGI against the in-memory
+repositories, as in benchmarks/endpoints.py. By default the queues are
+in-memory, so the numbers show the construction overhead alone; with
+--rabbitmq every per-request service gets a blocking RabbitMQQueue, which
+declares its queue, as before (needs a running RabbitMQ, RABBITMQ_URL).
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.endpoints import WARMUP, measure, seed
+
+import httpx
+
+from src.app import app
+from src.api.modules.BookRental.BookRentalRouter import get_rental_service
+from src.api.modules.BookRental.BookRentalService import BookRentalService
+from src.core.container import ServiceContainer
+from src.core.message_brokers.memory import InMemoryQueue
+from src.core.outbox import OutboxRepository
+
+QUEUE = "book_rental_notifications"
+
+
+def cases(ids):
+    book_id = ids["book"][0]
+    person_id = ids["person"][0]
+    rental_id = ids["rental"][0]
+    due_date = (datetime.now() + timedelta(days=14)).isoformat()
+    return [
+        ("GET /rentals/{rental_id}", "GET", lambda: f"/rentals/{rental_id}", dict),
+        (
+            "POST /rentals/",
+            "POST",
+            lambda: "/rentals/",
+            lambda: {
+                "json": {"book_id": book_id, "person_id": person_id, "due_date": due_date}
+            },
+        ),
+        (
+            "PUT /rentals/{rental_id}/return",
+            "PUT",
+            lambda: f"/rentals/{next(ids['return'])}/return",
+            dict,
+        ),
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=1000, help="Measured requests per endpoint and mode")
+    parser.add_argument("--rabbitmq", action="store_true", help="Use RabbitMQ queues")
+    args = parser.parse_args()
+
+    # seed() sets aside enough rentals to return for one run (requests plus
+    # warmup); there is a run per mode
+    books, persons, rentals, ids = seed(
+        argparse.Namespace(
+            books=100, persons=100, rentals=100, requests=2 * args.requests + WARMUP
+        )
+    )
+
+    if args.rabbitmq:
+        from src.core.message_brokers.rabbitmq import RabbitMQQueue
+
+        new_queue = lambda: RabbitMQQueue(QUEUE)
+    else:
+        new_queue = lambda: InMemoryQueue(QUEUE)
+
+    container = ServiceContainer(books, persons, rentals, new_queue())
+    app.state.container = container
+
+    def per_request_service() -> BookRentalService:
+        return BookRentalService(
+            rentals, books, persons, notification_queue=new_queue(), outbox=OutboxRepository()
+        )
+
+    modes = [("per-request", per_request_service), ("container", None)]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':<32} {'mode':<12} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+        for name, method, path, kwargs in cases(ids):
+            for mode, override in modes:
+                if override:
+                    app.dependency_overrides[get_rental_service] = override
+                else:
+                    app.dependency_overrides.pop(get_rental_service, None)
+                result = await measure(client, method, path, kwargs, args.requests)
+                print(
+                    f"{name:<32} {mode:<12} {result['p50_ms']:>9.3f} "
+                    f"{result['p99_ms']:>9.3f} {result['rps']:>9.1f}"
+                )
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
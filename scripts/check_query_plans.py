@@ -0,0 +1,169 @@
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.db import init_db
+from bson import ObjectId
+
+from src.api.models import (
+    BookModel,
+    BookRentalModel,
+    LeaseModel,
+    OutboxModel,
+    PersonModel,
+    RentalStatus,
+)
+from src.api.modules.Book.BookRepository import BookRepository
+from src.api.modules.BookRental.BookRentalRepository import BookRentalRepository
+from src.api.modules.Person.PersonRepository import PersonRepository
+from src.core.leader_election import LeaderElector
+from src.core.outbox import OutboxRepository
+
+
+NOW = datetime.now()
+ID = str(ObjectId())
+
+books = BookRepository()
+persons = PersonRepository()
+rentals = BookRentalRepository()
+outbox = OutboxRepository()
+elector = LeaderElector("check_query_plans")
+
+
+def find(query, sort=None):
+    command = {"find": None, "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+    return command
+
+
+def aggregate(pipeline):
+    """Only the plan of the leading $match is checked; the $lookup stages
+    match on _id"""
+    return {"aggregate": None, "pipeline": pipeline, "cursor": {}}
+
+
+def update(query, update, multi=False):
+    return {"update": None, "updates": [{"q": query, "u": update, "multi": multi}]}
+
+
+def find_and_modify(query, update, upsert=False):
+    return {"findAndModify": None, "query": query, "update": update, "upsert": upsert}
+
+
+# Queries and updates issued by the repositories, built with the same
+# helpers they use. Add new queries here. Unfiltered reads (e.g. exporting
+# every rental) scan the collection by design and are left out.
+QUERIES = [
+    ("BookRepository.get_all", BookModel, find(*books._page_query(ID))),
+    ("BookRepository.get_available_books", BookModel, find(books.AVAILABLE)),
+    ("PersonRepository.get_all", PersonModel, find(*persons._page_query(ID))),
+    ("BookRentalRepository.get_all", BookRentalModel, find(*rentals._page_query("id", ID, None))),
+    (
+        "BookRentalRepository.get_all(order_by=due_date)",
+        BookRentalModel,
+        find(*rentals._page_query("due_date", ID, NOW)),
+    ),
+    ("BookRentalRepository.get_by_person_id", BookRentalModel, find({"person_id": ID})),
+    ("BookRentalRepository.get_by_book_id", BookRentalModel, find({"book_id": ID})),
+    ("BookRentalRepository.get_active_rentals", BookRentalModel, find({"status": RentalStatus.ACTIVE})),
+    ("BookRentalRepository.get_overdue_rentals", BookRentalModel, find({"status": RentalStatus.OVERDUE})),
+    ("BookRentalRepository.get_rentals_overdue", BookRentalModel, find(rentals._overdue_query(NOW))),
+    (
+        "BookRentalRepository.stream_raw(status)",
+        BookRentalModel,
+        find(rentals._stream_query(RentalStatus.ACTIVE, None, None)),
+    ),
+    (
+        "BookRentalRepository.stream_raw(due_after, due_before)",
+        BookRentalModel,
+        find(rentals._stream_query(None, NOW, NOW)),
+    ),
+    (
+        "BookRentalRepository.stream_raw(status, due_after, due_before)",
+        BookRentalModel,
+        find(rentals._stream_query(RentalStatus.ACTIVE, NOW, NOW)),
+    ),
+    (
+        "BookRentalRepository.iter_due_between",
+        BookRentalModel,
+        find(*rentals._due_between_query(NOW, NOW)),
+    ),
+    (
+        "BookRentalRepository.iter_created_after",
+        BookRentalModel,
+        find(*rentals._created_after_query(ObjectId(), NOW)),
+    ),
+    (
+        "BookRentalRepository.iter_overdue_details",
+        BookRentalModel,
+        aggregate(rentals._overdue_details_pipeline(NOW, None)),
+    ),
+    (
+        "BookRentalRepository.iter_overdue_details(rental_ids)",
+        BookRentalModel,
+        aggregate(rentals._overdue_details_pipeline(NOW, [ID])),
+    ),
+    (
+        "BookRentalRepository.mark_as_overdue",
+        BookRentalModel,
+        update(*rentals._mark_overdue_update([ID]), multi=True),
+    ),
+    ("OutboxRepository.get_pending", OutboxModel, find(outbox.PENDING, outbox.OLDEST_FIRST)),
+    (
+        "OutboxRepository.mark_sent",
+        OutboxModel,
+        update(*outbox._mark_sent_update([ID]), multi=True),
+    ),
+    (
+        "LeaderElector.try_acquire",
+        LeaseModel,
+        find_and_modify(*elector._acquire_update(NOW, NOW), upsert=True),
+    ),
+]
+
+
+def _stages(explain) -> list[str]:
+    """Collect the stage names of the winning plans in an explain output"""
+    stages = []
+    if isinstance(explain, dict):
+        if isinstance(explain.get("stage"), str):
+            stages.append(explain["stage"])
+        for key, value in explain.items():
+            if key != "rejectedPlans":
+                stages.extend(_stages(value))
+    elif isinstance(explain, list):
+        for item in explain:
+            stages.extend(_stages(item))
+    return stages
+
+
+async def main() -> int:
+    await init_db()
+
+    failures = 0
+    for name, model, command in QUERIES:
+        collection = model.get_motor_collection()
+        command = {
+            key: collection.name if value is None else value
+            for key, value in command.items()
+        }
+        explain = await collection.database.command(
+            {"explain": command, "verbosity": "queryPlanner"}
+        )
+        stages = _stages(explain)
+        if "COLLSCAN" in stages:
+            failures += 1
+            print(f"FAIL {name}: {' <- '.join(stages)}")
+        else:
+            print(f"ok   {name}: {' <- '.join(stages)}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,110 @@
+"""Check that the unique indexes declared on the models can be built.
+
+init_beanie builds every index in the models' Settings.indexes when the API
+or a worker starts, and a unique index cannot be built while its collection
+holds duplicate keys: a database filled before the index was added would
+stop the app from starting. Run this against the database before deploying:
+
+    python scripts/check_unique_indexes.py           # list duplicates
+    python scripts/check_unique_indexes.py --create  # then build the indexes
+
+Duplicates are listed with their ids and have to be merged by hand (rentals
+point at books and persons by id, so deleting one would orphan its rentals).
+--create only builds the indexes once there are none left.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import motor.motor_asyncio
+
+from src.api.models import (
+    BookModel,
+    BookRentalModel,
+    LeaseModel,
+    OutboxModel,
+    PersonModel,
+    StreamCheckpointModel,
+)
+from src.core.config import get_settings
+
+settings = get_settings()
+
+MODELS = [
+    BookModel,
+    PersonModel,
+    BookRentalModel,
+    LeaseModel,
+    StreamCheckpointModel,
+    OutboxModel,
+]
+
+
+def unique_indexes():
+    """(collection name, index document) of every unique index on the models"""
+    for model in MODELS:
+        for index in getattr(model.Settings, "indexes", []):
+            document = index.document
+            if document.get("unique"):
+                yield model.Settings.name, index, document
+
+
+async def find_duplicates(collection, document) -> list:
+    """Groups of documents sharing a key of the index, with their ids"""
+    fields = list(document["key"])
+    pipeline = [
+        {"$match": document.get("partialFilterExpression", {})},
+        {
+            "$group": {
+                "_id": {field: f"${field}" for field in fields},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1},
+            }
+        },
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    return await collection.aggregate(pipeline).to_list(length=None)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--create", action="store_true", help="Build the indexes when no duplicates are left")
+    args = parser.parse_args()
+
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongo_uri)
+    database = client[settings.mongo_db_name]
+
+    failures = 0
+    for collection_name, index, document in unique_indexes():
+        collection = database[collection_name]
+        duplicates = await find_duplicates(collection, document)
+        if not duplicates:
+            print(f"ok   {collection_name}.{document['name']}")
+            continue
+
+        failures += 1
+        print(f"FAIL {collection_name}.{document['name']}: {len(duplicates)} duplicated keys")
+        for group in duplicates:
+            ids = ", ".join(str(_id) for _id in group["ids"])
+            print(f"     {group['_id']}: {ids}")
+
+    if args.create:
+        if failures:
+            print("Not building the indexes: remove the duplicates first")
+        else:
+            for collection_name, index, document in unique_indexes():
+                await database[collection_name].create_indexes([index])
+                print(f"built {collection_name}.{document['name']}")
+
+    client.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
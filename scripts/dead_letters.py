@@ -0,0 +1,105 @@
+"""Inspect or replay messages that ended up in a queue's dead-letter queue.
+
+    python scripts/dead_letters.py inspect events_email_queue --limit 20
+    python scripts/dead_letters.py replay events_email_queue --limit 100
+
+inspect prints messages from <queue>.dead and leaves them there; replay
+moves them back onto <queue> with a fresh attempt counter.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pika
+
+from src.core.message_brokers.codecs import codec_for_content_type
+from src.core.message_brokers.rabbitmq import RabbitMQConnection
+from src.core.message_brokers.rabbitmq.retry import (
+    ATTEMPT_HEADER,
+    ERROR_HEADER,
+    ORIGIN_HEADER,
+    dead_letter_queue_name,
+)
+
+
+def inspect(channel, queue_name: str, limit: int) -> None:
+    dead_letters = dead_letter_queue_name(queue_name)
+    count = channel.queue_declare(queue=dead_letters, durable=True, passive=True).method.message_count
+    print(f"{dead_letters}: {count} messages")
+
+    last_tag = None
+    for _ in range(limit):
+        method, properties, body = channel.basic_get(queue=dead_letters, auto_ack=False)
+        if method is None:
+            break
+        last_tag = method.delivery_tag
+        headers = properties.headers or {}
+        print(f"--- attempts: {headers.get(ATTEMPT_HEADER, 0)}  error: {headers.get(ERROR_HEADER, '')}")
+        try:
+            message = codec_for_content_type(properties.content_type).decode(body)
+            print(json.dumps(message, indent=2, default=str))
+        except (ValueError, RuntimeError):
+            print(body)
+
+    # Hand everything back so the messages stay in the dead-letter queue
+    if last_tag is not None:
+        channel.basic_nack(delivery_tag=last_tag, multiple=True, requeue=True)
+
+
+def replay(channel, queue_name: str, limit: int) -> None:
+    dead_letters = dead_letter_queue_name(queue_name)
+    channel.confirm_delivery()
+
+    replayed = 0
+    while replayed < limit:
+        method, properties, body = channel.basic_get(queue=dead_letters, auto_ack=False)
+        if method is None:
+            break
+        headers = {
+            key: value
+            for key, value in (properties.headers or {}).items()
+            if key not in (ATTEMPT_HEADER, ERROR_HEADER, ORIGIN_HEADER)
+        }
+        channel.basic_publish(
+            exchange="",
+            routing_key=queue_name,
+            body=body,
+            properties=pika.BasicProperties(
+                delivery_mode=2,
+                content_type=properties.content_type,
+                headers=headers,
+            ),
+        )
+        channel.basic_ack(delivery_tag=method.delivery_tag)
+        replayed += 1
+
+    print(f"Replayed {replayed} messages from {dead_letters} to {queue_name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("command", choices=["inspect", "replay"])
+    parser.add_argument("queue", help="Name of the original queue, e.g. events_email_queue")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    connection = RabbitMQConnection()
+    try:
+        # A channel of our own, so the nack in inspect doesn't touch anything else
+        channel = connection.connection.channel()
+        if args.command == "inspect":
+            inspect(channel, args.queue, args.limit)
+        else:
+            replay(channel, args.queue, args.limit)
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
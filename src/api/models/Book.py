@@ -1,4 +1,5 @@
 from beanie import Document
+from pymongo import ASCENDING, IndexModel
 from typing import Optional
 
 
@@ -13,3 +14,21 @@ class BookModel(Document):
 
     class Settings:
         name = "books"
+        # Built by init_beanie at startup, which fails on duplicates: run
+        # scripts/check_unique_indexes.py against existing data before deploying
+        indexes = [
+            IndexModel(
+                [("isbn", ASCENDING)],
+                name="isbn_unique",
+                unique=True,
+                # Books without an ISBN must not collide on null
+                partialFilterExpression={"isbn": {"$type": "string"}},
+                background=True,
+            ),
+            IndexModel(
+                [("available_copies", ASCENDING)],
+                name="available_copies_positive",
+                partialFilterExpression={"available_copies": {"$gt": 0}},
+                background=True,
+            ),
+        ]
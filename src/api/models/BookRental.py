@@ -1,5 +1,6 @@
 from beanie import Document
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -18,4 +19,18 @@ class BookRentalModel(Document):
     status: RentalStatus = RentalStatus.ACTIVE
     
     class Settings:
-        name = "book_rentals"
\ No newline at end of file
+        name = "book_rentals"
+        indexes = [
+            IndexModel(
+                [("status", ASCENDING), ("due_date", ASCENDING)],
+                name="status_due_date",
+                background=True,
+            ),
+            IndexModel([("person_id", ASCENDING)], name="person_id", background=True),
+            IndexModel([("book_id", ASCENDING)], name="book_id", background=True),
+            IndexModel(
+                [("due_date", ASCENDING), ("_id", ASCENDING)],
+                name="due_date_id",
+                background=True,
+            ),
+        ]
@@ -0,0 +1,24 @@
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+from datetime import datetime
+
+
+class LeaseModel(Document):
+    """A named lease held by one process until expires_at"""
+
+    id: str
+    owner: str
+    expires_at: datetime
+
+    class Settings:
+        name = "leases"
+        indexes = [
+            # Mongo removes leases nobody renewed; the election itself only
+            # relies on expires_at, so a late TTL sweep is harmless
+            IndexModel(
+                [("expires_at", ASCENDING)],
+                name="expires_at_ttl",
+                expireAfterSeconds=0,
+                background=True,
+            ),
+        ]
@@ -0,0 +1,43 @@
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+from datetime import datetime
+from typing import Any, Dict, Optional
+from enum import Enum
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+
+
+class OutboxModel(Document):
+    """A message waiting to be (or already) published to `queue`.
+
+    The id is chosen by the writer so writing the same message twice is a
+    no-op.
+    """
+
+    id: str
+    queue: str
+    payload: Dict[str, Any]
+    status: OutboxStatus = OutboxStatus.PENDING
+    created_at: datetime = Field(default_factory=datetime.now)
+    sent_at: Optional[datetime] = None
+
+    class Settings:
+        name = "outbox"
+        indexes = [
+            IndexModel(
+                [("status", ASCENDING), ("created_at", ASCENDING)],
+                name="status_created_at",
+                background=True,
+            ),
+            # Sent messages are kept a week for troubleshooting
+            IndexModel(
+                [("sent_at", ASCENDING)],
+                name="sent_at_ttl",
+                expireAfterSeconds=7 * 24 * 3600,
+                background=True,
+            ),
+        ]
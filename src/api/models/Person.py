@@ -1,5 +1,6 @@
 from beanie import Document
 from pydantic import EmailStr
+from pymongo import ASCENDING, IndexModel
 from typing import Optional
 
 class PersonModel(Document):
@@ -11,3 +12,13 @@ class PersonModel(Document):
     
     class Settings:
         name = "persons"
+        # Built by init_beanie at startup, which fails on duplicates: run
+        # scripts/check_unique_indexes.py against existing data before deploying
+        indexes = [
+            IndexModel(
+                [("email", ASCENDING)],
+                name="email_unique",
+                unique=True,
+                background=True,
+            ),
+        ]
@@ -0,0 +1,14 @@
+from beanie import Document
+from datetime import datetime
+from typing import Any, Dict
+
+
+class StreamCheckpointModel(Document):
+    """Last processed resume token of a named change stream"""
+
+    id: str
+    resume_token: Dict[str, Any]
+    updated_at: datetime
+
+    class Settings:
+        name = "stream_checkpoints"
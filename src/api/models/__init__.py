@@ -1,5 +1,17 @@
 from .Book import BookModel
 from .Person import PersonModel
 from .BookRental import BookRentalModel, RentalStatus
+from .Lease import LeaseModel
+from .StreamCheckpoint import StreamCheckpointModel
+from .Outbox import OutboxModel, OutboxStatus
 
-__all__ = ["BookModel", "PersonModel", "BookRentalModel", "RentalStatus"]
\ No newline at end of file
+__all__ = [
+    "BookModel",
+    "PersonModel",
+    "BookRentalModel",
+    "RentalStatus",
+    "LeaseModel",
+    "StreamCheckpointModel",
+    "OutboxModel",
+    "OutboxStatus",
+]
\ No newline at end of file
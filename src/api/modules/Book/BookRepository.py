@@ -1,36 +1,174 @@
-from typing import List, Optional
-from beanie import PydanticObjectId
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from beanie import PydanticObjectId, UpdateResponse
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
 from src.api.models.Book import BookModel
 from src.api.modules.Book.BookDtos import BookCreateDto
+from src.api.modules.Book.BookRepositoryABC import BookRepositoryABC
+from src.core.bulk import guarded_update_many
 
-class BookRepository:
+class BookRepository(BookRepositoryABC):
+
+    AVAILABLE = {"available_copies": {"$gt": 0}}
     
     async def create(self, book_data: BookCreateDto) -> BookModel:
         """Create a new book"""
         book = BookModel(**book_data.model_dump())
         return await book.insert()
     
+    async def insert_many(self, documents: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Insert validated raw documents unordered.
+
+        Returns the error message of every document that failed, by position.
+        """
+        try:
+            await BookModel.get_motor_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            return {
+                error["index"]: error["errmsg"] for error in e.details["writeErrors"]
+            }
+        return {}
+
     async def get_by_id(self, book_id: str) -> Optional[BookModel]:
         """Get a book by ID"""
         return await BookModel.get(PydanticObjectId(book_id))
     
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[BookModel]:
-        """Get all books with pagination"""
-        return await BookModel.find().skip(skip).limit(limit).to_list()
+    async def get_summary(self, book_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the immutable fields (title, author) of a book"""
+        return await BookModel.get_motor_collection().find_one(
+            {"_id": PydanticObjectId(book_id)}, {"_id": 0, "title": 1, "author": 1}
+        )
+
+    async def get_by_ids(self, book_ids: List[str]) -> List[BookModel]:
+        """Get all books with the given IDs in one query"""
+        return await BookModel.find(
+            {"_id": {"$in": [PydanticObjectId(book_id) for book_id in book_ids]}}
+        ).to_list()
+
+    def _page_query(self, after_id: Optional[str]):
+        """Build the keyset filter and sort for a page of books"""
+        query = {"_id": {"$gt": PydanticObjectId(after_id)}} if after_id else {}
+        return query, [("_id", ASCENDING)]
+
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, after_id: Optional[str] = None
+    ) -> List[BookModel]:
+        """Get all books with pagination, ordered by ID.
+
+        after_id continues right after the given book (keyset pagination).
+        """
+        query, sort = self._page_query(after_id)
+        return await BookModel.find(query).sort(sort).skip(skip).limit(limit).to_list()
                 
+    async def get_all_raw(
+        self,
+        projection: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same as get_all, but returns projected raw documents without model parsing"""
+        query, sort = self._page_query(after_id)
+        cursor = (
+            BookModel.get_motor_collection()
+            .find(query, projection)
+            .sort(sort)
+            .skip(skip)
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
+
+    def stream_raw(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+    ):
+        """Get a cursor over raw book documents, bypassing model parsing"""
+        return (
+            BookModel.get_motor_collection()
+            .find({}, projection)
+            .sort([("_id", ASCENDING)])
+            .batch_size(batch_size)
+        )
+
     async def get_available_books(self) -> List[BookModel]:
         """Get books that have available copies"""
-        return await BookModel.find({"available_copies": {"$gt": 0}}).to_list()
+        return await BookModel.find(self.AVAILABLE).to_list()
     
-    async def update_available_copies(self, book_id: str, change: int) -> Optional[BookModel]:
-        """Update available copies (positive to add, negative to subtract)"""
-        book = await self.get_by_id(book_id)
-        if not book:
-            return None
-        
-        new_available = book.available_copies + change
-        if new_available < 0:
-            return None
-        
-        await book.update({"$set": {"available_copies": new_available}})
-        return await self.get_by_id(book_id)
\ No newline at end of file
+    async def get_available_books_raw(
+        self, projection: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Same as get_available_books, but returns projected raw documents"""
+        cursor = BookModel.get_motor_collection().find(
+            self.AVAILABLE, projection
+        )
+        return await cursor.to_list(length=None)
+
+    async def update_available_copies(
+        self, book_id: str, change: int, session=None
+    ) -> Optional[BookModel]:
+        """Atomically update available copies (positive to add, negative to subtract).
+
+        The change is applied with a single guarded find-one-and-update, so
+        stock can never drop below zero or exceed total copies. Returns None
+        if the book does not exist or the guard rejected the change.
+        """
+        query = {"_id": PydanticObjectId(book_id)}
+        if change < 0:
+            query["available_copies"] = {"$gte": -change}
+        elif change > 0:
+            query["$expr"] = {
+                "$lte": [{"$add": ["$available_copies", change]}, "$total_copies"]
+            }
+
+        return await BookModel.find_one(query, session=session).update(
+            {"$inc": {"available_copies": change}},
+            session=session,
+            response_type=UpdateResponse.NEW_DOCUMENT,
+        )
+
+    async def checkout_copies(self, book_ids: List[str], session=None) -> List[bool]:
+        """Reserve one copy per entry of book_ids with guarded updates.
+
+        Returns, per entry, whether a copy was reserved. Raises
+        GuardedUpdateError if an update failed, telling which copies were
+        reserved anyway.
+        """
+        return await guarded_update_many(
+            BookModel.get_motor_collection(),
+            [
+                (
+                    {"_id": PydanticObjectId(book_id), "available_copies": {"$gte": 1}},
+                    {"$inc": {"available_copies": -1}},
+                )
+                for book_id in book_ids
+            ],
+            session=session,
+        )
+
+    async def release_copies(self, book_ids: List[str], session=None) -> None:
+        """Give back one copy per entry of book_ids in a single bulk write"""
+        counts = Counter(book_ids)
+        if not counts:
+            return
+
+        await BookModel.get_motor_collection().bulk_write(
+            [
+                UpdateOne(
+                    {
+                        "_id": PydanticObjectId(book_id),
+                        "$expr": {
+                            "$lte": [
+                                {"$add": ["$available_copies", count]},
+                                "$total_copies",
+                            ]
+                        },
+                    },
+                    {"$inc": {"available_copies": count}},
+                )
+                for book_id, count in counts.items()
+            ],
+            ordered=False,
+            session=session,
+        )
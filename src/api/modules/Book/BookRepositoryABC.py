@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterable, Dict, List, Optional
+from src.api.models.Book import BookModel
+from src.api.modules.Book.BookDtos import BookCreateDto
+
+
+class BookRepositoryABC(ABC):
+    """Abstract base class for book storage"""
+
+    @abstractmethod
+    async def create(self, book_data: BookCreateDto) -> BookModel:
+        """Create a new book"""
+        pass
+
+    @abstractmethod
+    async def insert_many(self, documents: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Insert validated raw documents unordered, returning the error
+        message of every document that failed, by position"""
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, book_id: str) -> Optional[BookModel]:
+        """Get a book by ID"""
+        pass
+
+    @abstractmethod
+    async def get_summary(self, book_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the immutable fields (title, author) of a book"""
+        pass
+
+    @abstractmethod
+    async def get_by_ids(self, book_ids: List[str]) -> List[BookModel]:
+        """Get all books with the given IDs"""
+        pass
+
+    @abstractmethod
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, after_id: Optional[str] = None
+    ) -> List[BookModel]:
+        """Get all books with pagination, ordered by ID"""
+        pass
+
+    @abstractmethod
+    async def get_all_raw(
+        self,
+        projection: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same as get_all, but returns projected raw documents"""
+        pass
+
+    @abstractmethod
+    def stream_raw(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterable[Dict[str, Any]]:
+        """Iterate over every raw book document, ordered by ID"""
+        pass
+
+    @abstractmethod
+    async def get_available_books(self) -> List[BookModel]:
+        """Get books that have available copies"""
+        pass
+
+    @abstractmethod
+    async def get_available_books_raw(
+        self, projection: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Same as get_available_books, but returns projected raw documents"""
+        pass
+
+    @abstractmethod
+    async def update_available_copies(
+        self, book_id: str, change: int, session=None
+    ) -> Optional[BookModel]:
+        """Atomically add (or subtract) available copies, keeping them
+        between zero and total copies. Returns None if the book does not
+        exist or the change was rejected."""
+        pass
+
+    async def checkout_copy(self, book_id: str, session=None) -> Optional[BookModel]:
+        """Reserve one copy of a book if any is available"""
+        return await self.update_available_copies(book_id, -1, session=session)
+
+    async def release_copy(self, book_id: str, session=None) -> Optional[BookModel]:
+        """Give back one copy of a book"""
+        return await self.update_available_copies(book_id, 1, session=session)
+
+    @abstractmethod
+    async def checkout_copies(self, book_ids: List[str], session=None) -> List[bool]:
+        """Reserve one copy per entry of book_ids, returning per entry
+        whether a copy was reserved. May raise GuardedUpdateError after
+        reserving some of them."""
+        pass
+
+    @abstractmethod
+    async def release_copies(self, book_ids: List[str], session=None) -> None:
+        """Give back one copy per entry of book_ids"""
+        pass
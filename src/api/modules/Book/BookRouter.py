@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
 from src.api.modules.Book.BookService import BookService
 from src.api.modules.Book.BookDtos import BookCreateDto, BookResponseDto
+from src.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from src.core.export import NDJSON_MEDIA_TYPE
+from src.core.bulk import BulkCreateResponseDto, iter_items, iter_ndjson
+from src.core.responses import DtoRoute
 
-router = APIRouter(prefix="/books", tags=["books"])
+router = APIRouter(prefix="/books", tags=["books"], route_class=DtoRoute)
 
-def get_book_service() -> BookService:
-    return BookService()
+def get_book_service(request: Request) -> BookService:
+    return request.app.state.container.book_service
 
 @router.post("/", response_model=BookResponseDto)
 async def create_book(
@@ -16,6 +21,35 @@ async def create_book(
     """Create a new book"""
     return await service.create_book(book_data)
 
+@router.post("/bulk", response_model=BulkCreateResponseDto)
+async def create_books_bulk(
+    books: List[Dict[str, Any]] = Body(...),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    service: BookService = Depends(get_book_service)
+):
+    """Create many books; each item is validated and reported on its own"""
+    return await service.create_books_bulk(iter_items(books), chunk_size)
+
+@router.post("/bulk/ndjson", response_model=BulkCreateResponseDto)
+async def create_books_bulk_ndjson(
+    request: Request,
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    service: BookService = Depends(get_book_service)
+):
+    """Create many books from a newline-delimited JSON body, inserted as it streams in"""
+    return await service.create_books_bulk(iter_ndjson(request.stream()), chunk_size)
+
+@router.get("/export")
+async def export_books(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to include"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    service: BookService = Depends(get_book_service)
+):
+    """Stream all books as newline-delimited JSON"""
+    return StreamingResponse(
+        service.export_books(fields, batch_size), media_type=NDJSON_MEDIA_TYPE
+    )
+
 @router.get("/{book_id}", response_model=BookResponseDto)
 async def get_book(
     book_id: str,
@@ -26,12 +60,21 @@ async def get_book(
 
 @router.get("/", response_model=List[BookResponseDto])
 async def get_books(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     service: BookService = Depends(get_book_service)
 ):
-    """Get all books with pagination"""
-    return await service.get_all_books(skip, limit)
+    """Get all books with pagination.
+
+    When a full page is returned, the X-Next-Cursor header holds the cursor
+    for the next page.
+    """
+    books = await service.get_all_books(skip, limit, cursor)
+    if len(books) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": books[-1].id})
+    return books
 
 @router.get("/available/list", response_model=List[BookResponseDto])
 async def get_available_books(
@@ -1,16 +1,30 @@
-from typing import List
-from src.api.modules.Book.BookRepository import BookRepository
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional
+from pymongo.errors import DuplicateKeyError
+from src.api.modules.Book.CachedBookRepository import CachedBookRepository
+from src.api.modules.Book.BookRepositoryABC import BookRepositoryABC
 from src.api.modules.Book.BookDtos import BookCreateDto, BookResponseDto
-from src.core.exceptions import NotFoundException
+from src.core.exceptions import ConflictException, NotFoundException
+from src.core.pagination import decode_cursor
+from src.core.export import build_projection, ndjson_stream
+from src.core.bulk import BulkCreateResponseDto, bulk_insert
+
+# Fields fetched for list endpoints, so Mongo only ships what the response needs
+RESPONSE_PROJECTION = {
+    field: 1 for field in BookResponseDto.model_fields if field != "id"
+}
+
 
 class BookService:
     
-    def __init__(self):
-        self.repository = BookRepository()
+    def __init__(self, repository: Optional[BookRepositoryABC] = None):
+        self.repository = repository or CachedBookRepository()
     
     async def create_book(self, book_data: BookCreateDto) -> BookResponseDto:
         """Create a new book"""
-        book = await self.repository.create(book_data)
+        try:
+            book = await self.repository.create(book_data)
+        except DuplicateKeyError:
+            raise ConflictException(f"A book with ISBN {book_data.isbn} already exists")
         return BookResponseDto(
             id=str(book.id),
             title=book.title,
@@ -22,6 +36,14 @@ class BookService:
             total_copies=book.total_copies
         )
     
+    async def create_books_bulk(
+        self, items: AsyncIterable[Any], chunk_size: int = 1000
+    ) -> BulkCreateResponseDto:
+        """Create many books, reporting the outcome of each item"""
+        return await bulk_insert(
+            items, BookCreateDto, self.repository.insert_many, chunk_size
+        )
+
     async def get_book_by_id(self, book_id: str) -> BookResponseDto:
         """Get a book by ID"""
         book = await self.repository.get_by_id(book_id)
@@ -39,41 +61,42 @@ class BookService:
             total_copies=book.total_copies
         )
     
-    async def get_all_books(self, skip: int = 0, limit: int = 100) -> List[BookResponseDto]:
+    async def get_all_books(
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[BookResponseDto]:
         """Get all books with pagination"""
-        books = await self.repository.get_all(skip, limit)
-        return [
-            BookResponseDto(
-                id=str(book.id),
-                title=book.title,
-                description=book.description,
-                isbn=book.isbn,
-                author=book.author,
-                genre=book.genre,
-                available_copies=book.available_copies,
-                total_copies=book.total_copies
-            ) for book in books
-        ]
+        after_id = decode_cursor(cursor)["id"] if cursor else None
+        books = await self.repository.get_all_raw(
+            RESPONSE_PROJECTION, skip, limit, after_id
+        )
+        return [self._to_response_dto(book) for book in books]
             
+    def export_books(
+        self, fields: Optional[str] = None, batch_size: int = 1000
+    ) -> AsyncIterator[bytes]:
+        """Stream all books as newline-delimited JSON"""
+        projection = build_projection(fields, BookResponseDto.model_fields)
+        cursor = self.repository.stream_raw(projection, batch_size)
+        return ndjson_stream(cursor, batch_size)
+
     async def get_available_books(self) -> List[BookResponseDto]:
         """Get books that have available copies"""
-        books = await self.repository.get_available_books()
-        return [
-            BookResponseDto(
-                id=str(book.id),
-                title=book.title,
-                description=book.description,
-                isbn=book.isbn,
-                author=book.author,
-                genre=book.genre,
-                available_copies=book.available_copies,
-                total_copies=book.total_copies
-            ) for book in books
-        ]
+        books = await self.repository.get_available_books_raw(RESPONSE_PROJECTION)
+        return [self._to_response_dto(book) for book in books]
     
     async def check_availability(self, book_id: str) -> bool:
         """Check if a book is available for rental"""
         book = await self.repository.get_by_id(book_id)
         if not book:
             return False
-        return book.available_copies > 0
\ No newline at end of file
+        return book.available_copies > 0
+
+    @staticmethod
+    def _to_response_dto(document: Dict[str, Any]) -> BookResponseDto:
+        """Build a response from a projected raw document.
+
+        The data was validated when it was written, so the DTO is constructed
+        without running validation again.
+        """
+        document["id"] = str(document.pop("_id"))
+        return BookResponseDto.model_construct(**document)
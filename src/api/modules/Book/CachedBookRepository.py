@@ -0,0 +1,71 @@
+from typing import Any, Dict, List, Optional
+from src.api.models.Book import BookModel
+from src.api.modules.Book.BookRepository import BookRepository
+from src.core.cache import LRUTTLCache
+from src.core.config import get_settings
+
+settings = get_settings()
+
+
+class CachedBookRepository(BookRepository):
+    """BookRepository with a read-through cache in front of lookups by ID.
+
+    In "full" mode whole documents are cached and dropped whenever this
+    process changes a book's stock. In "immutable" mode only title and
+    author are cached, so availability is always read from the database.
+    """
+
+    cache = LRUTTLCache(settings.lookup_cache_size, settings.lookup_cache_ttl)
+
+    def __init__(self, mode: str = settings.lookup_cache_mode):
+        self.mode = mode
+
+    async def get_by_id(self, book_id: str) -> Optional[BookModel]:
+        """Get a book by ID"""
+        if self.mode != "full":
+            return await super().get_by_id(book_id)
+
+        key = ("book", book_id)
+        book = self.cache.get(key)
+        if book is None:
+            book = await super().get_by_id(book_id)
+            if book is not None:
+                self.cache.set(key, book)
+        return book
+
+    async def get_summary(self, book_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the immutable fields (title, author) of a book"""
+        if self.mode == "off":
+            return await super().get_summary(book_id)
+
+        key = ("book_summary", book_id)
+        summary = self.cache.get(key)
+        if summary is None:
+            summary = await super().get_summary(book_id)
+            if summary is not None:
+                self.cache.set(key, summary)
+        return summary
+
+    async def update_available_copies(
+        self, book_id: str, change: int, session=None
+    ) -> Optional[BookModel]:
+        """Atomically update available copies and drop the cached book"""
+        book = await super().update_available_copies(book_id, change, session=session)
+        self.cache.invalidate(("book", book_id))
+        return book
+
+    async def checkout_copies(self, book_ids: List[str], session=None) -> List[bool]:
+        """Reserve one copy per entry of book_ids and drop the cached books"""
+        try:
+            return await super().checkout_copies(book_ids, session=session)
+        finally:
+            for book_id in book_ids:
+                self.cache.invalidate(("book", book_id))
+
+    async def release_copies(self, book_ids: List[str], session=None) -> None:
+        """Give back one copy per entry of book_ids and drop the cached books"""
+        try:
+            await super().release_copies(book_ids, session=session)
+        finally:
+            for book_id in book_ids:
+                self.cache.invalidate(("book", book_id))
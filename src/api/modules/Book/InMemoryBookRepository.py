@@ -0,0 +1,122 @@
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional
+from src.api.models.Book import BookModel
+from src.api.modules.Book.BookDtos import BookCreateDto
+from src.api.modules.Book.BookRepositoryABC import BookRepositoryABC
+from src.core.in_memory import (
+    InMemoryCollection,
+    iter_documents,
+    object_id,
+    project,
+    to_model,
+)
+
+
+class InMemoryBookRepository(BookRepositoryABC):
+    """BookRepository kept in process memory, for benchmarks and local runs
+    without MongoDB"""
+
+    def __init__(self):
+        self.collection = InMemoryCollection("books", unique={"isbn_unique": "isbn"})
+
+    async def create(self, book_data: BookCreateDto) -> BookModel:
+        """Create a new book"""
+        return to_model(BookModel, self.collection.insert(book_data.model_dump()))
+
+    async def insert_many(self, documents: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Insert validated raw documents unordered"""
+        return self.collection.insert_many(documents)
+
+    async def get_by_id(self, book_id: str) -> Optional[BookModel]:
+        """Get a book by ID"""
+        document = self.collection.get(object_id(book_id))
+        return to_model(BookModel, document) if document else None
+
+    async def get_summary(self, book_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the immutable fields (title, author) of a book"""
+        document = self.collection.get(object_id(book_id))
+        if document is None:
+            return None
+        return project(document, {"_id": 0, "title": 1, "author": 1})
+
+    async def get_by_ids(self, book_ids: List[str]) -> List[BookModel]:
+        """Get all books with the given IDs"""
+        documents = (self.collection.get(object_id(book_id)) for book_id in set(book_ids))
+        return [to_model(BookModel, document) for document in documents if document]
+
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, after_id: Optional[str] = None
+    ) -> List[BookModel]:
+        """Get all books with pagination, ordered by ID"""
+        documents = await self.get_all_raw(None, skip, limit, after_id)
+        return [to_model(BookModel, document) for document in documents]
+
+    async def get_all_raw(
+        self,
+        projection: Optional[Dict[str, Any]],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same as get_all, but returns projected raw documents"""
+        return self.collection.find(
+            projection=projection,
+            skip=skip,
+            limit=limit,
+            after_id=object_id(after_id) if after_id else None,
+        )
+
+    def stream_raw(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over every raw book document, ordered by ID"""
+        return iter_documents(self.collection.find(projection=projection))
+
+    async def get_available_books(self) -> List[BookModel]:
+        """Get books that have available copies"""
+        documents = await self.get_available_books_raw(None)
+        return [to_model(BookModel, document) for document in documents]
+
+    async def get_available_books_raw(
+        self, projection: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Same as get_available_books, but returns projected raw documents"""
+        return self.collection.find(
+            lambda document: document["available_copies"] > 0, projection
+        )
+
+    async def update_available_copies(
+        self, book_id: str, change: int, session=None
+    ) -> Optional[BookModel]:
+        """Add (or subtract) available copies, keeping them between zero and
+        total copies"""
+        document = self.collection.get(object_id(book_id))
+        if document is None or not self._can_change(document, change):
+            return None
+        document["available_copies"] += change
+        return to_model(BookModel, document)
+
+    async def checkout_copies(self, book_ids: List[str], session=None) -> List[bool]:
+        """Reserve one copy per entry of book_ids"""
+        reserved = []
+        for book_id in book_ids:
+            document = self.collection.get(object_id(book_id))
+            ok = document is not None and self._can_change(document, -1)
+            if ok:
+                document["available_copies"] -= 1
+            reserved.append(ok)
+        return reserved
+
+    async def release_copies(self, book_ids: List[str], session=None) -> None:
+        """Give back one copy per entry of book_ids"""
+        for book_id, count in Counter(book_ids).items():
+            document = self.collection.get(object_id(book_id))
+            if document is not None and self._can_change(document, count):
+                document["available_copies"] += count
+
+    @staticmethod
+    def _can_change(document: Dict[str, Any], change: int) -> bool:
+        copies = document["available_copies"] + change
+        return 0 <= copies <= document["total_copies"]
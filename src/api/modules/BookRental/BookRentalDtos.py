@@ -1,16 +1,30 @@
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from pydantic import AfterValidator, BaseModel, Field
+from datetime import datetime, timezone
+from typing import Annotated, List, Optional
 from src.api.models.BookRental import RentalStatus
 
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Drop the timezone of aware datetimes, converting them to UTC first.
+
+    Stored dates come back from Mongo as naive UTC and are compared with
+    naive datetimes, so dates from requests must not carry a timezone.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+NaiveUtcDatetime = Annotated[datetime, AfterValidator(to_naive_utc)]
+
 class BookRentalCreateDto(BaseModel):
     book_id: str
     person_id: str
-    due_date: datetime
+    due_date: NaiveUtcDatetime
 
 class BookRentalUpdateDto(BaseModel):
-    due_date: Optional[datetime] = None
-    return_date: Optional[datetime] = None
+    due_date: Optional[NaiveUtcDatetime] = None
+    return_date: Optional[NaiveUtcDatetime] = None
     status: Optional[RentalStatus] = None
 
 class BookRentalResponseDto(BaseModel):
@@ -32,4 +46,22 @@ class BookRentalDetailDto(BaseModel):
     status: RentalStatus
     book_title: Optional[str] = None
     person_name: Optional[str] = None
-    person_email: Optional[str] = None
\ No newline at end of file
+    person_email: Optional[str] = None
+
+class BookRentalBatchCreateDto(BaseModel):
+    person_id: str
+    book_ids: List[str] = Field(..., min_length=1, max_length=100)
+    due_date: NaiveUtcDatetime
+
+class BookRentalBatchReturnDto(BaseModel):
+    rental_ids: List[str] = Field(..., min_length=1, max_length=100)
+
+class BookRentalBatchItemDto(BaseModel):
+    index: int
+    rental: Optional[BookRentalResponseDto] = None
+    error: Optional[str] = None
+
+class BookRentalBatchResultDto(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BookRentalBatchItemDto]
@@ -1,19 +1,36 @@
-from typing import List, Optional
-from beanie import PydanticObjectId
+from typing import Any, AsyncIterator, Dict, List, Optional
+from beanie import PydanticObjectId, UpdateResponse
+from pymongo import ASCENDING
 from datetime import datetime
 from src.api.models.BookRental import BookRentalModel, RentalStatus
 from src.api.modules.BookRental.BookRentalDtos import (
     BookRentalCreateDto,
     BookRentalUpdateDto,
 )
+from src.api.modules.BookRental.BookRentalRepositoryABC import BookRentalRepositoryABC
+from src.core.bulk import guarded_update_many
 
 
-class BookRentalRepository:
+class BookRentalRepository(BookRentalRepositoryABC):
 
-    async def create(self, rental_data: BookRentalCreateDto) -> BookRentalModel:
+    async def create(
+        self, rental_data: BookRentalCreateDto, session=None
+    ) -> BookRentalModel:
         """Create a new book rental"""
         rental = BookRentalModel(**rental_data.model_dump())
-        return await rental.insert()
+        return await rental.insert(session=session)
+
+    async def create_many(
+        self, rentals_data: List[BookRentalCreateDto], session=None
+    ) -> List[BookRentalModel]:
+        """Create many rentals with a single insert"""
+        rentals = [
+            BookRentalModel(id=PydanticObjectId(), **rental_data.model_dump())
+            for rental_data in rentals_data
+        ]
+        if rentals:
+            await BookRentalModel.insert_many(rentals, session=session)
+        return rentals
 
     async def update(self, rental_id: str, update_data: BookRentalUpdateDto) -> Optional[BookRentalModel]:
         """Update a rental"""
@@ -29,9 +46,106 @@ class BookRentalRepository:
         """Get a rental by ID"""
         return await BookRentalModel.get(PydanticObjectId(rental_id))
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[BookRentalModel]:
-        """Get all rentals with pagination"""
-        return await BookRentalModel.find().skip(skip).limit(limit).to_list()
+    def _page_query(
+        self,
+        order_by: str,
+        after_id: Optional[str],
+        after_due_date: Optional[datetime],
+    ):
+        """Build the keyset filter and sort for a page of rentals"""
+        query = {}
+        if order_by == "due_date":
+            sort = [("due_date", ASCENDING), ("_id", ASCENDING)]
+            if after_id:
+                query = {
+                    "$or": [
+                        {"due_date": {"$gt": after_due_date}},
+                        {
+                            "due_date": after_due_date,
+                            "_id": {"$gt": PydanticObjectId(after_id)},
+                        },
+                    ]
+                }
+        else:
+            sort = [("_id", ASCENDING)]
+            if after_id:
+                query = {"_id": {"$gt": PydanticObjectId(after_id)}}
+        return query, sort
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "id",
+        after_id: Optional[str] = None,
+        after_due_date: Optional[datetime] = None,
+    ) -> List[BookRentalModel]:
+        """Get all rentals with pagination, ordered by ID or by due date.
+
+        after_id (plus after_due_date when ordering by due date) continues
+        right after the given rental (keyset pagination).
+        """
+        query, sort = self._page_query(order_by, after_id, after_due_date)
+        return await BookRentalModel.find(query).sort(sort).skip(skip).limit(limit).to_list()
+
+    async def get_by_ids(self, rental_ids: List[str]) -> List[BookRentalModel]:
+        """Get all rentals with the given IDs in one query"""
+        return await BookRentalModel.find(
+            {"_id": {"$in": [PydanticObjectId(rental_id) for rental_id in rental_ids]}}
+        ).to_list()
+
+    async def get_all_raw(
+        self,
+        projection: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "id",
+        after_id: Optional[str] = None,
+        after_due_date: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same as get_all, but returns projected raw documents without model parsing"""
+        query, sort = self._page_query(order_by, after_id, after_due_date)
+        cursor = (
+            BookRentalModel.get_motor_collection()
+            .find(query, projection)
+            .sort(sort)
+            .skip(skip)
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
+
+    def stream_raw(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+        status: Optional[RentalStatus] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+    ):
+        """Get a cursor over raw rental documents, bypassing model parsing"""
+        return (
+            BookRentalModel.get_motor_collection()
+            .find(self._stream_query(status, due_after, due_before), projection)
+            .batch_size(batch_size)
+        )
+
+    def _stream_query(
+        self,
+        status: Optional[RentalStatus],
+        due_after: Optional[datetime],
+        due_before: Optional[datetime],
+    ) -> Dict[str, Any]:
+        """Build the filter of stream_raw"""
+        query: Dict[str, Any] = {}
+        if status:
+            query["status"] = status
+        if due_after or due_before:
+            query["due_date"] = {}
+            if due_after:
+                query["due_date"]["$gte"] = due_after
+            if due_before:
+                query["due_date"]["$lt"] = due_before
+        return query
 
     async def get_by_person_id(self, person_id: str) -> List[BookRentalModel]:
         """Get all rentals for a specific person"""
@@ -51,23 +165,225 @@ class BookRentalRepository:
 
     async def get_rentals_overdue(self) -> List[BookRentalModel]:
         """Get rentals that are overdue by specified days"""
-        cutoff_date = datetime.now()
-        return await BookRentalModel.find(
-            {"due_date": {"$lt": cutoff_date}, "status": RentalStatus.ACTIVE}
-        ).to_list()
+        return await BookRentalModel.find(self._overdue_query(datetime.now())).to_list()
+
+    def _overdue_query(
+        self, cutoff_date: datetime, rental_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Build the filter for active rentals due before cutoff_date,
+        optionally only the given ones"""
+        query: Dict[str, Any] = {
+            "status": RentalStatus.ACTIVE,
+            "due_date": {"$lt": cutoff_date},
+        }
+        if rental_ids is not None:
+            query["_id"] = {
+                "$in": [PydanticObjectId(rental_id) for rental_id in rental_ids]
+            }
+        return query
+
+    async def iter_due_between(
+        self,
+        after: Optional[datetime],
+        until: datetime,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the id and due date of active rentals due after `after`
+        (if given) and at or before `until`, earliest first"""
+        query, sort = self._due_between_query(after, until)
+        cursor = BookRentalModel.get_motor_collection().find(
+            query, {"due_date": 1}, sort=sort, batch_size=batch_size
+        )
+        async for document in cursor:
+            yield document
+
+    def _due_between_query(self, after: Optional[datetime], until: datetime):
+        """Build the filter and sort of iter_due_between"""
+        due_date: Dict[str, Any] = {"$lte": until}
+        if after is not None:
+            due_date["$gt"] = after
+        query = {"status": RentalStatus.ACTIVE, "due_date": due_date}
+        return query, [("due_date", ASCENDING)]
+
+    async def iter_created_after(
+        self, after_id: PydanticObjectId, until: datetime, batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the id and due date of active rentals created after the
+        rental `after_id` and due at or before `until`, oldest first"""
+        query, sort = self._created_after_query(after_id, until)
+        cursor = BookRentalModel.get_motor_collection().find(
+            query, {"due_date": 1}, sort=sort, batch_size=batch_size
+        )
+        async for document in cursor:
+            yield document
+
+    def _created_after_query(self, after_id: PydanticObjectId, until: datetime):
+        """Build the filter and sort of iter_created_after"""
+        query = {
+            "_id": {"$gt": after_id},
+            "status": RentalStatus.ACTIVE,
+            "due_date": {"$lte": until},
+        }
+        return query, [("_id", ASCENDING)]
+
+    async def iter_overdue_details(
+        self,
+        cutoff_date: datetime,
+        batch_size: int = 500,
+        rental_ids: Optional[List[str]] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream active rentals due before cutoff_date (optionally only the
+        given ones) joined with their book title and person name/email, in
+        batches of at most batch_size
+        """
+        cursor = BookRentalModel.get_motor_collection().aggregate(
+            self._overdue_details_pipeline(cutoff_date, rental_ids),
+            batchSize=batch_size,
+        )
+        batch = []
+        async for document in cursor:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _overdue_details_pipeline(
+        self, cutoff_date: datetime, rental_ids: Optional[List[str]]
+    ) -> List[Dict[str, Any]]:
+        """Build the pipeline of iter_overdue_details"""
+        return [
+            {"$match": self._overdue_query(cutoff_date, rental_ids)},
+            {
+                "$lookup": {
+                    "from": "books",
+                    "let": {"book_oid": {"$toObjectId": "$book_id"}},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$_id", "$$book_oid"]}}},
+                        {"$project": {"_id": 0, "title": 1}},
+                    ],
+                    "as": "book",
+                }
+            },
+            {
+                "$lookup": {
+                    "from": "persons",
+                    "let": {"person_oid": {"$toObjectId": "$person_id"}},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$_id", "$$person_oid"]}}},
+                        {"$project": {"_id": 0, "name": 1, "email": 1}},
+                    ],
+                    "as": "person",
+                }
+            },
+            {
+                "$project": {
+                    "book_id": 1,
+                    "person_id": 1,
+                    "rental_date": 1,
+                    "due_date": 1,
+                    "return_date": 1,
+                    "status": 1,
+                    "book_title": {"$first": "$book.title"},
+                    "person_name": {"$first": "$person.name"},
+                    "person_email": {"$first": "$person.email"},
+                }
+            },
+        ]
+
+    async def mark_as_overdue(
+        self, rental_ids: List[str], chunk_size: int = 1000, session=None
+    ) -> int:
+        """Mark the given active rentals as overdue, chunk_size ids per
+        update so the filter stays small however many ids are passed"""
+        collection = BookRentalModel.get_motor_collection()
+        modified = 0
+        for start in range(0, len(rental_ids), chunk_size):
+            result = await collection.update_many(
+                *self._mark_overdue_update(rental_ids[start:start + chunk_size]),
+                session=session,
+            )
+            modified += result.modified_count
+        return modified
+
+    def _mark_overdue_update(self, rental_ids: List[str]):
+        """Build the filter and update of mark_as_overdue"""
+        query = {
+            "_id": {"$in": [PydanticObjectId(rental_id) for rental_id in rental_ids]},
+            "status": RentalStatus.ACTIVE,
+        }
+        return query, {"$set": {"status": RentalStatus.OVERDUE}}
+
+    async def return_book(
+        self, rental_id: str, session=None
+    ) -> Optional[BookRentalModel]:
+        """Atomically mark an unreturned rental as returned.
+
+        Returns None if the rental does not exist or was already returned.
+        """
+        return await BookRentalModel.find_one(
+            {
+                "_id": PydanticObjectId(rental_id),
+                "status": {"$ne": RentalStatus.RETURNED},
+            },
+            session=session,
+        ).update(
+            {
+                "$set": {
+                    "return_date": datetime.now(),
+                    "status": RentalStatus.RETURNED,
+                }
+            },
+            session=session,
+            response_type=UpdateResponse.NEW_DOCUMENT,
+        )
+
+    async def return_many(
+        self, rental_ids: List[str], return_date: datetime, session=None
+    ) -> List[bool]:
+        """Mark many unreturned rentals as returned with guarded updates.
+
+        Returns, per ID, whether the rental was flipped to returned (False if
+        it was already returned or doesn't exist). Raises GuardedUpdateError
+        if an update failed, telling which rentals were flipped anyway.
+        """
+        return await guarded_update_many(
+            BookRentalModel.get_motor_collection(),
+            [
+                (
+                    {
+                        "_id": PydanticObjectId(rental_id),
+                        "status": {"$ne": RentalStatus.RETURNED},
+                    },
+                    {
+                        "$set": {
+                            "return_date": return_date,
+                            "status": RentalStatus.RETURNED,
+                        }
+                    },
+                )
+                for rental_id in rental_ids
+            ],
+            session=session,
+        )
 
-    async def mark_as_overdue(self, rental_ids: List[str]) -> int:
-        """Mark rentals as overdue"""
-        result = await BookRentalModel.find(
-            {"_id": {"$in": [PydanticObjectId(rid) for rid in rental_ids]}}
-        ).update({"$set": {"status": RentalStatus.OVERDUE}})
-        return result.modified_count
-
-    async def return_book(self, rental_id: str) -> Optional[BookRentalModel]:
-        """Mark a rental as returned"""
-        return await self.update(
-            rental_id,
-            BookRentalUpdateDto(
-                return_date=datetime.now(), status=RentalStatus.RETURNED
-            ),
+    async def undo_returns(
+        self, statuses: Dict[str, RentalStatus], return_date: datetime
+    ) -> None:
+        """Put rentals returned by return_many at return_date back to the
+        status they had before"""
+        await guarded_update_many(
+            BookRentalModel.get_motor_collection(),
+            [
+                (
+                    {
+                        "_id": PydanticObjectId(rental_id),
+                        "status": RentalStatus.RETURNED,
+                        "return_date": return_date,
+                    },
+                    {"$set": {"return_date": None, "status": status}},
+                )
+                for rental_id, status in statuses.items()
+            ],
         )
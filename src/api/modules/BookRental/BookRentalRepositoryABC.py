@@ -0,0 +1,168 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional
+from beanie import PydanticObjectId
+from src.api.models.BookRental import BookRentalModel, RentalStatus
+from src.api.modules.BookRental.BookRentalDtos import (
+    BookRentalCreateDto,
+    BookRentalUpdateDto,
+)
+
+
+class BookRentalRepositoryABC(ABC):
+    """Abstract base class for rental storage"""
+
+    @abstractmethod
+    async def create(
+        self, rental_data: BookRentalCreateDto, session=None
+    ) -> BookRentalModel:
+        """Create a new book rental"""
+        pass
+
+    @abstractmethod
+    async def create_many(
+        self, rentals_data: List[BookRentalCreateDto], session=None
+    ) -> List[BookRentalModel]:
+        """Create many rentals at once"""
+        pass
+
+    @abstractmethod
+    async def update(
+        self, rental_id: str, update_data: BookRentalUpdateDto
+    ) -> Optional[BookRentalModel]:
+        """Update a rental"""
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, rental_id: str) -> Optional[BookRentalModel]:
+        """Get a rental by ID"""
+        pass
+
+    @abstractmethod
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "id",
+        after_id: Optional[str] = None,
+        after_due_date: Optional[datetime] = None,
+    ) -> List[BookRentalModel]:
+        """Get all rentals with pagination, ordered by ID or by due date"""
+        pass
+
+    @abstractmethod
+    async def get_by_ids(self, rental_ids: List[str]) -> List[BookRentalModel]:
+        """Get all rentals with the given IDs"""
+        pass
+
+    @abstractmethod
+    async def get_all_raw(
+        self,
+        projection: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "id",
+        after_id: Optional[str] = None,
+        after_due_date: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same as get_all, but returns projected raw documents"""
+        pass
+
+    @abstractmethod
+    def stream_raw(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+        status: Optional[RentalStatus] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+    ) -> AsyncIterable[Dict[str, Any]]:
+        """Iterate over raw rental documents matching the filters"""
+        pass
+
+    @abstractmethod
+    async def get_by_person_id(self, person_id: str) -> List[BookRentalModel]:
+        """Get all rentals for a specific person"""
+        pass
+
+    @abstractmethod
+    async def get_by_book_id(self, book_id: str) -> List[BookRentalModel]:
+        """Get all rentals for a specific book"""
+        pass
+
+    @abstractmethod
+    async def get_active_rentals(self) -> List[BookRentalModel]:
+        """Get all active rentals"""
+        pass
+
+    @abstractmethod
+    async def get_overdue_rentals(self) -> List[BookRentalModel]:
+        """Get all rentals marked overdue"""
+        pass
+
+    @abstractmethod
+    async def get_rentals_overdue(self) -> List[BookRentalModel]:
+        """Get active rentals past their due date"""
+        pass
+
+    @abstractmethod
+    def iter_due_between(
+        self,
+        after: Optional[datetime],
+        until: datetime,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the id and due date of active rentals due after `after`
+        (if given) and at or before `until`, earliest first"""
+        pass
+
+    @abstractmethod
+    def iter_created_after(
+        self, after_id: PydanticObjectId, until: datetime, batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the id and due date of active rentals created after the
+        rental `after_id` and due at or before `until`, oldest first"""
+        pass
+
+    @abstractmethod
+    def iter_overdue_details(
+        self,
+        cutoff_date: datetime,
+        batch_size: int = 500,
+        rental_ids: Optional[List[str]] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream active rentals due before cutoff_date (optionally only the
+        given ones) with their book title and person name/email, in batches"""
+        pass
+
+    @abstractmethod
+    async def mark_as_overdue(
+        self, rental_ids: List[str], chunk_size: int = 1000, session=None
+    ) -> int:
+        """Mark the given active rentals as overdue"""
+        pass
+
+    @abstractmethod
+    async def return_book(
+        self, rental_id: str, session=None
+    ) -> Optional[BookRentalModel]:
+        """Atomically mark an unreturned rental as returned. Returns None if
+        the rental does not exist or was already returned."""
+        pass
+
+    @abstractmethod
+    async def return_many(
+        self, rental_ids: List[str], return_date: datetime, session=None
+    ) -> List[bool]:
+        """Mark many unreturned rentals as returned, returning per ID whether
+        the rental was flipped. May raise GuardedUpdateError after flipping
+        some of them."""
+        pass
+
+    @abstractmethod
+    async def undo_returns(
+        self, statuses: Dict[str, RentalStatus], return_date: datetime
+    ) -> None:
+        """Put rentals returned by return_many at return_date back to the
+        status they had before"""
+        pass
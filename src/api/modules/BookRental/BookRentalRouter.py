@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from datetime import datetime
 from src.api.modules.BookRental.BookRentalService import BookRentalService
 from src.api.modules.BookRental.BookRentalDtos import (
-    BookRentalCreateDto, BookRentalResponseDto, BookRentalDetailDto
+    BookRentalCreateDto, BookRentalResponseDto, BookRentalDetailDto,
+    BookRentalBatchCreateDto, BookRentalBatchReturnDto, BookRentalBatchResultDto
 )
+from src.api.models.BookRental import RentalStatus
+from src.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from src.core.export import NDJSON_MEDIA_TYPE
+from src.core.responses import DtoRoute
 
-router = APIRouter(prefix="/rentals", tags=["rentals"])
+router = APIRouter(prefix="/rentals", tags=["rentals"], route_class=DtoRoute)
 
-def get_rental_service() -> BookRentalService:
-    return BookRentalService()
+def get_rental_service(request: Request) -> BookRentalService:
+    return request.app.state.container.rental_service
 
 @router.post("/", response_model=BookRentalResponseDto)
 async def create_rental(
@@ -18,6 +25,37 @@ async def create_rental(
     """Create a new book rental"""
     return await service.create_rental(rental_data)
 
+@router.post("/batch", response_model=BookRentalBatchResultDto)
+async def create_rentals_batch(
+    batch_data: BookRentalBatchCreateDto,
+    service: BookRentalService = Depends(get_rental_service)
+):
+    """Check out several books for one person at once"""
+    return await service.create_rentals_batch(batch_data)
+
+@router.put("/return/batch", response_model=BookRentalBatchResultDto)
+async def return_books_batch(
+    batch_data: BookRentalBatchReturnDto,
+    service: BookRentalService = Depends(get_rental_service)
+):
+    """Return several rented books at once"""
+    return await service.return_books_batch(batch_data)
+
+@router.get("/export")
+async def export_rentals(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to include"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    status: Optional[RentalStatus] = Query(None),
+    due_after: Optional[datetime] = Query(None),
+    due_before: Optional[datetime] = Query(None),
+    service: BookRentalService = Depends(get_rental_service)
+):
+    """Stream rentals as newline-delimited JSON, optionally filtered"""
+    return StreamingResponse(
+        service.export_rentals(fields, batch_size, status, due_after, due_before),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
 @router.get("/{rental_id}", response_model=BookRentalDetailDto)
 async def get_rental(
     rental_id: str,
@@ -28,12 +66,26 @@ async def get_rental(
 
 @router.get("/", response_model=List[BookRentalResponseDto])
 async def get_rentals(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    order_by: Literal["id", "due_date"] = Query("id"),
     service: BookRentalService = Depends(get_rental_service)
 ):
-    """Get all rentals with pagination"""
-    return await service.get_all_rentals(skip, limit)
+    """Get all rentals with pagination.
+
+    When a full page is returned, the X-Next-Cursor header holds the cursor
+    for the next page. Cursors are only valid with the same order_by.
+    """
+    rentals = await service.get_all_rentals(skip, limit, cursor, order_by)
+    if len(rentals) == limit:
+        last = rentals[-1]
+        values = {"id": last.id}
+        if order_by == "due_date":
+            values["due_date"] = last.due_date.isoformat()
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(values)
+    return rentals
 
 @router.put("/{rental_id}/return", response_model=BookRentalResponseDto)
 async def return_book(
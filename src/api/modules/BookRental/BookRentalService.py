@@ -1,47 +1,96 @@
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional
 from datetime import datetime
+import asyncio
+from bson import ObjectId
 from src.api.modules.BookRental.BookRentalRepository import BookRentalRepository
+from src.api.modules.BookRental.BookRentalRepositoryABC import BookRentalRepositoryABC
 from src.api.modules.BookRental.BookRentalDtos import (
     BookRentalCreateDto,
     BookRentalResponseDto,
     BookRentalDetailDto,
+    BookRentalBatchCreateDto,
+    BookRentalBatchReturnDto,
+    BookRentalBatchItemDto,
+    BookRentalBatchResultDto,
 )
-from src.api.modules.Book.BookRepository import BookRepository
-from src.api.modules.Person.PersonRepository import PersonRepository
-from src.core.exceptions import NotFoundException, ConflictException
-from src.core.message_brokers.rabbitmq import RabbitMQQueue
+from src.api.models.BookRental import BookRentalModel, RentalStatus
+from src.api.modules.Book.CachedBookRepository import CachedBookRepository
+from src.api.modules.Book.BookRepositoryABC import BookRepositoryABC
+from src.api.modules.Person.CachedPersonRepository import CachedPersonRepository
+from src.api.modules.Person.PersonRepositoryABC import PersonRepositoryABC
+from src.core.exceptions import (
+    BadRequestException,
+    NotFoundException,
+    ConflictException,
+)
+from src.core.pagination import decode_cursor
+from src.core.export import build_projection, ndjson_stream
+from src.core.message_brokers.abc import QueueABC
+from src.core.message_brokers.rabbitmq import AsyncRabbitMQQueue
+from src.core.config import get_settings
+from src.core.db import get_client
+from src.core.outbox import OutboxRepository
+from src.core.bulk import GuardedUpdateError
+
+settings = get_settings()
+
+# Fields fetched for list endpoints, so Mongo only ships what the response needs
+RESPONSE_PROJECTION = {
+    field: 1 for field in BookRentalResponseDto.model_fields if field != "id"
+}
 
 
 class BookRentalService:
 
-    def __init__(self):
-        self.repository = BookRentalRepository()
-        self.book_repository = BookRepository()
-        self.person_repository = PersonRepository()
-        self.notification_queue = RabbitMQQueue("book_rental_notifications")
+    def __init__(
+        self,
+        repository: Optional[BookRentalRepositoryABC] = None,
+        book_repository: Optional[BookRepositoryABC] = None,
+        person_repository: Optional[PersonRepositoryABC] = None,
+        notification_queue: Optional[QueueABC] = None,
+        outbox: Optional[OutboxRepository] = None,
+    ):
+        self.repository = repository or BookRentalRepository()
+        self.book_repository = book_repository or CachedBookRepository()
+        self.person_repository = person_repository or CachedPersonRepository()
+        self.notification_queue = notification_queue or AsyncRabbitMQQueue(
+            "book_rental_notifications"
+        )
+        self.outbox = outbox or OutboxRepository()
+        self._rental_listeners: List[Any] = []
+
+    def add_rental_listener(self, listener: Any) -> None:
+        """Register an object whose rental_created(rental_id, due_date) and
+        rental_returned(rental_id) are called after local checkouts/returns"""
+        self._rental_listeners.append(listener)
+
+    def _rental_created(self, rental_id: str, due_date: datetime) -> None:
+        # Called once the rental is stored, so a failing listener must not
+        # fail the request; the scheduler's sweeps pick the rental up anyway
+        for listener in self._rental_listeners:
+            try:
+                listener.rental_created(rental_id, due_date)
+            except Exception as e:
+                print(f"Error in rental listener: {e}")
+
+    def _rental_returned(self, rental_id: str) -> None:
+        for listener in self._rental_listeners:
+            try:
+                listener.rental_returned(rental_id)
+            except Exception as e:
+                print(f"Error in rental listener: {e}")
 
     async def create_rental(
         self, rental_data: BookRentalCreateDto
     ) -> BookRentalResponseDto:
         """Create a new book rental"""
-        # Check if book exists and is available
-        book = await self.book_repository.get_by_id(rental_data.book_id)
-        if not book:
-            raise NotFoundException(f"Book with ID {rental_data.book_id} not found")
-
-        if book.available_copies <= 0:
-            raise ConflictException(f"Book '{book.title}' is not available for rental")
-
-        # Check if person exists
-        person = await self.person_repository.get_by_id(rental_data.person_id)
-        if not person:
-            raise NotFoundException(f"Person with ID {rental_data.person_id} not found")
-
-        # Create rental
-        rental = await self.repository.create(rental_data)
-
-        # Update book availability
-        await self.book_repository.update_available_copies(rental_data.book_id, -1)
+        if settings.mongo_transactions:
+            async with await get_client().start_session() as session:
+                async with session.start_transaction():
+                    rental = await self._checkout(rental_data, session)
+        else:
+            rental = await self._checkout(rental_data)
+        self._rental_created(str(rental.id), rental.due_date)
 
         return BookRentalResponseDto(
             id=str(rental.id),
@@ -53,6 +102,158 @@ class BookRentalService:
             status=rental.status,
         )
 
+    async def _checkout(self, rental_data: BookRentalCreateDto, session=None):
+        """Reserve a copy and insert the rental.
+
+        The copy is reserved with a guarded $inc while the person lookup runs
+        concurrently, so a checkout costs two sequential round trips. A session
+        can't be shared by concurrent operations, so inside a transaction the
+        two run one after the other. Without a transaction the reservation is
+        released again if the rental can't be created.
+        """
+        if session is None:
+            book, person_exists = await asyncio.gather(
+                self.book_repository.checkout_copy(rental_data.book_id),
+                self.person_repository.exists(rental_data.person_id),
+                return_exceptions=True,
+            )
+            if isinstance(book, BaseException):
+                raise book
+        else:
+            book = await self.book_repository.checkout_copy(
+                rental_data.book_id, session=session
+            )
+            person_exists = await self.person_repository.exists(
+                rental_data.person_id, session=session
+            )
+
+        if not book:
+            book = await self.book_repository.get_by_id(rental_data.book_id)
+            if not book:
+                raise NotFoundException(f"Book with ID {rental_data.book_id} not found")
+            raise ConflictException(f"Book '{book.title}' is not available for rental")
+
+        try:
+            if isinstance(person_exists, BaseException):
+                raise person_exists
+            if not person_exists:
+                raise NotFoundException(
+                    f"Person with ID {rental_data.person_id} not found"
+                )
+            return await self.repository.create(rental_data, session=session)
+        except Exception:
+            if session is None:
+                await self.book_repository.release_copy(rental_data.book_id)
+            raise
+
+    async def create_rentals_batch(
+        self, batch_data: BookRentalBatchCreateDto
+    ) -> BookRentalBatchResultDto:
+        """Check out several books for one person at once.
+
+        The person and all books are looked up concurrently, copies are
+        reserved with concurrent guarded updates and the rentals are inserted
+        together, in one transaction when MONGO_TRANSACTIONS is on. Each book
+        gets its own outcome.
+        """
+        if not ObjectId.is_valid(batch_data.person_id):
+            raise NotFoundException(f"Person with ID {batch_data.person_id} not found")
+
+        valid_ids = list({book_id for book_id in batch_data.book_ids if ObjectId.is_valid(book_id)})
+        person_exists, books = await asyncio.gather(
+            self.person_repository.exists(batch_data.person_id),
+            self.book_repository.get_by_ids(valid_ids),
+        )
+        if not person_exists:
+            raise NotFoundException(f"Person with ID {batch_data.person_id} not found")
+
+        books_by_id = {str(book.id): book for book in books}
+        results = {}
+        candidates = []
+        for index, book_id in enumerate(batch_data.book_ids):
+            if book_id in books_by_id:
+                candidates.append(index)
+            else:
+                results[index] = BookRentalBatchItemDto(
+                    index=index, error=f"Book with ID {book_id} not found"
+                )
+
+        candidate_ids = [batch_data.book_ids[index] for index in candidates]
+        if settings.mongo_transactions:
+            async with await get_client().start_session() as session:
+                async with session.start_transaction():
+                    reserved, rentals = await self._checkout_batch(
+                        candidate_ids, batch_data, session
+                    )
+        else:
+            reserved, rentals = await self._checkout_batch(candidate_ids, batch_data)
+
+        to_create = []
+        for index, ok in zip(candidates, reserved):
+            if ok:
+                to_create.append(index)
+            else:
+                book = books_by_id[batch_data.book_ids[index]]
+                results[index] = BookRentalBatchItemDto(
+                    index=index,
+                    error=f"Book '{book.title}' is not available for rental",
+                )
+
+        for index, rental in zip(to_create, rentals):
+            self._rental_created(str(rental.id), rental.due_date)
+            results[index] = BookRentalBatchItemDto(
+                index=index,
+                rental=BookRentalResponseDto(
+                    id=str(rental.id),
+                    book_id=rental.book_id,
+                    person_id=rental.person_id,
+                    rental_date=rental.rental_date,
+                    due_date=rental.due_date,
+                    return_date=rental.return_date,
+                    status=rental.status,
+                ),
+            )
+
+        return self._batch_result(results)
+
+    async def _checkout_batch(
+        self, book_ids: List[str], batch_data: BookRentalBatchCreateDto, session=None
+    ):
+        """Reserve a copy per book and insert a rental for every copy reserved.
+
+        Returns whether each book was reserved and the rentals created. Without
+        a transaction, copies reserved before an error are given back.
+        """
+        try:
+            reserved = await self.book_repository.checkout_copies(
+                book_ids, session=session
+            )
+        except GuardedUpdateError as e:
+            if session is None:
+                await self.book_repository.release_copies(
+                    [book_id for book_id, ok in zip(book_ids, e.applied) if ok]
+                )
+            raise e.error
+
+        reserved_ids = [book_id for book_id, ok in zip(book_ids, reserved) if ok]
+        try:
+            rentals = await self.repository.create_many(
+                [
+                    BookRentalCreateDto(
+                        book_id=book_id,
+                        person_id=batch_data.person_id,
+                        due_date=batch_data.due_date,
+                    )
+                    for book_id in reserved_ids
+                ],
+                session=session,
+            )
+        except Exception:
+            if session is None:
+                await self.book_repository.release_copies(reserved_ids)
+            raise
+        return reserved, rentals
+
     async def get_rental_by_id(self, rental_id: str) -> BookRentalDetailDto:
         """Get a rental by ID with detailed information"""
         rental = await self.repository.get_by_id(rental_id)
@@ -60,8 +261,10 @@ class BookRentalService:
             raise NotFoundException(f"Rental with ID {rental_id} not found")
 
         # Get book and person details
-        book = await self.book_repository.get_by_id(rental.book_id)
-        person = await self.person_repository.get_by_id(rental.person_id)
+        book, person = await asyncio.gather(
+            self.book_repository.get_summary(rental.book_id),
+            self.person_repository.get_summary(rental.person_id),
+        )
 
         return BookRentalDetailDto(
             id=str(rental.id),
@@ -71,38 +274,185 @@ class BookRentalService:
             due_date=rental.due_date,
             return_date=rental.return_date,
             status=rental.status,
-            book_title=book.title if book else None,
-            person_name=person.name if person else None,
-            person_email=person.email if person else None,
+            book_title=book["title"] if book else None,
+            person_name=person["name"] if person else None,
+            person_email=person["email"] if person else None,
         )
 
     async def get_all_rentals(
-        self, skip: int = 0, limit: int = 100
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order_by: str = "id",
     ) -> List[BookRentalResponseDto]:
         """Get all rentals with pagination"""
-        rentals = await self.repository.get_all(skip, limit)
-        return [
-            BookRentalResponseDto(
-                id=str(rental.id),
-                book_id=rental.book_id,
-                person_id=rental.person_id,
-                rental_date=rental.rental_date,
-                due_date=rental.due_date,
-                return_date=rental.return_date,
-                status=rental.status,
+        after_id = None
+        after_due_date = None
+        if cursor:
+            values = decode_cursor(cursor)
+            after_id = values["id"]
+            if order_by == "due_date":
+                try:
+                    after_due_date = datetime.fromisoformat(values["due_date"])
+                except (KeyError, TypeError, ValueError):
+                    raise BadRequestException("Invalid pagination cursor")
+
+        rentals = await self.repository.get_all_raw(
+            RESPONSE_PROJECTION, skip, limit, order_by, after_id, after_due_date
+        )
+        return [self._to_response_dto(rental) for rental in rentals]
+
+    @staticmethod
+    def _to_response_dto(document: Dict[str, Any]) -> BookRentalResponseDto:
+        """Build a response from a projected raw document without re-validating it"""
+        document["id"] = str(document.pop("_id"))
+        document["status"] = RentalStatus(document["status"])
+        return BookRentalResponseDto.model_construct(**document)
+
+    async def return_books_batch(
+        self, batch_data: BookRentalBatchReturnDto
+    ) -> BookRentalBatchResultDto:
+        """Return several rentals at once.
+
+        Rentals are looked up with one query, flipped to returned with
+        concurrent guarded updates and their copies given back with one bulk
+        write, in one transaction when MONGO_TRANSACTIONS is on. Each rental
+        gets its own outcome.
+        """
+        valid_ids = list({rental_id for rental_id in batch_data.rental_ids if ObjectId.is_valid(rental_id)})
+        rentals_by_id = {
+            str(rental.id): rental
+            for rental in await self.repository.get_by_ids(valid_ids)
+        }
+
+        results = {}
+        candidates = []
+        for index, rental_id in enumerate(batch_data.rental_ids):
+            if rental_id in rentals_by_id:
+                candidates.append(index)
+            else:
+                results[index] = BookRentalBatchItemDto(
+                    index=index, error=f"Rental with ID {rental_id} not found"
+                )
+
+        rental_ids = [batch_data.rental_ids[index] for index in candidates]
+        return_date = datetime.now()
+        if settings.mongo_transactions:
+            async with await get_client().start_session() as session:
+                async with session.start_transaction():
+                    returned = await self._return_batch(
+                        rental_ids, rentals_by_id, return_date, session
+                    )
+        else:
+            returned = await self._return_batch(rental_ids, rentals_by_id, return_date)
+
+        for index, ok in zip(candidates, returned):
+            rental_id = batch_data.rental_ids[index]
+            if not ok:
+                results[index] = BookRentalBatchItemDto(
+                    index=index, error=f"Rental with ID {rental_id} was already returned"
+                )
+                continue
+
+            rental = rentals_by_id[rental_id]
+            self._rental_returned(rental_id)
+            results[index] = BookRentalBatchItemDto(
+                index=index,
+                rental=BookRentalResponseDto(
+                    id=rental_id,
+                    book_id=rental.book_id,
+                    person_id=rental.person_id,
+                    rental_date=rental.rental_date,
+                    due_date=rental.due_date,
+                    return_date=return_date,
+                    status=RentalStatus.RETURNED,
+                ),
             )
-            for rental in rentals
-        ]
 
-    async def return_book(self, rental_id: str) -> BookRentalResponseDto:
-        """Return a rented book"""
-        rental = await self.repository.get_by_id(rental_id)
-        if not rental:
-            raise NotFoundException(f"Rental with ID {rental_id} not found")
+        return self._batch_result(results)
+
+    async def _return_batch(
+        self,
+        rental_ids: List[str],
+        rentals_by_id: Dict[str, BookRentalModel],
+        return_date: datetime,
+        session=None,
+    ) -> List[bool]:
+        """Flip the rentals to returned, then give their copies back.
+
+        Returns whether each rental was flipped. Without a transaction, copies
+        of rentals flipped before an error are still given back, and if giving
+        them back fails the rentals are put back to their previous status.
+        """
+        try:
+            returned = await self.repository.return_many(
+                rental_ids, return_date, session=session
+            )
+        except GuardedUpdateError as e:
+            if session is None:
+                await self.book_repository.release_copies(
+                    [
+                        rentals_by_id[rental_id].book_id
+                        for rental_id, ok in zip(rental_ids, e.applied)
+                        if ok
+                    ]
+                )
+            raise e.error
+
+        returned_ids = [rental_id for rental_id, ok in zip(rental_ids, returned) if ok]
+        try:
+            await self.book_repository.release_copies(
+                [rentals_by_id[rental_id].book_id for rental_id in returned_ids],
+                session=session,
+            )
+        except Exception:
+            if session is None:
+                await self.repository.undo_returns(
+                    {
+                        rental_id: rentals_by_id[rental_id].status
+                        for rental_id in returned_ids
+                    },
+                    return_date,
+                )
+            raise
+        return returned
+
+    @staticmethod
+    def _batch_result(
+        results: Dict[int, BookRentalBatchItemDto]
+    ) -> BookRentalBatchResultDto:
+        """Collect per-item outcomes in request order"""
+        items = [results[index] for index in sorted(results)]
+        failed = sum(1 for item in items if item.error)
+        return BookRentalBatchResultDto(
+            succeeded=len(items) - failed, failed=failed, results=items
+        )
 
-        returned_rental = await self.repository.return_book(rental_id)
+    def export_rentals(
+        self,
+        fields: Optional[str] = None,
+        batch_size: int = 1000,
+        status: Optional[RentalStatus] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream rentals matching the filters as newline-delimited JSON"""
+        projection = build_projection(fields, BookRentalResponseDto.model_fields)
+        cursor = self.repository.stream_raw(
+            projection, batch_size, status, due_after, due_before
+        )
+        return ndjson_stream(cursor, batch_size)
 
-        await self.book_repository.update_available_copies(rental.book_id, 1)
+    async def return_book(self, rental_id: str) -> BookRentalResponseDto:
+        """Return a rented book"""
+        if settings.mongo_transactions:
+            async with await get_client().start_session() as session:
+                async with session.start_transaction():
+                    returned_rental = await self._return(rental_id, session)
+        else:
+            returned_rental = await self._return(rental_id)
+        self._rental_returned(rental_id)
 
         return BookRentalResponseDto(
             id=str(returned_rental.id),
@@ -114,11 +464,30 @@ class BookRentalService:
             status=returned_rental.status,
         )
 
+    async def _return(self, rental_id: str, session=None):
+        """Flip the rental to returned, then give its copy back"""
+        returned_rental = await self.repository.return_book(rental_id, session=session)
+        if not returned_rental:
+            if not await self.repository.get_by_id(rental_id):
+                raise NotFoundException(f"Rental with ID {rental_id} not found")
+            raise ConflictException(f"Rental with ID {rental_id} was already returned")
+
+        await self.book_repository.release_copy(returned_rental.book_id, session=session)
+        return returned_rental
+
     async def send_notification(
         self, rental: BookRentalDetailDto, notification_type: str
     ):
         """Send notification message to queue"""
-        message = {
+        await self.notification_queue.publish_async(
+            self._notification_message(rental, notification_type)
+        )
+
+    @staticmethod
+    def _notification_message(
+        rental: BookRentalDetailDto, notification_type: str
+    ) -> Dict[str, Any]:
+        return {
             "type": notification_type,
             "rental_id": rental.id,
             "book_title": rental.book_title,
@@ -129,15 +498,73 @@ class BookRentalService:
             "timestamp": datetime.now().isoformat(),
         }
 
-        self.notification_queue.publish(message)
+    async def check_and_send_notifications(self, batch_size: int = 500):
+        """Check for rentals that need notifications and send them.
+
+        Overdue rentals are joined with their book and person in a single
+        aggregation and published (or written to the outbox) batch by batch;
+        each batch is then marked overdue by id, so only rentals that were
+        notified are marked. Outbox ids are derived from the rental, so a
+        sweep that is retried after failing halfway doesn't queue
+        notifications twice.
+        """
+        cutoff_date = datetime.now()
+        async for batch in self.repository.iter_overdue_details(
+            cutoff_date, batch_size
+        ):
+            await self._notify_batch(batch)
+
+    async def notify_overdue(self, rental_ids: List[str], batch_size: int = 500):
+        """Send overdue notifications for the given rentals, skipping any
+        that were returned, already marked overdue or are not due yet"""
+        cutoff_date = datetime.now()
+        for start in range(0, len(rental_ids), batch_size):
+            async for batch in self.repository.iter_overdue_details(
+                cutoff_date, batch_size, rental_ids[start:start + batch_size]
+            ):
+                await self._notify_batch(batch)
+
+    async def _notify_batch(self, batch: List[Dict[str, Any]]):
+        if settings.mongo_transactions and settings.notification_outbox:
+            # Outbox entries and the status change commit together
+            async with await get_client().start_session() as session:
+                async with session.start_transaction():
+                    await self._mark_batch_overdue(batch, session)
+        else:
+            await self._mark_batch_overdue(batch)
 
-    async def check_and_send_notifications(self):
-        """Check for rentals that need notifications and send them"""
-        rentals_overdue = await self.repository.get_rentals_overdue()
-        for rental in rentals_overdue:
-            rental_detail = await self.get_rental_by_id(str(rental.id))
-            await self.send_notification(rental_detail, "overdue")
+    async def _mark_batch_overdue(self, batch: List[Dict[str, Any]], session=None):
+        await self._publish_overdue(batch, session)
+        await self.repository.mark_as_overdue(
+            [str(document["_id"]) for document in batch], session=session
+        )
+
+    async def _publish_overdue(self, batch: List[Dict[str, Any]], session=None):
+        """Queue an overdue notification per rental, through the outbox
+        unless NOTIFICATION_OUTBOX is off"""
+        messages = []
+        for document in batch:
+            rental_detail = BookRentalDetailDto(
+                id=str(document["_id"]),
+                book_id=document["book_id"],
+                person_id=document["person_id"],
+                rental_date=document["rental_date"],
+                due_date=document["due_date"],
+                return_date=document.get("return_date"),
+                status=document["status"],
+                book_title=document.get("book_title"),
+                person_name=document.get("person_name"),
+                person_email=document.get("person_email"),
+            )
+            messages.append(
+                (
+                    f"overdue:{rental_detail.id}",
+                    self._notification_message(rental_detail, "overdue"),
+                )
+            )
 
-        overdue_ids = [str(rental.id) for rental in rentals_overdue]
-        if overdue_ids:
-            await self.repository.mark_as_overdue(overdue_ids)
+        if settings.notification_outbox:
+            await self.outbox.add(self.notification_queue.name, messages, session)
+            return
+        for _, message in messages:
+            await self.notification_queue.publish_async(message)
@@ -0,0 +1,309 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+from beanie import PydanticObjectId
+from datetime import datetime
+from src.api.models.BookRental import BookRentalModel, RentalStatus
+from src.api.modules.BookRental.BookRentalDtos import (
+    BookRentalCreateDto,
+    BookRentalUpdateDto,
+)
+from src.api.modules.BookRental.BookRentalRepositoryABC import BookRentalRepositoryABC
+from src.api.modules.Book.InMemoryBookRepository import InMemoryBookRepository
+from src.api.modules.Person.InMemoryPersonRepository import InMemoryPersonRepository
+from src.core.in_memory import (
+    InMemoryCollection,
+    iter_documents,
+    object_id,
+    to_model,
+)
+
+DUE_DATE_PROJECTION = {"due_date": 1}
+
+
+class InMemoryBookRentalRepository(BookRentalRepositoryABC):
+    """BookRentalRepository kept in process memory, for benchmarks and local
+    runs without MongoDB.
+
+    Overdue details are joined against the given in-memory book and person
+    repositories, the way the Mongo repository looks them up in the books
+    and persons collections.
+    """
+
+    def __init__(
+        self,
+        book_repository: Optional[InMemoryBookRepository] = None,
+        person_repository: Optional[InMemoryPersonRepository] = None,
+    ):
+        self.collection = InMemoryCollection("book_rentals")
+        self.book_repository = book_repository or InMemoryBookRepository()
+        self.person_repository = person_repository or InMemoryPersonRepository()
+
+    @staticmethod
+    def _new_document(rental_data: BookRentalCreateDto) -> Dict[str, Any]:
+        return {
+            "_id": PydanticObjectId(),
+            "rental_date": datetime.now(),
+            "return_date": None,
+            "status": RentalStatus.ACTIVE,
+            **rental_data.model_dump(),
+        }
+
+    async def create(
+        self, rental_data: BookRentalCreateDto, session=None
+    ) -> BookRentalModel:
+        """Create a new book rental"""
+        document = self.collection.insert(self._new_document(rental_data))
+        return to_model(BookRentalModel, document)
+
+    async def create_many(
+        self, rentals_data: List[BookRentalCreateDto], session=None
+    ) -> List[BookRentalModel]:
+        """Create many rentals at once"""
+        return [await self.create(rental_data) for rental_data in rentals_data]
+
+    async def update(
+        self, rental_id: str, update_data: BookRentalUpdateDto
+    ) -> Optional[BookRentalModel]:
+        """Update a rental"""
+        document = self.collection.get(object_id(rental_id))
+        if document is None:
+            return None
+        document.update(update_data.model_dump(exclude_unset=True))
+        return to_model(BookRentalModel, document)
+
+    async def get_by_id(self, rental_id: str) -> Optional[BookRentalModel]:
+        """Get a rental by ID"""
+        document = self.collection.get(object_id(rental_id))
+        return to_model(BookRentalModel, document) if document else None
+
+    def _page(
+        self,
+        projection: Optional[Dict[str, Any]],
+        skip: int,
+        limit: int,
+        order_by: str,
+        after_id: Optional[str],
+        after_due_date: Optional[datetime],
+    ) -> List[Dict[str, Any]]:
+        if order_by != "due_date":
+            return self.collection.find(
+                projection=projection,
+                skip=skip,
+                limit=limit,
+                after_id=object_id(after_id) if after_id else None,
+            )
+
+        matches = None
+        if after_id:
+            after = (after_due_date, object_id(after_id))
+            matches = lambda document: (document["due_date"], document["_id"]) > after
+        return self.collection.find(
+            matches,
+            projection,
+            skip,
+            limit,
+            sort_key=lambda document: (document["due_date"], document["_id"]),
+        )
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "id",
+        after_id: Optional[str] = None,
+        after_due_date: Optional[datetime] = None,
+    ) -> List[BookRentalModel]:
+        """Get all rentals with pagination, ordered by ID or by due date"""
+        documents = self._page(None, skip, limit, order_by, after_id, after_due_date)
+        return [to_model(BookRentalModel, document) for document in documents]
+
+    async def get_by_ids(self, rental_ids: List[str]) -> List[BookRentalModel]:
+        """Get all rentals with the given IDs"""
+        documents = (
+            self.collection.get(object_id(rental_id)) for rental_id in set(rental_ids)
+        )
+        return [to_model(BookRentalModel, document) for document in documents if document]
+
+    async def get_all_raw(
+        self,
+        projection: Optional[Dict[str, Any]],
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "id",
+        after_id: Optional[str] = None,
+        after_due_date: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same as get_all, but returns projected raw documents"""
+        return self._page(projection, skip, limit, order_by, after_id, after_due_date)
+
+    def stream_raw(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+        status: Optional[RentalStatus] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over raw rental documents matching the filters"""
+
+        def matches(document: Dict[str, Any]) -> bool:
+            return (
+                (not status or document["status"] == status)
+                and (not due_after or document["due_date"] >= due_after)
+                and (not due_before or document["due_date"] < due_before)
+            )
+
+        return iter_documents(self.collection.find(matches, projection))
+
+    async def _find_models(self, matches) -> List[BookRentalModel]:
+        return [
+            to_model(BookRentalModel, document)
+            for document in self.collection.find(matches)
+        ]
+
+    async def get_by_person_id(self, person_id: str) -> List[BookRentalModel]:
+        """Get all rentals for a specific person"""
+        return await self._find_models(lambda document: document["person_id"] == person_id)
+
+    async def get_by_book_id(self, book_id: str) -> List[BookRentalModel]:
+        """Get all rentals for a specific book"""
+        return await self._find_models(lambda document: document["book_id"] == book_id)
+
+    async def get_active_rentals(self) -> List[BookRentalModel]:
+        """Get all active rentals"""
+        return await self._find_models(
+            lambda document: document["status"] == RentalStatus.ACTIVE
+        )
+
+    async def get_overdue_rentals(self) -> List[BookRentalModel]:
+        """Get all rentals marked overdue"""
+        return await self._find_models(
+            lambda document: document["status"] == RentalStatus.OVERDUE
+        )
+
+    async def get_rentals_overdue(self) -> List[BookRentalModel]:
+        """Get active rentals past their due date"""
+        return await self._find_models(self._active_due_before(datetime.now()))
+
+    @staticmethod
+    def _active_due_before(cutoff_date: datetime):
+        return lambda document: (
+            document["status"] == RentalStatus.ACTIVE
+            and document["due_date"] < cutoff_date
+        )
+
+    async def iter_due_between(
+        self,
+        after: Optional[datetime],
+        until: datetime,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the id and due date of active rentals due after `after`
+        (if given) and at or before `until`, earliest first"""
+        documents = self.collection.find(
+            lambda document: (
+                document["status"] == RentalStatus.ACTIVE
+                and document["due_date"] <= until
+                and (after is None or document["due_date"] > after)
+            ),
+            DUE_DATE_PROJECTION,
+            sort_key=lambda document: document["due_date"],
+        )
+        for document in documents:
+            yield document
+
+    async def iter_created_after(
+        self, after_id: PydanticObjectId, until: datetime, batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the id and due date of active rentals created after the
+        rental `after_id` and due at or before `until`, oldest first"""
+        documents = self.collection.find(
+            lambda document: (
+                document["status"] == RentalStatus.ACTIVE
+                and document["due_date"] <= until
+            ),
+            DUE_DATE_PROJECTION,
+            after_id=after_id,
+        )
+        for document in documents:
+            yield document
+
+    async def iter_overdue_details(
+        self,
+        cutoff_date: datetime,
+        batch_size: int = 500,
+        rental_ids: Optional[List[str]] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream active rentals due before cutoff_date (optionally only the
+        given ones) with their book title and person name/email, in batches"""
+        overdue = self._active_due_before(cutoff_date)
+        if rental_ids is not None:
+            ids = {object_id(rental_id) for rental_id in rental_ids}
+            matches = lambda document: document["_id"] in ids and overdue(document)
+        else:
+            matches = overdue
+
+        batch = []
+        for document in self.collection.find(matches):
+            book = self.book_repository.collection.get(object_id(document["book_id"]))
+            person = self.person_repository.collection.get(object_id(document["person_id"]))
+            document["book_title"] = book["title"] if book else None
+            document["person_name"] = person["name"] if person else None
+            document["person_email"] = person["email"] if person else None
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def mark_as_overdue(
+        self, rental_ids: List[str], chunk_size: int = 1000, session=None
+    ) -> int:
+        """Mark the given active rentals as overdue"""
+        modified = 0
+        for rental_id in rental_ids:
+            document = self.collection.get(object_id(rental_id))
+            if document is not None and document["status"] == RentalStatus.ACTIVE:
+                document["status"] = RentalStatus.OVERDUE
+                modified += 1
+        return modified
+
+    async def return_book(
+        self, rental_id: str, session=None
+    ) -> Optional[BookRentalModel]:
+        """Mark an unreturned rental as returned"""
+        document = self.collection.get(object_id(rental_id))
+        if document is None or document["status"] == RentalStatus.RETURNED:
+            return None
+        document["return_date"] = datetime.now()
+        document["status"] = RentalStatus.RETURNED
+        return to_model(BookRentalModel, document)
+
+    async def return_many(
+        self, rental_ids: List[str], return_date: datetime, session=None
+    ) -> List[bool]:
+        """Mark many unreturned rentals as returned"""
+        returned = []
+        for rental_id in rental_ids:
+            document = self.collection.get(object_id(rental_id))
+            ok = document is not None and document["status"] != RentalStatus.RETURNED
+            if ok:
+                document["return_date"] = return_date
+                document["status"] = RentalStatus.RETURNED
+            returned.append(ok)
+        return returned
+
+    async def undo_returns(
+        self, statuses: Dict[str, RentalStatus], return_date: datetime
+    ) -> None:
+        """Put rentals returned by return_many at return_date back to the
+        status they had before"""
+        for rental_id, status in statuses.items():
+            document = self.collection.get(object_id(rental_id))
+            if (
+                document is not None
+                and document["status"] == RentalStatus.RETURNED
+                and document["return_date"] == return_date
+            ):
+                document["return_date"] = None
+                document["status"] = status
@@ -0,0 +1,54 @@
+from typing import Any, Dict, Optional
+from src.api.models.Person import PersonModel
+from src.api.modules.Person.PersonRepository import PersonRepository
+from src.core.cache import LRUTTLCache
+from src.core.config import get_settings
+
+settings = get_settings()
+
+
+class CachedPersonRepository(PersonRepository):
+    """PersonRepository with a read-through cache in front of lookups by ID.
+
+    In "full" mode whole documents are cached; in "immutable" mode only
+    name and email are.
+    """
+
+    cache = LRUTTLCache(settings.lookup_cache_size, settings.lookup_cache_ttl)
+
+    def __init__(self, mode: str = settings.lookup_cache_mode):
+        self.mode = mode
+
+    async def get_by_id(self, person_id: str) -> Optional[PersonModel]:
+        """Get a person by ID"""
+        if self.mode != "full":
+            return await super().get_by_id(person_id)
+
+        key = ("person", person_id)
+        person = self.cache.get(key)
+        if person is None:
+            person = await super().get_by_id(person_id)
+            if person is not None:
+                self.cache.set(key, person)
+        return person
+
+    async def get_summary(self, person_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the immutable fields (name, email) of a person"""
+        if self.mode == "off":
+            return await super().get_summary(person_id)
+
+        key = ("person_summary", person_id)
+        summary = self.cache.get(key)
+        if summary is None:
+            summary = await super().get_summary(person_id)
+            if summary is not None:
+                self.cache.set(key, summary)
+        return summary
+
+    async def exists(self, person_id: str, session=None) -> bool:
+        """Check whether a person exists, answering from the cache when possible"""
+        if session is None and self.mode != "off":
+            key = ("person", person_id) if self.mode == "full" else ("person_summary", person_id)
+            if self.cache.get(key) is not None:
+                return True
+        return await super().exists(person_id, session=session)
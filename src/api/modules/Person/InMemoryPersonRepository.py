@@ -0,0 +1,73 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+from src.api.models.Person import PersonModel
+from src.api.modules.Person.PersonDtos import PersonCreateDto
+from src.api.modules.Person.PersonRepositoryABC import PersonRepositoryABC
+from src.core.in_memory import (
+    InMemoryCollection,
+    iter_documents,
+    object_id,
+    project,
+    to_model,
+)
+
+
+class InMemoryPersonRepository(PersonRepositoryABC):
+    """PersonRepository kept in process memory, for benchmarks and local
+    runs without MongoDB"""
+
+    def __init__(self):
+        self.collection = InMemoryCollection("persons", unique={"email_unique": "email"})
+
+    async def create(self, person_data: PersonCreateDto) -> PersonModel:
+        """Create a new person"""
+        return to_model(PersonModel, self.collection.insert(person_data.model_dump()))
+
+    async def insert_many(self, documents: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Insert validated raw documents unordered"""
+        return self.collection.insert_many(documents)
+
+    async def get_by_id(self, person_id: str) -> Optional[PersonModel]:
+        """Get a person by ID"""
+        document = self.collection.get(object_id(person_id))
+        return to_model(PersonModel, document) if document else None
+
+    async def get_summary(self, person_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the immutable fields (name, email) of a person"""
+        document = self.collection.get(object_id(person_id))
+        if document is None:
+            return None
+        return project(document, {"_id": 0, "name": 1, "email": 1})
+
+    async def exists(self, person_id: str, session=None) -> bool:
+        """Check whether a person exists"""
+        return self.collection.get(object_id(person_id)) is not None
+
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, after_id: Optional[str] = None
+    ) -> List[PersonModel]:
+        """Get all people with pagination, ordered by ID"""
+        documents = await self.get_all_raw(None, skip, limit, after_id)
+        return [to_model(PersonModel, document) for document in documents]
+
+    async def get_all_raw(
+        self,
+        projection: Optional[Dict[str, Any]],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same as get_all, but returns projected raw documents"""
+        return self.collection.find(
+            projection=projection,
+            skip=skip,
+            limit=limit,
+            after_id=object_id(after_id) if after_id else None,
+        )
+
+    def stream_raw(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over every raw person document, ordered by ID"""
+        return iter_documents(self.collection.find(projection=projection))
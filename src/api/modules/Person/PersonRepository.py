@@ -1,20 +1,91 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from beanie import PydanticObjectId
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
 from src.api.models.Person import PersonModel
 from src.api.modules.Person.PersonDtos import PersonCreateDto
+from src.api.modules.Person.PersonRepositoryABC import PersonRepositoryABC
 
 
-class PersonRepository:
+class PersonRepository(PersonRepositoryABC):
 
     async def create(self, person_data: PersonCreateDto) -> PersonModel:
         """Create a new person"""
         person = PersonModel(**person_data.model_dump())
         return await person.insert()
 
+    async def insert_many(self, documents: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Insert validated raw documents unordered.
+
+        Returns the error message of every document that failed, by position.
+        """
+        try:
+            await PersonModel.get_motor_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            return {
+                error["index"]: error["errmsg"] for error in e.details["writeErrors"]
+            }
+        return {}
+
     async def get_by_id(self, person_id: str) -> Optional[PersonModel]:
         """Get a person by ID"""
         return await PersonModel.get(PydanticObjectId(person_id))
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[PersonModel]:
-        """Get all people with pagination"""
-        return await PersonModel.find().skip(skip).limit(limit).to_list()
+    async def get_summary(self, person_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the immutable fields (name, email) of a person"""
+        return await PersonModel.get_motor_collection().find_one(
+            {"_id": PydanticObjectId(person_id)}, {"_id": 0, "name": 1, "email": 1}
+        )
+
+    async def exists(self, person_id: str, session=None) -> bool:
+        """Check whether a person exists without loading the document"""
+        count = await PersonModel.find(
+            {"_id": PydanticObjectId(person_id)}, session=session
+        ).limit(1).count()
+        return count > 0
+
+    def _page_query(self, after_id: Optional[str]):
+        """Build the keyset filter and sort for a page of persons"""
+        query = {"_id": {"$gt": PydanticObjectId(after_id)}} if after_id else {}
+        return query, [("_id", ASCENDING)]
+
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, after_id: Optional[str] = None
+    ) -> List[PersonModel]:
+        """Get all people with pagination, ordered by ID.
+
+        after_id continues right after the given person (keyset pagination).
+        """
+        query, sort = self._page_query(after_id)
+        return await PersonModel.find(query).sort(sort).skip(skip).limit(limit).to_list()
+
+    async def get_all_raw(
+        self,
+        projection: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same as get_all, but returns projected raw documents without model parsing"""
+        query, sort = self._page_query(after_id)
+        cursor = (
+            PersonModel.get_motor_collection()
+            .find(query, projection)
+            .sort(sort)
+            .skip(skip)
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
+
+    def stream_raw(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+    ):
+        """Get a cursor over raw person documents, bypassing model parsing"""
+        return (
+            PersonModel.get_motor_collection()
+            .find({}, projection)
+            .sort([("_id", ASCENDING)])
+            .batch_size(batch_size)
+        )
@@ -0,0 +1,61 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterable, Dict, List, Optional
+from src.api.models.Person import PersonModel
+from src.api.modules.Person.PersonDtos import PersonCreateDto
+
+
+class PersonRepositoryABC(ABC):
+    """Abstract base class for person storage"""
+
+    @abstractmethod
+    async def create(self, person_data: PersonCreateDto) -> PersonModel:
+        """Create a new person"""
+        pass
+
+    @abstractmethod
+    async def insert_many(self, documents: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Insert validated raw documents unordered, returning the error
+        message of every document that failed, by position"""
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, person_id: str) -> Optional[PersonModel]:
+        """Get a person by ID"""
+        pass
+
+    @abstractmethod
+    async def get_summary(self, person_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the immutable fields (name, email) of a person"""
+        pass
+
+    @abstractmethod
+    async def exists(self, person_id: str, session=None) -> bool:
+        """Check whether a person exists"""
+        pass
+
+    @abstractmethod
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, after_id: Optional[str] = None
+    ) -> List[PersonModel]:
+        """Get all people with pagination, ordered by ID"""
+        pass
+
+    @abstractmethod
+    async def get_all_raw(
+        self,
+        projection: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same as get_all, but returns projected raw documents"""
+        pass
+
+    @abstractmethod
+    def stream_raw(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterable[Dict[str, Any]]:
+        """Iterate over every raw person document, ordered by ID"""
+        pass
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
 from src.api.modules.Person.PersonService import PersonService
 from src.api.modules.Person.PersonDtos import PersonCreateDto, PersonResponseDto
+from src.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from src.core.export import NDJSON_MEDIA_TYPE
+from src.core.bulk import BulkCreateResponseDto, iter_items, iter_ndjson
+from src.core.responses import DtoRoute
 
-router = APIRouter(prefix="/persons", tags=["persons"])
+router = APIRouter(prefix="/persons", tags=["persons"], route_class=DtoRoute)
 
 
-def get_person_service() -> PersonService:
-    return PersonService()
+def get_person_service(request: Request) -> PersonService:
+    return request.app.state.container.person_service
 
 
 @router.post("/", response_model=PersonResponseDto)
@@ -18,6 +23,38 @@ async def create_person(
     return await service.create_person(person_data)
 
 
+@router.post("/bulk", response_model=BulkCreateResponseDto)
+async def create_persons_bulk(
+    persons: List[Dict[str, Any]] = Body(...),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    service: PersonService = Depends(get_person_service),
+):
+    """Create many people; each item is validated and reported on its own"""
+    return await service.create_persons_bulk(iter_items(persons), chunk_size)
+
+
+@router.post("/bulk/ndjson", response_model=BulkCreateResponseDto)
+async def create_persons_bulk_ndjson(
+    request: Request,
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    service: PersonService = Depends(get_person_service),
+):
+    """Create many people from a newline-delimited JSON body, inserted as it streams in"""
+    return await service.create_persons_bulk(iter_ndjson(request.stream()), chunk_size)
+
+
+@router.get("/export")
+async def export_persons(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to include"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    service: PersonService = Depends(get_person_service),
+):
+    """Stream all people as newline-delimited JSON"""
+    return StreamingResponse(
+        service.export_persons(fields, batch_size), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
 @router.get("/{person_id}", response_model=PersonResponseDto)
 async def get_person(
     person_id: str, service: PersonService = Depends(get_person_service)
@@ -28,9 +65,18 @@ async def get_person(
 
 @router.get("/", response_model=List[PersonResponseDto])
 async def get_people(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     service: PersonService = Depends(get_person_service),
 ):
-    """Get all people with pagination"""
-    return await service.get_all(skip, limit)
+    """Get all people with pagination.
+
+    When a full page is returned, the X-Next-Cursor header holds the cursor
+    for the next page.
+    """
+    persons = await service.get_all(skip, limit, cursor)
+    if len(persons) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": persons[-1].id})
+    return persons
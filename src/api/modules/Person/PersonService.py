@@ -1,20 +1,35 @@
-from typing import List
-from src.api.modules.Person.PersonRepository import PersonRepository
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional
+from pymongo.errors import DuplicateKeyError
+from src.api.modules.Person.CachedPersonRepository import CachedPersonRepository
+from src.api.modules.Person.PersonRepositoryABC import PersonRepositoryABC
 from src.api.modules.Person.PersonDtos import (
     PersonCreateDto,
     PersonResponseDto,
 )
-from src.core.exceptions import NotFoundException
+from src.core.exceptions import ConflictException, NotFoundException
+from src.core.pagination import decode_cursor
+from src.core.export import build_projection, ndjson_stream
+from src.core.bulk import BulkCreateResponseDto, bulk_insert
+
+# Fields fetched for list endpoints, so Mongo only ships what the response needs
+RESPONSE_PROJECTION = {
+    field: 1 for field in PersonResponseDto.model_fields if field != "id"
+}
 
 
 class PersonService:
 
-    def __init__(self):
-        self.repository = PersonRepository()
+    def __init__(self, repository: Optional[PersonRepositoryABC] = None):
+        self.repository = repository or CachedPersonRepository()
 
     async def create_person(self, person_data: PersonCreateDto) -> PersonResponseDto:
         """Create a new person"""
-        person = await self.repository.create(person_data)
+        try:
+            person = await self.repository.create(person_data)
+        except DuplicateKeyError:
+            raise ConflictException(
+                f"A person with email {person_data.email} already exists"
+            )
         return PersonResponseDto(
             id=str(person.id),
             name=person.name,
@@ -24,6 +39,14 @@ class PersonService:
             address=person.address,
         )
 
+    async def create_persons_bulk(
+        self, items: AsyncIterable[Any], chunk_size: int = 1000
+    ) -> BulkCreateResponseDto:
+        """Create many persons, reporting the outcome of each item"""
+        return await bulk_insert(
+            items, PersonCreateDto, self.repository.insert_many, chunk_size
+        )
+
     async def get_person_by_id(self, person_id: str) -> PersonResponseDto:
         """Get a person by ID"""
         person = await self.repository.get_by_id(person_id)
@@ -40,18 +63,25 @@ class PersonService:
         )
 
     async def get_all(
-        self, skip: int = 0, limit: int = 100
+        self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[PersonResponseDto]:
         """Get all persons with pagination"""
-        persons = await self.repository.get_all(skip, limit)
-        return [
-            PersonResponseDto(
-                id=str(person.id),
-                name=person.name,
-                age=person.age,
-                email=person.email,
-                phone=person.phone,
-                address=person.address,
-            )
-            for person in persons
-        ]
+        after_id = decode_cursor(cursor)["id"] if cursor else None
+        persons = await self.repository.get_all_raw(
+            RESPONSE_PROJECTION, skip, limit, after_id
+        )
+        return [self._to_response_dto(person) for person in persons]
+
+    def export_persons(
+        self, fields: Optional[str] = None, batch_size: int = 1000
+    ) -> AsyncIterator[bytes]:
+        """Stream all persons as newline-delimited JSON"""
+        projection = build_projection(fields, PersonResponseDto.model_fields)
+        cursor = self.repository.stream_raw(projection, batch_size)
+        return ndjson_stream(cursor, batch_size)
+
+    @staticmethod
+    def _to_response_dto(document: Dict[str, Any]) -> PersonResponseDto:
+        """Build a response from a projected raw document without re-validating it"""
+        document["id"] = str(document.pop("_id"))
+        return PersonResponseDto.model_construct(**document)
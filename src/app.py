@@ -1,23 +1,37 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import asyncio
 
 from src.core.db import init_db
 from src.core.notification_scheduler import NotificationScheduler
+from src.core.leader_election import LeaderElector
+from src.core.config import get_settings
+from src.core.container import ServiceContainer
 from src.api.modules.Book.BookRouter import router as book_router
 from src.api.modules.Person.PersonRouter import router as person_router
 from src.api.modules.BookRental.BookRentalRouter import router as rental_router
+from src.api.modules.Book.CachedBookRepository import CachedBookRepository
+from src.api.modules.Person.CachedPersonRepository import CachedPersonRepository
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Starting up...")
     await init_db()
+
+    container = ServiceContainer()
+    await container.start()
+    app.state.container = container
     
-    scheduler = NotificationScheduler()
-    scheduler_task = asyncio.create_task(scheduler.start())
-    app.state.scheduler = scheduler
-    app.state.scheduler_task = scheduler_task
+    if get_settings().notification_scheduler_mode == "embedded":
+        # Every replica campaigns; only the lease holder runs the scheduler
+        scheduler = NotificationScheduler(container.rental_service)
+        elector = LeaderElector("notification_scheduler")
+        scheduler_task = asyncio.create_task(elector.run(scheduler.start))
+        app.state.scheduler = scheduler
+        app.state.scheduler_elector = elector
+        app.state.scheduler_task = scheduler_task
 
     yield
 
@@ -25,6 +39,9 @@ async def lifespan(app: FastAPI):
     
     if hasattr(app.state, "scheduler"):
         await app.state.scheduler.stop()
+
+    if hasattr(app.state, "scheduler_elector"):
+        await app.state.scheduler_elector.stop()
     
     if hasattr(app.state, "scheduler_task"):
         app.state.scheduler_task.cancel()
@@ -40,12 +57,16 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             print("Email worker stopped.")
 
+    if hasattr(app.state, "container"):
+        await app.state.container.stop()
+
 
 app = FastAPI(
     title="Book Rental API",
     description="A FastAPI backend for book rental management with notifications",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.include_router(book_router)
@@ -55,3 +76,11 @@ app.include_router(rental_router)
 @app.get("/")
 async def root():
     return {"message": "Book Rental API is running"}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters of the book and person lookup caches"""
+    return {
+        "books": CachedBookRepository.cache.stats(),
+        "persons": CachedPersonRepository.cache.stats(),
+    }
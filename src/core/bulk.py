@@ -0,0 +1,155 @@
+import asyncio
+import json
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from bson import ObjectId
+from pydantic import BaseModel, ValidationError
+
+
+class BulkItemResultDto(BaseModel):
+    index: int
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkCreateResponseDto(BaseModel):
+    inserted: int
+    failed: int
+    results: List[BulkItemResultDto]
+
+
+async def iter_items(items: Iterable[Any]) -> AsyncIterator[Any]:
+    """Adapt an in-memory list of items to the async interface of bulk_insert"""
+    for item in items:
+        yield item
+
+
+async def iter_ndjson(stream: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Parse a newline-delimited JSON body as it arrives.
+
+    Lines that are not valid JSON are yielded as the ValueError raised while
+    parsing them, so they can be reported without aborting the batch.
+    """
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+
+async def bulk_insert(
+    items: AsyncIterable[Any],
+    dto_class: Type[BaseModel],
+    insert_many: Callable[[List[Dict[str, Any]]], Awaitable[Dict[int, str]]],
+    chunk_size: int = 1000,
+) -> BulkCreateResponseDto:
+    """Validate items one by one and insert the valid ones in chunks.
+
+    insert_many receives documents with a pre-assigned _id and returns the
+    write errors of the chunk by position, so every item gets its own
+    outcome and a bad row never aborts the batch.
+    """
+    results: List[BulkItemResultDto] = []
+    pending: List[tuple[int, Dict[str, Any]]] = []
+
+    async def flush():
+        errors = await insert_many([document for _, document in pending])
+        for position, (index, document) in enumerate(pending):
+            if position in errors:
+                results.append(BulkItemResultDto(index=index, error=errors[position]))
+            else:
+                results.append(BulkItemResultDto(index=index, id=str(document["_id"])))
+        pending.clear()
+
+    index = 0
+    async for item in items:
+        try:
+            if isinstance(item, Exception):
+                raise item
+            document = dto_class.model_validate(item).model_dump()
+            document["_id"] = ObjectId()
+            pending.append((index, document))
+        except (ValidationError, ValueError) as e:
+            results.append(BulkItemResultDto(index=index, error=str(e)))
+        index += 1
+
+        if len(pending) >= chunk_size:
+            await flush()
+
+    if pending:
+        await flush()
+
+    results.sort(key=lambda result: result.index)
+    failed = sum(1 for result in results if result.error)
+    return BulkCreateResponseDto(
+        inserted=len(results) - failed, failed=failed, results=results
+    )
+
+
+class GuardedUpdateError(Exception):
+    """An update of guarded_update_many failed; `applied` tells, per
+    update, whether it went through before the error"""
+
+    def __init__(self, error: BaseException, applied: List[bool]):
+        super().__init__(str(error))
+        self.error = error
+        self.applied = applied
+
+
+async def guarded_update_many(
+    collection,
+    updates: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    session=None,
+) -> List[bool]:
+    """Apply conditional single-document updates and report which of them
+    matched.
+
+    Each update is its own update_one, so an update whose guard doesn't
+    match writes nothing. Without a session they all run concurrently, and
+    if any fails a GuardedUpdateError says which of the others were applied,
+    so the caller can undo them. A session can't be shared by concurrent
+    operations, so inside a transaction they run one after the other and
+    errors propagate as they are (aborting the transaction undoes them).
+    """
+    if session is not None:
+        return [
+            (await collection.update_one(query, update, session=session)).matched_count
+            == 1
+            for query, update in updates
+        ]
+
+    outcomes = await asyncio.gather(
+        *(collection.update_one(query, update) for query, update in updates),
+        return_exceptions=True,
+    )
+    applied = [
+        not isinstance(outcome, BaseException) and outcome.matched_count == 1
+        for outcome in outcomes
+    ]
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise GuardedUpdateError(outcome, applied)
+    return applied
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from src.api.modules.Book.BookRepositoryABC import BookRepositoryABC
+from src.api.modules.Book.BookService import BookService
+from src.api.modules.Book.CachedBookRepository import CachedBookRepository
+from src.api.modules.BookRental.BookRentalRepository import BookRentalRepository
+from src.api.modules.BookRental.BookRentalRepositoryABC import BookRentalRepositoryABC
+from src.api.modules.BookRental.BookRentalService import BookRentalService
+from src.api.modules.Person.CachedPersonRepository import CachedPersonRepository
+from src.api.modules.Person.PersonRepositoryABC import PersonRepositoryABC
+from src.api.modules.Person.PersonService import PersonService
+from src.core.message_brokers.abc import QueueABC
+from src.core.message_brokers.rabbitmq import AsyncRabbitMQQueue
+
+
+class ServiceContainer:
+    """Services, repositories and publishers shared by every request.
+
+    Built once in the app lifespan, so queues are declared at startup only
+    instead of on every request. Repositories and the queue default to the
+    MongoDB and RabbitMQ implementations; pass others (e.g. the in-memory
+    ones) to run without those services.
+    """
+
+    def __init__(
+        self,
+        book_repository: Optional[BookRepositoryABC] = None,
+        person_repository: Optional[PersonRepositoryABC] = None,
+        rental_repository: Optional[BookRentalRepositoryABC] = None,
+        notification_queue: Optional[QueueABC] = None,
+    ):
+        self.book_repository = book_repository or CachedBookRepository()
+        self.person_repository = person_repository or CachedPersonRepository()
+        self.rental_repository = rental_repository or BookRentalRepository()
+        self.notification_queue = notification_queue or AsyncRabbitMQQueue(
+            "book_rental_notifications"
+        )
+
+        self.book_service = BookService(self.book_repository)
+        self.person_service = PersonService(self.person_repository)
+        self.rental_service = BookRentalService(
+            self.rental_repository,
+            self.book_repository,
+            self.person_repository,
+            self.notification_queue,
+        )
+
+    async def start(self) -> None:
+        """Connect publishers and declare their queues"""
+        await self.notification_queue.start()
+
+    async def stop(self) -> None:
+        """Flush pending messages and release broker resources"""
+        await self.notification_queue.stop()
@@ -1,3 +1,4 @@
+from typing import Optional
 from beanie import init_beanie
 import motor.motor_asyncio
 
@@ -6,15 +7,28 @@ from src.api import models
 
 settings = get_settings()
 
+_client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
+
+
+def get_client() -> motor.motor_asyncio.AsyncIOMotorClient:
+    """Get the Mongo client created by init_db"""
+    if _client is None:
+        raise RuntimeError("Database not initialized. Call init_db first.")
+    return _client
+
 
 async def init_db():
-    client = motor.motor_asyncio.AsyncIOMotorClient(
+    global _client
+    _client = motor.motor_asyncio.AsyncIOMotorClient(
         settings.mongo_uri)
     await init_beanie(
-        database=client[settings.mongo_db_name], 
+        database=_client[settings.mongo_db_name], 
         document_models=[
             models.BookModel,
             models.PersonModel,
-            models.BookRentalModel
+            models.BookRentalModel,
+            models.LeaseModel,
+            models.StreamCheckpointModel,
+            models.OutboxModel,
         ]
     )
@@ -1,5 +1,6 @@
 from src.core.email.abc.smtp_client import SmtpClientABC
 from src.core.email.email_builder import EmailBuilder
 from src.core.email.mailgun.mailgun_client import MailgunClient
+from src.core.email.email_batcher import EmailBatcher
 
-__all__ = ['SmtpClientABC', 'EmailBuilder', 'MailgunClient']
\ No newline at end of file
+__all__ = ['SmtpClientABC', 'EmailBuilder', 'MailgunClient', 'EmailBatcher']
\ No newline at end of file
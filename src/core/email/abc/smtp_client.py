@@ -23,4 +23,33 @@ class SmtpClientABC(ABC):
         attachments: Optional[List[Dict[str, Any]]] = None
     ) -> bool:
         """Send an email using the configured SMTP service"""
-        pass
\ No newline at end of file
+        pass
+
+    async def send_batch(
+        self,
+        recipient_variables: Dict[str, Dict[str, Any]],
+        subject: str,
+        html_content: str,
+        from_email: Optional[str] = None,
+    ) -> bool:
+        """Send one email per recipient, replacing %recipient.<key>% in the
+        subject and content with that recipient's variables.
+
+        Providers with a native batch API should override this; the default
+        sends the emails one by one.
+        """
+        sent = True
+        for to_email, variables in recipient_variables.items():
+            personal_subject, personal_content = subject, html_content
+            for key, value in variables.items():
+                placeholder = f"%recipient.{key}%"
+                personal_subject = personal_subject.replace(placeholder, str(value))
+                personal_content = personal_content.replace(placeholder, str(value))
+            sent = await self.send_email(
+                to_email, personal_subject, personal_content, from_email=from_email
+            ) and sent
+        return sent
+
+    async def aclose(self) -> None:
+        """Release any connections held by the client"""
+        pass
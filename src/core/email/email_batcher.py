@@ -0,0 +1,140 @@
+import asyncio
+import html
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.core.email.abc.smtp_client import SmtpClientABC
+from src.core.config import get_settings
+
+settings = get_settings()
+
+BatchKey = Tuple[str, Optional[str], Tuple[str, ...]]
+
+
+class _Batch:
+    """Recipients collected for one template and the callers waiting on them"""
+
+    def __init__(self, timer: asyncio.TimerHandle):
+        self.timer = timer
+        self.recipients: Dict[str, Dict[str, Any]] = {}
+        self.waiters: List[asyncio.Future] = []
+
+
+class EmailBatcher:
+    """Coalesces emails that use the same template into batch sends.
+
+    Emails are grouped by template, sender and template data keys. A group
+    is rendered once with %recipient.<key>% placeholders and sent with the
+    per-recipient values as recipient variables when it reaches
+    max_recipients or window seconds after its first email. add() returns
+    once the batch holding the email has been sent, and raises if the
+    provider rejected it.
+    """
+
+    def __init__(
+        self,
+        client: SmtpClientABC,
+        render: Callable[[str, Dict[str, Any]], str],
+        window: Optional[float] = None,
+        max_recipients: Optional[int] = None,
+    ):
+        self._client = client
+        self._render = render
+        self._window = window if window is not None else settings.email_batch_window
+        self._max_recipients = max_recipients or settings.mailgun_batch_max_recipients
+        self._batches: Dict[BatchKey, _Batch] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def max_recipients(self) -> int:
+        return self._max_recipients
+
+    async def add(
+        self,
+        to_email: str,
+        subject: str,
+        template_name: str,
+        template_data: Dict[str, Any],
+        from_email: Optional[str] = None,
+    ) -> None:
+        """Add an email to its batch and wait until the batch is sent"""
+        key = (template_name, from_email, tuple(sorted(template_data)))
+        batch = self._batches.get(key)
+        if batch is not None and to_email in batch.recipients:
+            # Recipient variables are keyed by address, so a second email to
+            # the same person has to go in the next batch
+            self._flush(key)
+            batch = None
+
+        loop = asyncio.get_running_loop()
+        if batch is None:
+            batch = _Batch(loop.call_later(self._window, self._flush, key))
+            self._batches[key] = batch
+
+        waiter = loop.create_future()
+        # Mailgun substitutes recipient variables verbatim, so values that end
+        # up in the HTML are escaped here; the subject is plain text
+        batch.recipients[to_email] = {
+            **{name: html.escape(str(value)) for name, value in template_data.items()},
+            "subject": subject,
+        }
+        batch.waiters.append(waiter)
+        if len(batch.recipients) >= self._max_recipients:
+            self._flush(key)
+
+        await waiter
+
+    async def flush(self) -> None:
+        """Send every pending batch now and wait for the sends to finish"""
+        for key in list(self._batches):
+            self._flush(key)
+        if self._tasks:
+            await asyncio.wait(set(self._tasks))
+
+    def _flush(self, key: BatchKey) -> None:
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        task = asyncio.create_task(self._send(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, key: BatchKey, batch: _Batch) -> None:
+        template_name, from_email, data_keys = key
+        error: Optional[Exception] = None
+        try:
+            html_content = self._render(
+                template_name, {name: f"%recipient.{name}%" for name in data_keys}
+            )
+        except ValueError as e:
+            # Unknown template: retrying will not help, so drop the emails
+            print(f"Dropping {len(batch.recipients)} emails: {str(e)}")
+            html_content = None
+        except Exception as e:
+            error = e
+            html_content = None
+
+        if html_content is not None:
+            try:
+                sent = await self._client.send_batch(
+                    batch.recipients,
+                    "%recipient.subject%",
+                    html_content,
+                    from_email=from_email,
+                )
+                if not sent:
+                    error = RuntimeError(
+                        f"Batch of {len(batch.recipients)} '{template_name}' emails was rejected"
+                    )
+            except Exception as e:
+                error = e
+            if error is None:
+                print(f"Sent batch of {len(batch.recipients)} '{template_name}' emails")
+
+        for waiter in batch.waiters:
+            if waiter.done():
+                continue
+            if error is not None:
+                waiter.set_exception(error)
+            else:
+                waiter.set_result(None)
@@ -1,24 +1,32 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 import os
 
-from src.core.message_brokers.rabbitmq import RabbitMQQueue
-from src.core.email import MailgunClient, EmailBuilder
+from src.core.message_brokers.abc import QueueABC
+from src.core.message_brokers.rabbitmq import AsyncRabbitMQQueue
+from src.core.email import MailgunClient, EmailBatcher
+from src.core.email.email_templates import get_template_registry
 from src.core.config import get_settings
 
 settings = get_settings()
 load_dotenv()
 
+# Version of the template-based email message; messages carrying
+# html_content are the original, pre-rendered format
+EMAIL_MESSAGE_VERSION = 2
+
 
 class EmailQueueService:
     """Service to handle email sending through a message queue"""
 
-    def __init__(self, queue_name: str = "email_queue"):
-        self.queue = RabbitMQQueue(queue_name)
+    def __init__(self, queue_name: str = "email_queue", queue: Optional[QueueABC] = None):
+        self.queue = queue or AsyncRabbitMQQueue(queue_name)
         self.mailgun = MailgunClient(
             api_key=settings.mailgun_api_key or os.getenv("MAILGUN_API_KEY"),
             domain=settings.mailgun_domain or os.getenv("MAILGUN_DOMAIN"),
         )
+        self.templates = get_template_registry()
+        self.batcher = EmailBatcher(self.mailgun, self._build_email_content)
 
     async def start_consuming(self):
         """Start consuming messages from the queue"""
@@ -30,33 +38,102 @@ class EmailQueueService:
         async def process_message(message: Dict[str, Any]):
             try:
                 print(f"Processing new email message from queue")
-                await self.mailgun.send_email(**message)
+                await self._send_message(message)
             except Exception as e:
                 print(f"Error processing email message: {str(e)}")
                 raise
 
-        self.queue.setup_consumer(process_message)
+        # A batch only fills up if enough messages are in progress at once
+        batch_size = self.batcher.max_recipients
+        self.queue.setup_consumer(
+            process_message,
+            prefetch_count=max(settings.rabbitmq_prefetch_count, batch_size),
+            concurrency=max(settings.rabbitmq_consumer_concurrency, batch_size),
+        )
         await self.queue.start_consuming()
 
+    async def _send_message(self, message: Dict[str, Any]):
+        """Send a queued email, rendering it first if it was queued as
+        template name and data"""
+        if "html_content" in message:
+            if not await self.mailgun.send_email(**message):
+                raise RuntimeError(f"Email to {message['to_email']} was rejected")
+            return
+
+        version = message.pop("schema_version", EMAIL_MESSAGE_VERSION)
+        if version != EMAIL_MESSAGE_VERSION:
+            print(f"Dropping email message with unknown schema version {version}")
+            return
+
+        if message.pop("batch", False):
+            await self.batcher.add(**message)
+            return
+
+        try:
+            html_content = self._build_email_content(
+                message["template_name"], message["template_data"]
+            )
+        except ValueError as e:
+            # Unknown template: retrying will not help, so drop the email
+            print(f"Dropping email message: {str(e)}")
+            return
+
+        sent = await self.mailgun.send_email(
+            to_email=message["to_email"],
+            subject=message["subject"],
+            html_content=html_content,
+            from_email=message.get("from_email"),
+        )
+        if not sent:
+            # Raising lets the queue retry it with backoff
+            raise RuntimeError(f"Email to {message['to_email']} was rejected")
+
+    async def aclose(self):
+        """Close the Mailgun HTTP client"""
+        await self.mailgun.aclose()
+
     async def queue_email(
         self,
         to_email: str,
         subject: str,
         template_name: str,
         template_data: Dict[str, Any],
+        batch: bool = False,
     ) -> bool:
-        """Queue an email to be sent"""
+        """Queue an email to be sent.
+
+        With EMAIL_RENDER_AT_CONSUMER on, the email is queued as template
+        name and data and rendered by the email worker; otherwise it is
+        rendered here. With batch=True and the flag on, the worker sends it
+        together with other emails using the same template in one batch
+        request; with the flag off, batch is ignored, as older workers only
+        understand rendered messages.
+        """
         try:
-            html_content = self._build_email_content(template_name, template_data)
-
-            message = {
-                "to_email": to_email,
-                "subject": subject,
-                "html_content": html_content,
-                "from_email": f"{settings.mailgun_sender}@{settings.mailgun_domain}",
-            }
-
-            self.queue.publish(message)
+            from_email = f"{settings.mailgun_sender}@{settings.mailgun_domain}"
+            if settings.email_render_at_consumer:
+                self.templates.get(template_name)
+                message = {
+                    "schema_version": EMAIL_MESSAGE_VERSION,
+                    "to_email": to_email,
+                    "subject": subject,
+                    "template_name": template_name,
+                    "template_data": template_data,
+                    "from_email": from_email,
+                }
+                if batch:
+                    message["batch"] = True
+            else:
+                message = {
+                    "to_email": to_email,
+                    "subject": subject,
+                    "html_content": self._build_email_content(
+                        template_name, template_data
+                    ),
+                    "from_email": from_email,
+                }
+
+            await self.queue.publish_async(message)
             return True
 
         except Exception as e:
@@ -66,203 +143,5 @@ class EmailQueueService:
     def _build_email_content(
         self, template_name: str, template_data: Dict[str, Any]
     ) -> str:
-        """Build email content based on template name and data"""
-        builder = EmailBuilder()
-        company_name = settings.company_name
-        support_email = settings.support_email
-
-        match template_name:
-            case "welcome":
-                return (
-                    builder.add_header(f"Welcome to {company_name}!")
-                    .add_text(f"Hello {template_data.get('name', 'there')}!")
-                    .add_text("Thank you for joining us.")
-                    .add_text(
-                        "To get started, please verify your email address by clicking the button below:"
-                    )
-                    .add_button(
-                        "Verify Email", template_data.get("verification_url", "#")
-                    )
-                    .add_text(
-                        "If you didn't create this account, please ignore this email."
-                    )
-                    .add_footer(f"© 2025 {company_name}")
-                    .build()
-                )
-
-            case "verification_code":
-                code = template_data.get("code", "")
-                return (
-                    builder.add_header("Verify Your Email")
-                    .add_text(f"Hello {template_data.get('name', 'there')},")
-                    .add_text(
-                        "Please use the following code to verify your email address:"
-                    )
-                    .add_bold(code)
-                    .add_text("This code will expire in 30 minutes.")
-                    .add_text(
-                        "If you didn't request this code, please ignore this email."
-                    )
-                    .add_footer(f"© 2025 {company_name}")
-                    .build()
-                )
-
-            case "reset_password":
-                return (
-                    builder.add_header("Password Reset Request")
-                    .add_text(f"Hello {template_data.get('name', 'there')},")
-                    .add_text("We received a request to reset your password.")
-                    .add_text("Click the button below to create a new password:")
-                    .add_button("Reset Password", template_data.get("reset_url", "#"))
-                    .add_text("This link will expire in 60 minutes.")
-                    .add_text(
-                        "If you didn't request this change, please contact our support team immediately."
-                    )
-                    .add_divider()
-                    .add_text(f"Contact support: {support_email}")
-                    .add_footer(f"© 2025 {company_name}")
-                    .build()
-                )
-
-            case "password_changed":
-                return (
-                    builder.add_header("Password Changed Successfully")
-                    .add_text(f"Hello {template_data.get('name', 'there')},")
-                    .add_text("Your password has been changed successfully.")
-                    .add_text(
-                        "If you did not make this change, please contact our support team immediately:"
-                    )
-                    .add_link(support_email, f"mailto:{support_email}")
-                    .add_divider()
-                    .add_text("For your security, we recommend:")
-                    .add_list(
-                        [
-                            "Using a strong, unique password",
-                            "Enabling two-factor authentication if available",
-                            "Never sharing your password with others",
-                        ]
-                    )
-                    .add_footer(f"© 2025 {company_name}")
-                    .build()
-                )
-
-            case "account_deactivated":
-                return (
-                    builder.add_header("Account Deactivated")
-                    .add_text(f"Hello {template_data.get('name', 'there')},")
-                    .add_text("Your account has been deactivated as requested.")
-                    .add_text(
-                        "If you'd like to reactivate your account, you can do so by clicking the button below:"
-                    )
-                    .add_button(
-                        "Reactivate Account", template_data.get("reactivation_url", "#")
-                    )
-                    .add_text(
-                        "If you did not request this change, please contact our support team immediately."
-                    )
-                    .add_divider()
-                    .add_text(f"Contact support: {support_email}")
-                    .add_footer(f"© 2025 {company_name}")
-                    .build()
-                )
-
-            case "account_locked":
-                return (
-                    builder.add_header("Account Security Alert")
-                    .add_text(f"Hello {template_data.get('name', 'there')},")
-                    .add_text(
-                        "We detected unusual activity on your account and have temporarily locked it for your security."
-                    )
-                    .add_text("To unlock your account, please click the button below:")
-                    .add_button("Unlock Account", template_data.get("unlock_url", "#"))
-                    .add_divider()
-                    .add_text("Recent activity detected:")
-                    .add_list(
-                        [
-                            f"Time: {template_data.get('timestamp', 'Unknown')}",
-                            f"Location: {template_data.get('location', 'Unknown')}",
-                            f"IP Address: {template_data.get('ip_address', 'Unknown')}",
-                        ]
-                    )
-                    .add_text(
-                        "If this was you, you can safely unlock your account. If not, please contact support immediately."
-                    )
-                    .add_divider()
-                    .add_text(f"Contact support: {support_email}")
-                    .add_footer(f"© 2025 {company_name}")
-                    .build()
-                )
-
-            case "login_notification":
-                return (
-                    builder.add_header("New Login Detected")
-                    .add_text(f"Hello {template_data.get('name', 'there')},")
-                    .add_text(
-                        "We detected a new login to your account from an unrecognized device:"
-                    )
-                    .add_list(
-                        [
-                            f"Time: {template_data.get('timestamp', 'Unknown')}",
-                            f"Device: {template_data.get('device', 'Unknown')}",
-                            f"Location: {template_data.get('location', 'Unknown')}",
-                            f"IP Address: {template_data.get('ip_address', 'Unknown')}",
-                        ]
-                    )
-                    .add_text(
-                        "If this wasn't you, please secure your account immediately:"
-                    )
-                    .add_button("Secure Account", template_data.get("secure_url", "#"))
-                    .add_footer(f"© 2025 {company_name}")
-                    .build()
-                )
-
-            case "email_changed":
-                return (
-                    builder.add_header("Email Address Changed")
-                    .add_text(f"Hello {template_data.get('name', 'there')},")
-                    .add_text("Your email address has been changed successfully.")
-                    .add_text(f"Old email: {template_data.get('old_email', 'Unknown')}")
-                    .add_text(f"New email: {template_data.get('new_email', 'Unknown')}")
-                    .add_text(
-                        "If you did not make this change, please contact our support team immediately:"
-                    )
-                    .add_link(support_email, f"mailto:{support_email}")
-                    .add_footer(f"© 2025 {company_name}")
-                    .build()
-                )
-
-            case "book_overdue":
-                return (
-                    builder.add_header("Overdue Book - Immediate Action Required")
-                    .add_text(f"Hello {template_data.get('name', 'there')},")
-                    .add_text(
-                        f"Your borrowed book '{template_data.get('book_title', 'Unknown Book')}' is now overdue."
-                    )
-                    .add_text(
-                        f"Original due date: {template_data.get('due_date', 'Unknown')}"
-                    )
-                    .add_text(
-                        "Please return the book immediately to avoid additional late fees."
-                    )
-                    .add_text(
-                        "If you need to extend your rental period, please contact us as soon as possible."
-                    )
-                    .add_divider()
-                    .add_text("Late fees may apply:")
-                    .add_list(
-                        [
-                            "First week overdue: $1.00 per day",
-                            "After one week: $2.00 per day",
-                            "Maximum late fee: $25.00 per book",
-                        ]
-                    )
-                    .add_text("Library hours: Monday-Friday 9:00 AM - 6:00 PM")
-                    .add_text("Drop-off box available 24/7 at the main entrance.")
-                    .add_divider()
-                    .add_text(f"Contact support: {support_email}")
-                    .add_footer(f"© 2025 {company_name}")
-                    .build()
-                )
-
-            case _:
-                raise ValueError(f"Unknown email template: {template_name}")
+        """Build email content from the precompiled template registry"""
+        return self.templates.render(template_name, template_data)
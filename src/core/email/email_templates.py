@@ -0,0 +1,327 @@
+import html
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from src.core.email.email_builder import EmailBuilder
+from src.core.config import get_settings
+
+settings = get_settings()
+
+# Value used for a slot missing from the template data
+SLOT_DEFAULTS: Dict[str, str] = {
+    "name": "there",
+    "code": "",
+    "book_title": "Unknown Book",
+    "verification_url": "#",
+    "reset_url": "#",
+    "reactivation_url": "#",
+    "unlock_url": "#",
+    "secure_url": "#",
+}
+DEFAULT_SLOT_VALUE = "Unknown"
+
+_SLOT_MARK = "\x00"
+
+
+class _SlotRecorder(dict):
+    """Template data stand-in that records which slots a template reads and
+    returns a marker for each"""
+
+    def __missing__(self, key: str) -> str:
+        self[key] = f"{_SLOT_MARK}{key}{_SLOT_MARK}"
+        return self[key]
+
+
+class CompiledTemplate:
+    """A template split once into static HTML fragments and named slots.
+
+    Rendering only escapes the slot values and joins them with the static
+    fragments: parts[0] + value(slots[0]) + parts[1] + ... + parts[-1].
+    """
+
+    def __init__(self, name: str, parts: List[str], slots: List[str]):
+        self.name = name
+        self.parts = parts
+        self.slots = slots
+
+    @classmethod
+    def compile(
+        cls, name: str, build: Callable[..., str], *args: Any
+    ) -> "CompiledTemplate":
+        recorder = _SlotRecorder()
+        pieces = build(recorder, *args).split(_SLOT_MARK)
+        return cls(name, pieces[0::2], pieces[1::2])
+
+    def render(self, data: Mapping[str, Any]) -> str:
+        """Render the template, HTML-escaping every slot value"""
+        parts = self.parts
+        out = [parts[0]]
+        for index, slot in enumerate(self.slots):
+            value = data.get(slot)
+            if value is None:
+                value = SLOT_DEFAULTS.get(slot, DEFAULT_SLOT_VALUE)
+            out.append(html.escape(str(value)))
+            out.append(parts[index + 1])
+        return "".join(out)
+
+
+class TemplateRegistry:
+    """Named email templates, each compiled once"""
+
+    def __init__(
+        self,
+        company_name: Optional[str] = None,
+        support_email: Optional[str] = None,
+    ):
+        self._company_name = company_name or settings.company_name
+        self._support_email = support_email or settings.support_email
+        self._templates: Dict[str, CompiledTemplate] = {}
+
+    def register(self, name: str, build: Callable[..., str]) -> None:
+        """Compile a template builder. build(data, company_name,
+        support_email) must read every per-email value from data."""
+        self._templates[name] = CompiledTemplate.compile(
+            name, build, self._company_name, self._support_email
+        )
+
+    def get(self, name: str) -> CompiledTemplate:
+        template = self._templates.get(name)
+        if template is None:
+            raise ValueError(f"Unknown email template: {name}")
+        return template
+
+    def render(self, name: str, data: Mapping[str, Any]) -> str:
+        return self.get(name).render(data)
+
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._templates)
+
+
+def _welcome(data: Mapping[str, str], company_name: str, support_email: str) -> str:
+    return (
+        EmailBuilder()
+        .add_header(f"Welcome to {company_name}!")
+        .add_text(f"Hello {data['name']}!")
+        .add_text("Thank you for joining us.")
+        .add_text(
+            "To get started, please verify your email address by clicking the button below:"
+        )
+        .add_button(
+            "Verify Email", data["verification_url"]
+        )
+        .add_text(
+            "If you didn't create this account, please ignore this email."
+        )
+        .add_footer(f"© 2025 {company_name}")
+        .build()
+    )
+
+
+def _verification_code(data: Mapping[str, str], company_name: str, support_email: str) -> str:
+    return (
+        EmailBuilder()
+        .add_header("Verify Your Email")
+        .add_text(f"Hello {data['name']},")
+        .add_text(
+            "Please use the following code to verify your email address:"
+        )
+        .add_bold(data["code"])
+        .add_text("This code will expire in 30 minutes.")
+        .add_text(
+            "If you didn't request this code, please ignore this email."
+        )
+        .add_footer(f"© 2025 {company_name}")
+        .build()
+    )
+
+
+def _reset_password(data: Mapping[str, str], company_name: str, support_email: str) -> str:
+    return (
+        EmailBuilder()
+        .add_header("Password Reset Request")
+        .add_text(f"Hello {data['name']},")
+        .add_text("We received a request to reset your password.")
+        .add_text("Click the button below to create a new password:")
+        .add_button("Reset Password", data["reset_url"])
+        .add_text("This link will expire in 60 minutes.")
+        .add_text(
+            "If you didn't request this change, please contact our support team immediately."
+        )
+        .add_divider()
+        .add_text(f"Contact support: {support_email}")
+        .add_footer(f"© 2025 {company_name}")
+        .build()
+    )
+
+
+def _password_changed(data: Mapping[str, str], company_name: str, support_email: str) -> str:
+    return (
+        EmailBuilder()
+        .add_header("Password Changed Successfully")
+        .add_text(f"Hello {data['name']},")
+        .add_text("Your password has been changed successfully.")
+        .add_text(
+            "If you did not make this change, please contact our support team immediately:"
+        )
+        .add_link(support_email, f"mailto:{support_email}")
+        .add_divider()
+        .add_text("For your security, we recommend:")
+        .add_list(
+            [
+                "Using a strong, unique password",
+                "Enabling two-factor authentication if available",
+                "Never sharing your password with others",
+            ]
+        )
+        .add_footer(f"© 2025 {company_name}")
+        .build()
+    )
+
+
+def _account_deactivated(data: Mapping[str, str], company_name: str, support_email: str) -> str:
+    return (
+        EmailBuilder()
+        .add_header("Account Deactivated")
+        .add_text(f"Hello {data['name']},")
+        .add_text("Your account has been deactivated as requested.")
+        .add_text(
+            "If you'd like to reactivate your account, you can do so by clicking the button below:"
+        )
+        .add_button(
+            "Reactivate Account", data["reactivation_url"]
+        )
+        .add_text(
+            "If you did not request this change, please contact our support team immediately."
+        )
+        .add_divider()
+        .add_text(f"Contact support: {support_email}")
+        .add_footer(f"© 2025 {company_name}")
+        .build()
+    )
+
+
+def _account_locked(data: Mapping[str, str], company_name: str, support_email: str) -> str:
+    return (
+        EmailBuilder()
+        .add_header("Account Security Alert")
+        .add_text(f"Hello {data['name']},")
+        .add_text(
+            "We detected unusual activity on your account and have temporarily locked it for your security."
+        )
+        .add_text("To unlock your account, please click the button below:")
+        .add_button("Unlock Account", data["unlock_url"])
+        .add_divider()
+        .add_text("Recent activity detected:")
+        .add_list(
+            [
+                f"Time: {data['timestamp']}",
+                f"Location: {data['location']}",
+                f"IP Address: {data['ip_address']}",
+            ]
+        )
+        .add_text(
+            "If this was you, you can safely unlock your account. If not, please contact support immediately."
+        )
+        .add_divider()
+        .add_text(f"Contact support: {support_email}")
+        .add_footer(f"© 2025 {company_name}")
+        .build()
+    )
+
+
+def _login_notification(data: Mapping[str, str], company_name: str, support_email: str) -> str:
+    return (
+        EmailBuilder()
+        .add_header("New Login Detected")
+        .add_text(f"Hello {data['name']},")
+        .add_text(
+            "We detected a new login to your account from an unrecognized device:"
+        )
+        .add_list(
+            [
+                f"Time: {data['timestamp']}",
+                f"Device: {data['device']}",
+                f"Location: {data['location']}",
+                f"IP Address: {data['ip_address']}",
+            ]
+        )
+        .add_text(
+            "If this wasn't you, please secure your account immediately:"
+        )
+        .add_button("Secure Account", data["secure_url"])
+        .add_footer(f"© 2025 {company_name}")
+        .build()
+    )
+
+
+def _email_changed(data: Mapping[str, str], company_name: str, support_email: str) -> str:
+    return (
+        EmailBuilder()
+        .add_header("Email Address Changed")
+        .add_text(f"Hello {data['name']},")
+        .add_text("Your email address has been changed successfully.")
+        .add_text(f"Old email: {data['old_email']}")
+        .add_text(f"New email: {data['new_email']}")
+        .add_text(
+            "If you did not make this change, please contact our support team immediately:"
+        )
+        .add_link(support_email, f"mailto:{support_email}")
+        .add_footer(f"© 2025 {company_name}")
+        .build()
+    )
+
+
+def _book_overdue(data: Mapping[str, str], company_name: str, support_email: str) -> str:
+    return (
+        EmailBuilder()
+        .add_header("Overdue Book - Immediate Action Required")
+        .add_text(f"Hello {data['name']},")
+        .add_text(
+            f"Your borrowed book '{data['book_title']}' is now overdue."
+        )
+        .add_text(
+            f"Original due date: {data['due_date']}"
+        )
+        .add_text(
+            "Please return the book immediately to avoid additional late fees."
+        )
+        .add_text(
+            "If you need to extend your rental period, please contact us as soon as possible."
+        )
+        .add_divider()
+        .add_text("Late fees may apply:")
+        .add_list(
+            [
+                "First week overdue: $1.00 per day",
+                "After one week: $2.00 per day",
+                "Maximum late fee: $25.00 per book",
+            ]
+        )
+        .add_text("Library hours: Monday-Friday 9:00 AM - 6:00 PM")
+        .add_text("Drop-off box available 24/7 at the main entrance.")
+        .add_divider()
+        .add_text(f"Contact support: {support_email}")
+        .add_footer(f"© 2025 {company_name}")
+        .build()
+    )
+
+
+TEMPLATES: Dict[str, Callable[..., str]] = {
+    "welcome": _welcome,
+    "verification_code": _verification_code,
+    "reset_password": _reset_password,
+    "password_changed": _password_changed,
+    "account_deactivated": _account_deactivated,
+    "account_locked": _account_locked,
+    "login_notification": _login_notification,
+    "email_changed": _email_changed,
+    "book_overdue": _book_overdue,
+}
+
+
+@lru_cache
+def get_template_registry() -> TemplateRegistry:
+    registry = TemplateRegistry()
+    for name, build in TEMPLATES.items():
+        registry.register(name, build)
+    return registry
@@ -1,16 +1,102 @@
+import importlib.util
+import json
 import httpx
 from typing import List, Optional, Dict, Any
 from urllib.parse import urljoin
 
 from ..abc.smtp_client import SmtpClientABC
+from src.core.config import get_settings
+
+settings = get_settings()
+
 
 class MailgunClient(SmtpClientABC):
-    """Mailgun implementation of SMTP client"""
-    
-    def __init__(self, api_key: str, domain: str) -> None:
+    """Mailgun implementation of SMTP client.
+
+    Owns one long-lived, pooled httpx.AsyncClient so connections (and their
+    TLS sessions) are reused across sends. The pool is created on first use
+    and must be released with aclose() on shutdown.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        domain: str,
+        base_url: Optional[str] = None,
+        http2: Optional[bool] = None,
+        limits: Optional[httpx.Limits] = None,
+        timeout: Optional[httpx.Timeout] = None,
+    ) -> None:
         self.api_key = api_key
         self.domain = domain
-        self.base_url = f"https://api.mailgun.net/v3/{domain}/"
+        self.base_url = f"{(base_url or settings.mailgun_base_url).rstrip('/')}/{domain}/"
+        self._http2 = settings.mailgun_http2 if http2 is None else http2
+        self._limits = limits or httpx.Limits(
+            max_connections=settings.mailgun_max_connections,
+            max_keepalive_connections=settings.mailgun_max_keepalive_connections,
+            keepalive_expiry=settings.mailgun_keepalive_expiry,
+        )
+        self._timeout = timeout or httpx.Timeout(
+            settings.mailgun_timeout, connect=settings.mailgun_connect_timeout
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self.max_batch_recipients = settings.mailgun_batch_max_recipients
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared HTTP client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            http2 = self._http2
+            if http2 and importlib.util.find_spec("h2") is None:
+                print("HTTP/2 requested for Mailgun but h2 is not installed, using HTTP/1.1")
+                http2 = False
+            self._client = httpx.AsyncClient(
+                auth=("api", self.api_key),
+                http2=http2,
+                limits=self._limits,
+                timeout=self._timeout,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def send_batch(
+        self,
+        recipient_variables: Dict[str, Dict[str, Any]],
+        subject: str,
+        html_content: str,
+        from_email: Optional[str] = None,
+    ) -> bool:
+        """Send one personalised email per recipient through Mailgun's batch
+        sending, splitting into requests of at most max_batch_recipients"""
+        if not from_email:
+            from_email = f"<no_reply@{self.domain}>"
+
+        endpoint = urljoin(self.base_url, "messages")
+        recipients = list(recipient_variables)
+        sent = True
+        for start in range(0, len(recipients), self.max_batch_recipients):
+            chunk = recipients[start:start + self.max_batch_recipients]
+            data = {
+                "from": from_email,
+                "to": chunk,
+                "subject": subject,
+                "html": html_content,
+                "recipient-variables": json.dumps(
+                    {email: recipient_variables[email] for email in chunk}
+                ),
+            }
+            try:
+                response = await self.client.post(endpoint, data=data)
+                sent = response.status_code == 200 and sent
+            except Exception as e:
+                print(f"Error sending email batch via Mailgun: {str(e)}")
+                sent = False
+        return sent
 
     async def send_email(
         self,
@@ -53,22 +139,15 @@ class MailgunClient(SmtpClientABC):
                         ("attachment", (attachment["filename"], attachment["content"]))
                     )
 
-        auth = (
-            "api",
-            self.api_key,
-        )
         endpoint = urljoin(self.base_url, "messages")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    endpoint,
-                    data=data,
-                    files=files,
-                    auth=auth,
-                    timeout=30.0
-                )
-                return response.status_code == 200
+            response = await self.client.post(
+                endpoint,
+                data=data,
+                files=files,
+            )
+            return response.status_code == 200
         except Exception as e:
             print(f"Error sending email via Mailgun: {str(e)}")
             return False
\ No newline at end of file
@@ -2,6 +2,11 @@ from fastapi import HTTPException
 from http import HTTPStatus
 
 
+class BadRequestException(HTTPException):
+    def __init__(self, detail: str = "Bad Request"):
+        super().__init__(status_code=HTTPStatus.BAD_REQUEST, detail=detail)
+
+
 class NotFoundException(HTTPException):
     def __init__(self, detail: str = "Not Found"):
         super().__init__(status_code=HTTPStatus.NOT_FOUND, detail=detail)
@@ -0,0 +1,57 @@
+import json
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Optional
+
+from bson import ObjectId
+
+from src.core.exceptions import BadRequestException
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def build_projection(
+    fields: Optional[str], allowed: Iterable[str]
+) -> Optional[Dict[str, int]]:
+    """Turn a comma-separated field list into a Mongo projection.
+
+    Returns None (all fields) when no fields are requested. The document ID
+    is always included.
+    """
+    if not fields:
+        return None
+
+    allowed = set(allowed)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise BadRequestException(f"Unknown fields: {', '.join(unknown)}")
+
+    projection = {field: 1 for field in requested if field != "id"}
+    return projection or {"_id": 1}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def ndjson_stream(
+    cursor: AsyncIterable[Dict[str, Any]], chunk_size: int = 1000
+) -> AsyncIterator[bytes]:
+    """Serialize raw Mongo documents to newline-delimited JSON.
+
+    Lines are written in chunks of chunk_size documents so memory stays
+    constant however large the collection is.
+    """
+    lines = []
+    async for document in cursor:
+        document["id"] = str(document.pop("_id"))
+        lines.append(json.dumps(document, default=_default))
+        if len(lines) >= chunk_size:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
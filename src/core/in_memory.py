@@ -0,0 +1,141 @@
+from bisect import bisect_right, insort
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+)
+
+from beanie import Document, PydanticObjectId
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+DocumentT = TypeVar("DocumentT", bound=Document)
+
+
+def object_id(value: str) -> PydanticObjectId:
+    """Parse an ID the way the Mongo repositories do (InvalidId if malformed)"""
+    return PydanticObjectId(value)
+
+
+def project(
+    document: Dict[str, Any], projection: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Copy of a document with an inclusion projection applied"""
+    if not projection:
+        return dict(document)
+    projected = {
+        field: document[field]
+        for field, include in projection.items()
+        if include and field in document
+    }
+    if projection.get("_id", 1):
+        projected["_id"] = document["_id"]
+    return projected
+
+
+def to_model(model_class: Type[DocumentT], document: Dict[str, Any]) -> DocumentT:
+    """Wrap a stored document in its Beanie model without touching the
+    database (the model is constructed, not validated)"""
+    fields = {key: value for key, value in document.items() if key != "_id"}
+    return model_class.model_construct(id=document["_id"], **fields)
+
+
+async def iter_documents(documents: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """Async iteration over documents, standing in for a Motor cursor"""
+    for document in documents:
+        yield document
+
+
+class InMemoryCollection:
+    """Raw documents by _id, kept in _id order, with the unique indexes the
+    real collection has.
+
+    Only what the in-memory repositories need: inserts that fail like Mongo
+    on duplicate keys and filtered, paginated scans. Documents returned by
+    find are copies; the ones returned by get are the stored ones and may
+    be updated in place.
+    """
+
+    def __init__(self, name: str, unique: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.documents: Dict[ObjectId, Dict[str, Any]] = {}
+        self._ids: List[ObjectId] = []
+        # index name -> field, and per index the owner of every value
+        self._unique = unique or {}
+        self._owners: Dict[str, Dict[Any, ObjectId]] = {index: {} for index in self._unique}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def insert(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a document, assigning an _id if it has none"""
+        document = dict(document)
+        document.setdefault("_id", PydanticObjectId())
+        if document["_id"] in self.documents:
+            self._duplicate("_id_", "_id", document["_id"])
+        for index, field in self._unique.items():
+            value = document.get(field)
+            if value is not None and value in self._owners[index]:
+                self._duplicate(index, field, value)
+
+        for index, field in self._unique.items():
+            if document.get(field) is not None:
+                self._owners[index][document[field]] = document["_id"]
+        self.documents[document["_id"]] = document
+        insort(self._ids, document["_id"])
+        return document
+
+    def insert_many(self, documents: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Unordered insert; returns the error of every failed document by position"""
+        errors = {}
+        for position, document in enumerate(documents):
+            try:
+                self.insert(document)
+            except DuplicateKeyError as e:
+                errors[position] = str(e)
+        return errors
+
+    def get(self, document_id: ObjectId) -> Optional[Dict[str, Any]]:
+        return self.documents.get(document_id)
+
+    def find(
+        self,
+        matches: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        after_id: Optional[ObjectId] = None,
+        sort_key: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Projected copies of the matching documents, in _id order unless
+        sort_key is given. after_id only applies to _id order."""
+        if sort_key is None:
+            start = bisect_right(self._ids, after_id) if after_id is not None else 0
+            candidates = (self.documents[document_id] for document_id in self._ids[start:])
+        else:
+            candidates = iter(sorted(self.documents.values(), key=sort_key))
+
+        results = []
+        for document in candidates:
+            if matches is not None and not matches(document):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            results.append(project(document, projection))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def _duplicate(self, index: str, field: str, value: Any) -> None:
+        raise DuplicateKeyError(
+            f"E11000 duplicate key error collection: {self.name} index: {index} "
+            f"dup key: {{ {field}: {value!r} }}",
+            11000,
+        )
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from src.api.models import LeaseModel
+from src.core.config import get_settings
+
+settings = get_settings()
+
+
+class LeaderElector:
+    """Lease-based leader election on a document in the leases collection.
+
+    A process becomes leader by taking the lease named `name` while it is
+    free or expired, and stays leader by renewing it every
+    heartbeat_interval seconds for another ttl seconds. While leader, the
+    task passed to run() is running; it is cancelled as soon as a renewal
+    fails or the lease has run out, so two processes never keep working
+    past the lease. A process that stops cleanly deletes its lease so a
+    standby can take over on its next attempt; if it dies, the lease
+    expires after at most ttl seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: Optional[float] = None,
+        heartbeat_interval: Optional[float] = None,
+        owner: Optional[str] = None,
+    ):
+        self.name = name
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._ttl = timedelta(seconds=ttl or settings.leader_lease_ttl)
+        self._heartbeat_interval = (
+            heartbeat_interval or settings.leader_heartbeat_interval
+        )
+        self._expires_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    @property
+    def is_leader(self) -> bool:
+        return (
+            self._expires_at is not None
+            and self._expires_at > datetime.now(timezone.utc)
+        )
+
+    async def try_acquire(self) -> bool:
+        """Take or renew the lease; returns whether this process holds it"""
+        now = datetime.now(timezone.utc)
+        expires_at = now + self._ttl
+        try:
+            await LeaseModel.get_motor_collection().find_one_and_update(
+                *self._acquire_update(now, expires_at),
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Someone else holds an unexpired lease
+            self._expires_at = None
+            return False
+        self._expires_at = expires_at
+        return True
+
+    def _acquire_update(self, now: datetime, expires_at: datetime):
+        """Build the filter and update of try_acquire: the lease is ours if
+        we already hold it or it has expired"""
+        query = {
+            "_id": self.name,
+            "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}],
+        }
+        return query, {"$set": {"owner": self.owner, "expires_at": expires_at}}
+
+    async def release(self) -> None:
+        """Give the lease up if this process holds it"""
+        self._expires_at = None
+        await LeaseModel.get_motor_collection().delete_one(
+            {"_id": self.name, "owner": self.owner}
+        )
+
+    async def run(self, leader_task: Callable[[], Awaitable[None]]) -> None:
+        """Campaign for the lease forever, running leader_task() while held"""
+        self._running = True
+        try:
+            while self._running:
+                try:
+                    acquired = await self.try_acquire()
+                except PyMongoError as e:
+                    print(f"Error renewing lease '{self.name}': {str(e)}")
+                    acquired = self.is_leader
+
+                if acquired and self._task is None and self._running:
+                    print(f"Acquired lease '{self.name}' as {self.owner}")
+                    self._task = asyncio.create_task(leader_task())
+                elif not acquired and self._task is not None:
+                    print(f"Lost lease '{self.name}'")
+                    await self._cancel_task()
+
+                if self._task is not None and self._task.done():
+                    # The leader task ended on its own: let someone else lead
+                    task, self._task = self._task, None
+                    if not task.cancelled() and task.exception():
+                        print(f"Leader task for '{self.name}' failed: {task.exception()}")
+                    await self.release()
+
+                await asyncio.sleep(self._next_heartbeat())
+        finally:
+            await self._cancel_task()
+
+    def _next_heartbeat(self) -> float:
+        """Seconds until the next renewal, and never past the lease expiry
+        so a leader that can't renew stops its task in time"""
+        if self._task is None or self._expires_at is None:
+            return self._heartbeat_interval
+        remaining = (self._expires_at - datetime.now(timezone.utc)).total_seconds()
+        return max(min(self._heartbeat_interval, remaining), 0)
+
+    async def _cancel_task(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def stop(self) -> None:
+        """Stop campaigning, stop the leader task and release the lease"""
+        self._running = False
+        await self._cancel_task()
+        try:
+            await self.release()
+        except PyMongoError as e:
+            print(f"Error releasing lease '{self.name}': {str(e)}")
@@ -1,8 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, Awaitable
+from typing import Any, Callable, Dict, Awaitable, Optional
+
+from ..codecs import MessageCodec, get_codec, codec_for_content_type
 
 class QueueABC(ABC):
     """Abstract base class for queue implementations"""
+
+    # Encodes published messages; implementations pick one per queue
+    codec: MessageCodec = get_codec("json")
+    
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        """Encode a message with the queue's codec"""
+        return self.codec.encode(message)
+    
+    def decode(self, body: bytes, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """Decode a received body with the codec its content type names"""
+        return codec_for_content_type(content_type).decode(body)
     
     @abstractmethod
     def __init__(self, queue_name: str) -> None:
@@ -14,6 +27,23 @@ class QueueABC(ABC):
         """Publish a message to the queue"""
         pass
     
+    async def publish_async(self, message: Dict[str, Any]) -> None:
+        """Publish a message from async code.
+
+        Implementations that can publish without blocking the event loop
+        override this; by default it delegates to publish.
+        """
+        self.publish(message)
+    
+    async def start(self) -> None:
+        """Open connections ahead of use (no-op for implementations that
+        connect on construction)"""
+        pass
+    
+    async def stop(self) -> None:
+        """Flush pending messages and close the queue"""
+        self.close()
+    
     @abstractmethod
     def setup_consumer(self, callback: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
         """Set up a consumer with the given async callback"""
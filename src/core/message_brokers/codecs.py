@@ -0,0 +1,99 @@
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Union
+
+import orjson
+
+from src.core.config import get_settings
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for queues using the msgpack codec
+    msgpack = None
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+
+def _default(value: Any) -> Any:
+    """Encode what the codecs don't handle natively the way orjson does:
+    dates and datetimes as ISO 8601 strings, anything else via str()"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class MessageCodec(ABC):
+    """Turns queue messages into message bodies and back.
+
+    content_type is sent with every message, so a consumer can decode
+    whatever codec the producer picked.
+    """
+
+    name: str
+    content_type: str
+
+    @abstractmethod
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        pass
+
+
+class JsonCodec(MessageCodec):
+    """JSON through orjson. Bodies are compact JSON, readable by any
+    consumer that used the stdlib json module"""
+
+    name = "json"
+    content_type = JSON_CONTENT_TYPE
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return orjson.dumps(message, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return orjson.loads(body)
+
+
+class MsgpackCodec(MessageCodec):
+    """MessagePack: smaller bodies than JSON. Needs the msgpack package"""
+
+    name = "msgpack"
+    content_type = MSGPACK_CONTENT_TYPE
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("The msgpack codec needs the msgpack package installed")
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return msgpack.packb(message, default=_default)
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(body)
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec, MsgpackCodec)}
+_instances: Dict[str, MessageCodec] = {}
+
+
+def get_codec(codec: Union[str, MessageCodec, None] = None) -> MessageCodec:
+    """Codec by name ("json", "msgpack"); None means the RABBITMQ_CODEC setting"""
+    if isinstance(codec, MessageCodec):
+        return codec
+    if codec is None:
+        codec = get_settings().rabbitmq_codec
+    if codec not in CODECS:
+        raise ValueError(f"Unknown message codec: {codec}")
+    if codec not in _instances:
+        _instances[codec] = CODECS[codec]()
+    return _instances[codec]
+
+
+def codec_for_content_type(content_type: Optional[str]) -> MessageCodec:
+    """Codec for a received message. Messages without a content type were
+    published before codecs existed and are JSON."""
+    for codec in CODECS.values():
+        if codec.content_type == (content_type or JSON_CONTENT_TYPE):
+            return get_codec(codec.name)
+    raise ValueError(f"Unsupported message content type: {content_type}")
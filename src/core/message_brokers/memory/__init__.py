@@ -0,0 +1,3 @@
+from .queue import InMemoryQueue
+
+__all__ = ["InMemoryQueue"]
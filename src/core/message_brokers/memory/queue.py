@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from ..abc.queue import QueueABC
+from ..codecs import MessageCodec, get_codec
+
+
+class InMemoryQueue(QueueABC):
+    """Queue that lives in the current process, for benchmarks and local runs
+    without RabbitMQ.
+
+    Messages still go through the codec, so publishing costs what encoding
+    does with a real broker. Bodies are kept until a consumer takes them; a
+    consumer callback that fails only logs the error.
+    """
+
+    def __init__(
+        self, queue_name: str, codec: Union[str, MessageCodec, None] = None
+    ):
+        self._queue_name = queue_name
+        self.codec = get_codec(codec)
+        self._messages: asyncio.Queue = asyncio.Queue()
+        self._callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+        self.published = 0
+
+    @property
+    def name(self) -> str:
+        return self._queue_name
+
+    def declare_queue(self) -> None:
+        """Nothing to declare"""
+        pass
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        """Encodes the message and keeps it for consumers"""
+        self._messages.put_nowait((self.encode(message), self.codec.content_type))
+        self.published += 1
+
+    def setup_consumer(
+        self, callback: Callable[[Dict[str, Any]], Awaitable[None]], **kwargs: Any
+    ) -> None:
+        """Sets up the consumer without starting consumption"""
+        self._callback = callback
+
+    async def start_consuming(self) -> None:
+        """Hands messages to the callback one at a time until cancelled"""
+        if not self._callback:
+            raise RuntimeError("No callback set. Call setup_consumer first.")
+
+        while True:
+            body, content_type = await self._messages.get()
+            try:
+                await self._callback(self.decode(body, content_type))
+            except Exception as e:
+                print(f"Error processing message: {str(e)}")
+            finally:
+                self._messages.task_done()
+
+    async def flush(self) -> None:
+        """Wait until a consumer has handled every message"""
+        await self._messages.join()
+
+    def close(self) -> None:
+        """Drops messages nobody consumed"""
+        self._messages = asyncio.Queue()
@@ -1,4 +1,11 @@
 from .connection import RabbitMQConnection
 from .queue import RabbitMQQueue
+from .async_connection import AsyncRabbitMQConnection
+from .async_queue import AsyncRabbitMQQueue
 
-__all__ = ["RabbitMQConnection", "RabbitMQQueue"]
\ No newline at end of file
+__all__ = [
+    "RabbitMQConnection",
+    "RabbitMQQueue",
+    "AsyncRabbitMQConnection",
+    "AsyncRabbitMQQueue",
+]
\ No newline at end of file
@@ -0,0 +1,105 @@
+import asyncio
+from typing import Any, Callable, Optional
+
+import pika
+from pika.adapters.asyncio_connection import AsyncioConnection
+
+from ..abc.connection import QueueConnectionABC
+from src.core.config import get_settings
+
+settings = get_settings()
+
+
+class AsyncRabbitMQConnection(QueueConnectionABC):
+    """RabbitMQ connection driven by the running asyncio event loop.
+
+    Unlike RabbitMQConnection, no call ever blocks on socket I/O: broker
+    replies are delivered through callbacks which are exposed as awaitables.
+    """
+
+    def __init__(self, url: Optional[str] = None, timeout: float = 10.0):
+        self._url = url or settings.rabbitmq_url
+        self._timeout = timeout
+        self._connection: Optional[AsyncioConnection] = None
+        self._channel = None
+        self._opened: Optional[asyncio.Future] = None
+
+    def _connect(self) -> None:
+        """Start opening a connection; await connect() to wait for it"""
+        loop = asyncio.get_running_loop()
+        self._opened = loop.create_future()
+        self._connection = AsyncioConnection(
+            pika.URLParameters(self._url),
+            on_open_callback=self._on_open,
+            on_open_error_callback=self._on_open_error,
+            on_close_callback=self._on_close,
+            custom_ioloop=loop,
+        )
+
+    def _on_open(self, connection) -> None:
+        if not self._opened.done():
+            self._opened.set_result(connection)
+
+    def _on_open_error(self, connection, error) -> None:
+        print(f"Error connecting to RabbitMQ: {str(error)}")
+        if not self._opened.done():
+            self._opened.set_exception(
+                error if isinstance(error, BaseException) else ConnectionError(str(error))
+            )
+
+    def _on_close(self, connection, reason) -> None:
+        self._channel = None
+        if self._opened is not None and not self._opened.done():
+            self._opened.set_exception(ConnectionError(str(reason)))
+
+    async def connect(self) -> None:
+        """Open the connection and its default channel if not already open"""
+        if self.is_connected() and self._channel is not None:
+            return
+        if not self.is_connected():
+            if self._opened is None or self._opened.done():
+                self._connect()
+            await asyncio.wait_for(asyncio.shield(self._opened), self._timeout)
+        self._channel = await self.open_channel()
+
+    async def open_channel(self) -> Any:
+        """Open an additional channel on the connection"""
+        future = asyncio.get_running_loop().create_future()
+        self._connection.channel(
+            on_open_callback=lambda channel: future.done() or future.set_result(channel)
+        )
+        return await asyncio.wait_for(future, self._timeout)
+
+    async def call(self, method: Callable[..., Any], *args, **kwargs) -> Any:
+        """Invoke a channel method that reports completion through a
+        callback keyword argument and wait for the broker's reply
+        """
+        future = asyncio.get_running_loop().create_future()
+        method(
+            *args,
+            callback=lambda frame: future.done() or future.set_result(frame),
+            **kwargs,
+        )
+        return await asyncio.wait_for(future, self._timeout)
+
+    @property
+    def channel(self) -> Any:
+        """Get the default channel (None until connect() completed)"""
+        return self._channel
+
+    @property
+    def connection(self) -> Any:
+        """Get the underlying pika connection"""
+        return self._connection
+
+    def close(self) -> None:
+        """Close the connection"""
+        if self._connection and not (
+            self._connection.is_closed or self._connection.is_closing
+        ):
+            self._connection.close()
+        self._channel = None
+
+    def is_connected(self) -> bool:
+        """Check if the connection is active"""
+        return self._connection is not None and self._connection.is_open
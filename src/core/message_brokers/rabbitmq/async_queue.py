@@ -0,0 +1,354 @@
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union
+
+import pika
+from pika.exceptions import AMQPError
+
+from .async_connection import AsyncRabbitMQConnection
+from .retry import retry_route, retry_topology
+from ..abc.queue import QueueABC
+from ..codecs import MessageCodec, get_codec
+from src.core.config import get_settings
+
+settings = get_settings()
+
+
+class _PublisherChannel:
+    """A confirm-mode channel and the messages it still waits confirms for"""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.next_delivery_tag = 1
+        self.pending: Dict[int, Dict[str, Any]] = {}
+
+
+class AsyncRabbitMQQueue(QueueABC):
+    """Queue publisher and consumer that never block the event loop.
+
+    Publishing: messages go into a bounded in-memory buffer which a
+    background task flushes once batch_size messages are waiting or
+    flush_interval seconds have passed. Batches are spread over a pool of
+    confirm-mode channels; broker confirms are handled as they arrive (the
+    broker acks many deliveries at once) and at most max_in_flight messages
+    wait for a confirm at any time. Nacked messages and messages in flight
+    on a channel that closes are put back into the buffer (waiting for room
+    if it is full), so delivery is at-least-once.
+
+    Consuming: the broker pushes up to prefetch_count unacked deliveries on
+    a dedicated channel; each one is handled in its own tracked task, at
+    most concurrency at a time, and settled from the event loop that owns
+    the channel once the callback finishes. A failed delivery is republished
+    to the next retry tier (see retry.py) or, when the tiers are used up,
+    to the dead-letter queue, and then acked.
+    """
+
+    def __init__(
+        self,
+        queue_name: str,
+        channels: Optional[int] = None,
+        buffer_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        codec: Union[str, MessageCodec, None] = None,
+    ):
+        self._queue_name = queue_name
+        self.codec = get_codec(codec)
+        self._connection_manager = AsyncRabbitMQConnection()
+        self._channel_count = channels or settings.rabbitmq_publisher_channels
+        self._batch_size = batch_size or settings.rabbitmq_publish_batch_size
+        self._flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else settings.rabbitmq_publish_flush_interval
+        )
+        self._buffer: asyncio.Queue = asyncio.Queue(
+            maxsize=buffer_size or settings.rabbitmq_publish_buffer_size
+        )
+        self._in_flight = asyncio.Semaphore(
+            max_in_flight or settings.rabbitmq_publish_max_in_flight
+        )
+        self._channels: List[_PublisherChannel] = []
+        self._round_robin = itertools.count()
+        self._flusher: Optional[asyncio.Task] = None
+        self._requeues: Set[asyncio.Task] = set()
+        self._start_lock = asyncio.Lock()
+        self._callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+        self._prefetch_count = settings.rabbitmq_prefetch_count
+        self._concurrency: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._consumer_channel = None
+        self._consumer_tag: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self._queue_name
+
+    @property
+    def channel(self):
+        return self._connection_manager.channel
+
+    async def start(self) -> None:
+        """Connect, declare the queue and start the background flusher"""
+        async with self._start_lock:
+            if self._flusher and not self._flusher.done():
+                return
+            await self._open_channels()
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _open_channels(self) -> None:
+        """(Re)open the connection and the pool of confirm-mode channels"""
+        await self._connection_manager.connect()
+        await self._connection_manager.call(
+            self.channel.queue_declare, queue=self._queue_name, durable=True
+        )
+
+        self._channels = []
+        for _ in range(self._channel_count):
+            channel = await self._connection_manager.open_channel()
+            publisher = _PublisherChannel(channel)
+            channel.add_on_close_callback(
+                lambda _channel, reason, publisher=publisher: self._on_channel_closed(
+                    publisher, reason
+                )
+            )
+            await self._connection_manager.call(
+                channel.confirm_delivery,
+                ack_nack_callback=lambda frame, publisher=publisher: self._on_confirm(
+                    publisher, frame
+                ),
+            )
+            self._channels.append(publisher)
+
+    def declare_queue(self) -> None:
+        """Declares the queue with RabbitMQ (without waiting for the reply)"""
+        if self.channel is None:
+            raise RuntimeError("Not connected. Await start() first.")
+        self.channel.queue_declare(queue=self._queue_name, durable=True)
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        """Buffers a message for publishing; raises asyncio.QueueFull when
+        the buffer is full. Prefer publish_async, which waits for room."""
+        self._buffer.put_nowait(message)
+
+    async def publish_async(self, message: Dict[str, Any]) -> None:
+        """Buffers a message for publishing, waiting while the buffer is full"""
+        if not self._flusher or self._flusher.done():
+            await self.start()
+        await self._buffer.put(message)
+
+    async def flush(self) -> None:
+        """Wait until every buffered message has been confirmed by the broker"""
+        await self._buffer.join()
+
+    async def _flush_loop(self) -> None:
+        """Drain the buffer in batches for as long as the queue is open"""
+        while True:
+            message = await self._buffer.get()
+            if self._buffer.qsize() + 1 < self._batch_size:
+                await asyncio.sleep(self._flush_interval)
+
+            batch = [message]
+            while len(batch) < self._batch_size and not self._buffer.empty():
+                batch.append(self._buffer.get_nowait())
+
+            try:
+                await self._publish_batch(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error publishing message batch: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def _publish_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Hand a batch to the channel pool, reconnecting if needed"""
+        for index, message in enumerate(batch):
+            await self._in_flight.acquire()
+            try:
+                if not self._channels or not self._connection_manager.is_connected():
+                    await self._open_channels()
+                publisher = self._channels[next(self._round_robin) % len(self._channels)]
+                publisher.channel.basic_publish(
+                    exchange="",
+                    routing_key=self._queue_name,
+                    body=self.encode(message),
+                    properties=pika.BasicProperties(
+                        delivery_mode=2,
+                        content_type=self.codec.content_type,
+                    ),
+                )
+            except (AMQPError, ConnectionError, asyncio.TimeoutError):
+                self._in_flight.release()
+                for unsent in batch[index:]:
+                    self._requeue(unsent)
+                raise
+            publisher.pending[publisher.next_delivery_tag] = message
+            publisher.next_delivery_tag += 1
+
+    def _on_confirm(self, publisher: _PublisherChannel, frame) -> None:
+        """Settle every delivery covered by a broker ack/nack"""
+        method = frame.method
+        if method.multiple:
+            delivery_tags = [tag for tag in publisher.pending if tag <= method.delivery_tag]
+        else:
+            delivery_tags = [method.delivery_tag]
+
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        for delivery_tag in delivery_tags:
+            message = publisher.pending.pop(delivery_tag, None)
+            if message is None:
+                continue
+            self._in_flight.release()
+            if acked:
+                self._buffer.task_done()
+            else:
+                self._requeue(message)
+
+    def _on_channel_closed(self, publisher: _PublisherChannel, reason) -> None:
+        """Put back everything that was waiting for a confirm on the channel"""
+        if publisher in self._channels:
+            self._channels.remove(publisher)
+        for message in publisher.pending.values():
+            self._in_flight.release()
+            self._requeue(message)
+        publisher.pending.clear()
+
+    def _requeue(self, message: Dict[str, Any]) -> None:
+        """Put a message taken from the buffer back for another attempt.
+
+        When the buffer is full the message waits for room in a task, like
+        publish_async does; it stays unfinished until then, so flush() keeps
+        waiting for it.
+        """
+        try:
+            self._buffer.put_nowait(message)
+        except asyncio.QueueFull:
+            task = asyncio.create_task(self._put_back(message))
+            self._requeues.add(task)
+            task.add_done_callback(self._requeues.discard)
+            return
+        self._buffer.task_done()
+
+    async def _put_back(self, message: Dict[str, Any]) -> None:
+        await self._buffer.put(message)
+        self._buffer.task_done()
+
+    def setup_consumer(
+        self,
+        callback: Callable[[Dict[str, Any]], Awaitable[None]],
+        prefetch_count: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> None:
+        """Sets up the consumer without starting consumption"""
+        self._callback = callback
+        self._prefetch_count = prefetch_count or settings.rabbitmq_prefetch_count
+        self._concurrency = asyncio.Semaphore(
+            concurrency or settings.rabbitmq_consumer_concurrency
+        )
+
+    async def start_consuming(self) -> None:
+        """Consumes messages until cancelled, reconnecting if the channel drops"""
+        if not self._callback:
+            raise RuntimeError("No callback set. Call setup_consumer first.")
+
+        try:
+            while True:
+                try:
+                    closed = await self._open_consumer_channel()
+                    reason = await closed
+                    print(f"Consumer channel closed: {reason}")
+                except (AMQPError, ConnectionError, asyncio.TimeoutError) as e:
+                    print(f"Error consuming messages: {str(e)}")
+                await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            print("Message consumption cancelled")
+            await self._drain()
+            raise
+
+    async def _open_consumer_channel(self) -> asyncio.Future:
+        """Open a channel, subscribe to the queue and return a future that
+        resolves when the channel closes"""
+        await self._connection_manager.connect()
+        channel = await self._connection_manager.open_channel()
+        closed = asyncio.get_running_loop().create_future()
+        channel.add_on_close_callback(
+            lambda _channel, reason: closed.done() or closed.set_result(reason)
+        )
+
+        await self._connection_manager.call(
+            channel.queue_declare, queue=self._queue_name, durable=True
+        )
+        for queue_name, arguments in retry_topology(self._queue_name):
+            await self._connection_manager.call(
+                channel.queue_declare, queue=queue_name, durable=True, arguments=arguments
+            )
+        await self._connection_manager.call(
+            channel.basic_qos, prefetch_count=self._prefetch_count
+        )
+        self._consumer_tag = channel.basic_consume(
+            queue=self._queue_name, on_message_callback=self._on_message
+        )
+        self._consumer_channel = channel
+        return closed
+
+    def _on_message(self, channel, method, properties, body) -> None:
+        """Called by pika on the event loop for every pushed delivery"""
+        task = asyncio.create_task(self.process_message(channel, method, properties, body))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def process_message(self, channel, method, properties, body):
+        """Process a single message and settle it on its channel"""
+        async with self._concurrency:
+            try:
+                message = self.decode(body, properties.content_type)
+                await self._callback(message)
+            except Exception as e:
+                print(f"Error processing message: {str(e)}")
+                if channel.is_open:
+                    routing_key, retry_properties = retry_route(
+                        self._queue_name, properties, e
+                    )
+                    channel.basic_publish(
+                        exchange="",
+                        routing_key=routing_key,
+                        body=body,
+                        properties=retry_properties,
+                    )
+                    channel.basic_ack(delivery_tag=method.delivery_tag)
+                return
+
+            if channel.is_open:
+                channel.basic_ack(delivery_tag=method.delivery_tag)
+
+    async def _drain(self, timeout: float = 30.0) -> None:
+        """Stop deliveries, let in-flight callbacks finish (up to timeout
+        seconds) and close the consumer channel. Anything still unacked is
+        requeued by the broker when the channel closes.
+        """
+        channel = self._consumer_channel
+        if channel is not None and channel.is_open:
+            channel.basic_cancel(self._consumer_tag)
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+        if channel is not None and channel.is_open:
+            channel.close()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush buffered messages (up to timeout seconds) and close"""
+        if self._flusher and not self._flusher.done():
+            try:
+                await asyncio.wait_for(self.flush(), timeout)
+            except asyncio.TimeoutError:
+                print(f"Timed out flushing {self._buffer.qsize()} messages for {self._queue_name}")
+        self.close()
+
+    def close(self) -> None:
+        """Stops the flusher and closes the connection"""
+        if self._flusher and not self._flusher.done():
+            self._flusher.cancel()
+        for task in self._requeues:
+            task.cancel()
+        self._channels = []
+        self._connection_manager.close()
@@ -1,14 +1,16 @@
 import pika
-from typing import Any, Callable, Dict, Awaitable
-import json
+from typing import Any, Callable, Dict, Awaitable, Union
 import asyncio
 from .connection import RabbitMQConnection
+from ..codecs import MessageCodec, get_codec
+from .retry import retry_route, retry_topology
 from ..abc.queue import QueueABC
 
 
 class RabbitMQQueue(QueueABC):
-    def __init__(self, queue_name: str):
+    def __init__(self, queue_name: str, codec: Union[str, MessageCodec, None] = None):
         self._queue_name = queue_name
+        self.codec = get_codec(codec)
         self._connection_manager = RabbitMQConnection()
         self._callback = None
         self.declare_queue()
@@ -31,9 +33,10 @@ class RabbitMQQueue(QueueABC):
             self.channel.basic_publish(
                 exchange='',
                 routing_key=self._queue_name,
-                body=json.dumps(message),
+                body=self.encode(message),
                 properties=pika.BasicProperties(
                     delivery_mode=2,
+                    content_type=self.codec.content_type,
                 )
             )
         except Exception as e:
@@ -43,17 +46,26 @@ class RabbitMQQueue(QueueABC):
     async def process_message(self, channel, method, properties, body):
         """Process a single message asynchronously"""
         try:
-            message = json.loads(body)
+            message = self.decode(body, properties.content_type)
             if self._callback:
                 await self._callback(message)
             channel.basic_ack(delivery_tag=method.delivery_tag)
         except Exception as e:
             print(f"Error processing message: {str(e)}")
-            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            routing_key, retry_properties = retry_route(self._queue_name, properties, e)
+            channel.basic_publish(
+                exchange='',
+                routing_key=routing_key,
+                body=body,
+                properties=retry_properties,
+            )
+            channel.basic_ack(delivery_tag=method.delivery_tag)
 
     def setup_consumer(self, callback: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
         """Sets up the consumer without starting consumption"""
         self._callback = callback
+        for queue_name, arguments in retry_topology(self._queue_name):
+            self.channel.queue_declare(queue=queue_name, durable=True, arguments=arguments)
         self.channel.basic_qos(prefetch_count=1)
         self.channel.basic_consume(
             queue=self._queue_name,
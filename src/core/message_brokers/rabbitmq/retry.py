@@ -0,0 +1,77 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pika
+
+from src.core.config import get_settings
+
+settings = get_settings()
+
+ATTEMPT_HEADER = "x-attempt"
+ERROR_HEADER = "x-last-error"
+ORIGIN_HEADER = "x-original-queue"
+
+
+def retry_queue_name(queue_name: str, delay: float) -> str:
+    return f"{queue_name}.retry.{delay:g}s"
+
+
+def dead_letter_queue_name(queue_name: str) -> str:
+    return f"{queue_name}.dead"
+
+
+def retry_topology(
+    queue_name: str, delays: Optional[Sequence[float]] = None
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """(queue, arguments) for every retry tier and the dead-letter queue.
+
+    Each tier is a queue without consumers whose messages expire after the
+    tier's delay and are dead-lettered back onto queue_name through the
+    default exchange. The TTL is set per queue rather than per message so
+    a long delay never holds up shorter ones queued behind it.
+    """
+    delays = settings.rabbitmq_retry_delays if delays is None else delays
+    topology = [
+        (
+            retry_queue_name(queue_name, delay),
+            {
+                "x-message-ttl": int(delay * 1000),
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": queue_name,
+            },
+        )
+        for delay in delays
+    ]
+    topology.append((dead_letter_queue_name(queue_name), {}))
+    return topology
+
+
+def retry_route(
+    queue_name: str,
+    properties: Optional[pika.BasicProperties],
+    error: Exception,
+    delays: Optional[Sequence[float]] = None,
+) -> Tuple[str, pika.BasicProperties]:
+    """Where a failed delivery goes next and the properties to publish it with.
+
+    The attempt counter travels in the x-attempt header; once every tier
+    has been tried the message goes to the dead-letter queue. ValueErrors
+    (a body that isn't JSON, a payload that fails validation) won't get
+    better by waiting and go there straight away.
+    """
+    delays = settings.rabbitmq_retry_delays if delays is None else delays
+    headers = dict(properties.headers or {}) if properties else {}
+    attempt = int(headers.get(ATTEMPT_HEADER, 0)) + 1
+    headers[ATTEMPT_HEADER] = attempt
+    headers[ERROR_HEADER] = f"{type(error).__name__}: {error}"[:1000]
+    headers[ORIGIN_HEADER] = queue_name
+
+    if isinstance(error, ValueError) or attempt > len(delays):
+        routing_key = dead_letter_queue_name(queue_name)
+    else:
+        routing_key = retry_queue_name(queue_name, delays[attempt - 1])
+
+    return routing_key, pika.BasicProperties(
+        delivery_mode=2,
+        content_type=properties.content_type if properties else None,
+        headers=headers,
+    )
@@ -1,29 +1,233 @@
 import asyncio
-from datetime import datetime
+import heapq
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
 from src.api.modules.BookRental.BookRentalService import BookRentalService
+from src.core.rental_change_stream import RentalChangeStream
+from src.core.config import get_settings
+
+settings = get_settings()
+
 
 class NotificationScheduler:
-    def __init__(self):
-        self.rental_service = BookRentalService()
+    """Sends overdue notifications at (or shortly after) each rental's due date.
+
+    Active rentals due within the next `window` seconds are loaded into an
+    in-memory heap ordered by due date, and the window is topped up
+    incrementally as time advances. Rentals checked out or returned through
+    the rental service are added to / dropped from the heap as it happens;
+    rentals changed by other processes are picked up by polling for new
+    ids every `poll_interval` seconds, or, with change_stream, by tailing
+    the book_rentals change stream.
+    When the earliest rental falls due the scheduler waits `batch_delay`
+    seconds so rentals due close together are notified in one go. A full
+    sweep of all active rentals runs on start and every
+    `reconcile_interval` seconds to catch anything the heap missed.
+    """
+
+    def __init__(
+        self,
+        rental_service: Optional[BookRentalService] = None,
+        window: Optional[float] = None,
+        batch_delay: Optional[float] = None,
+        reconcile_interval: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        change_stream: Optional[bool] = None,
+    ):
+        self.rental_service = rental_service or BookRentalService()
         self.running = False
-        
+        self._window = timedelta(seconds=window or settings.notification_window)
+        self._batch_delay = timedelta(
+            seconds=batch_delay
+            if batch_delay is not None
+            else settings.notification_batch_delay
+        )
+        self._reconcile_interval = timedelta(
+            seconds=reconcile_interval or settings.notification_reconcile_interval
+        )
+        self._poll_interval = timedelta(
+            seconds=poll_interval or settings.notification_poll_interval
+        )
+        self._change_stream = (
+            RentalChangeStream(self, self.rental_service.notification_queue)
+            if (
+                change_stream
+                if change_stream is not None
+                else settings.notification_source == "change_stream"
+            )
+            else None
+        )
+        self._wakeup = asyncio.Event()
+        self._reset()
+        self.rental_service.add_rental_listener(self)
+
+    def _reset(self) -> None:
+        """Forget all scheduled rentals; start() loads them again"""
+        self._heap: List[Tuple[datetime, str]] = []
+        self._due: Dict[str, datetime] = {}
+        self._loaded_until: Optional[datetime] = None
+        self._last_reconcile: Optional[datetime] = None
+        self._last_poll: Optional[datetime] = None
+        self._started_id = ObjectId.from_datetime(datetime.now(timezone.utc))
+        # Set by the first window load, see _load_window
+        self._last_seen_id: Optional[ObjectId] = None
+
+    def rental_created(self, rental_id: str, due_date: datetime) -> None:
+        """Schedule a new rental if it falls due inside the loaded window"""
+        if not self.running or self._loaded_until is None or due_date > self._loaded_until:
+            return  # picked up when the window reaches it
+        self._push(rental_id, due_date)
+
+    def rental_returned(self, rental_id: str) -> None:
+        """Forget a returned rental; its heap entry is skipped when popped"""
+        self._due.pop(rental_id, None)
+
+    async def resync(self) -> None:
+        """Reload the window and run a full sweep on the next iteration,
+        after changes may have been missed"""
+        self._loaded_until = None
+        self._last_reconcile = None
+        self._wakeup.set()
+
+    def _push(self, rental_id: str, due_date: datetime) -> None:
+        self._due[rental_id] = due_date
+        heapq.heappush(self._heap, (due_date, rental_id))
+        if self._heap[0] == (due_date, rental_id):
+            self._wakeup.set()
+
     async def start(self):
         """Start the notification scheduler"""
         self.running = True
+        self._reset()
         print("Notification scheduler started")
-        
+
+        # Started first: it replays changes since its last checkpoint, so
+        # nothing falls between the stream and the first window load (on
+        # the very first run the reconciliation sweeps cover the gap)
+        stream_task = (
+            asyncio.create_task(self._change_stream.run())
+            if self._change_stream
+            else None
+        )
+        try:
+            await self._run()
+        finally:
+            if stream_task:
+                stream_task.cancel()
+                try:
+                    await stream_task
+                except asyncio.CancelledError:
+                    pass
+            # Also reached when cancelled, e.g. after losing the leader lease
+            self.running = False
+
+    async def _run(self):
         while self.running:
             try:
-                await self.rental_service.check_and_send_notifications()
-                print(f"Notification check completed at {datetime.now()}")
-                
-                await asyncio.sleep(3600)
-                
+                now = datetime.now()
+                if (
+                    self._last_reconcile is None
+                    or now - self._last_reconcile >= self._reconcile_interval
+                ):
+                    await self.rental_service.check_and_send_notifications()
+                    self._last_reconcile = now
+                    print(f"Notification reconciliation completed at {datetime.now()}")
+
+                if (
+                    self._loaded_until is None
+                    or now + self._window / 2 >= self._loaded_until
+                ):
+                    await self._load_window(now + self._window)
+
+                if not self._change_stream and (
+                    self._last_poll is None or now - self._last_poll >= self._poll_interval
+                ):
+                    await self._load_new()
+                    self._last_poll = now
+
+                await self._fire_due(datetime.now())
+                await self._sleep_until_next()
+
             except Exception as e:
                 print(f"Error in notification scheduler: {e}")
                 await asyncio.sleep(60)  # Wait 1 minute before retrying
-    
+
+    async def _load_window(self, until: datetime) -> None:
+        """Add active rentals due up to `until` that are not loaded yet"""
+        loaded = 0
+        newest_id = None
+        async for document in self.rental_service.repository.iter_due_between(
+            self._loaded_until, until
+        ):
+            self._push(str(document["_id"]), document["due_date"])
+            loaded += 1
+            newest_id = max(newest_id or document["_id"], document["_id"])
+        self._loaded_until = until
+
+        if self._last_seen_id is None:
+            # Poll from right after the newest rental the first load saw, or
+            # from the start time if that is earlier. Rentals the load missed
+            # (still being inserted, or stamped by a process whose clock runs
+            # behind) are then polled as long as their id is above that;
+            # anything older is left to the reconciliation sweep
+            self._last_seen_id = min(newest_id or self._started_id, self._started_id)
+        if loaded:
+            print(f"Scheduled {loaded} rentals due before {until}")
+
+    async def _load_new(self) -> None:
+        """Add rentals created since the last poll (by any process) that
+        fall due inside the loaded window"""
+        async for document in self.rental_service.repository.iter_created_after(
+            self._last_seen_id, self._loaded_until
+        ):
+            self._push(str(document["_id"]), document["due_date"])
+            self._last_seen_id = document["_id"]
+
+    async def _fire_due(self, now: datetime) -> None:
+        """Notify every scheduled rental whose due date has passed"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_date, rental_id = heapq.heappop(self._heap)
+            if self._due.get(rental_id) == due_date:
+                del self._due[rental_id]
+                due.append((rental_id, due_date))
+
+        if due:
+            try:
+                await self.rental_service.notify_overdue(
+                    [rental_id for rental_id, _ in due]
+                )
+            except Exception:
+                # Reschedule them so the next iteration retries, unless they
+                # were returned or rescheduled in the meantime
+                for rental_id, due_date in due:
+                    if rental_id not in self._due:
+                        self._push(rental_id, due_date)
+                raise
+            print(f"Sent overdue notifications for {len(due)} rentals")
+
+    async def _sleep_until_next(self) -> None:
+        """Sleep until the next due rental (plus batch_delay), the next
+        window top-up, poll or reconciliation, or until woken by a new rental"""
+        wake_at = min(
+            self._loaded_until - self._window / 2,
+            self._last_reconcile + self._reconcile_interval,
+        )
+        if not self._change_stream:
+            wake_at = min(wake_at, self._last_poll + self._poll_interval)
+        if self._heap:
+            wake_at = min(wake_at, self._heap[0][0] + self._batch_delay)
+
+        self._wakeup.clear()
+        timeout = max((wake_at - datetime.now()).total_seconds(), 0)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
     async def stop(self):
         """Stop the notification scheduler"""
         self.running = False
-        print("Notification scheduler stopped")
\ No newline at end of file
+        self._wakeup.set()
+        print("Notification scheduler stopped")
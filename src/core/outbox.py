@@ -0,0 +1,151 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from src.api.models import OutboxModel, OutboxStatus
+from src.core.message_brokers.rabbitmq import AsyncRabbitMQQueue
+from src.core.config import get_settings
+
+settings = get_settings()
+
+
+class OutboxRepository:
+    """Messages stored in Mongo next to the state change that caused them"""
+
+    PENDING = {"status": OutboxStatus.PENDING}
+    OLDEST_FIRST = [("created_at", ASCENDING)]
+
+    async def add(
+        self, queue: str, messages: List[Tuple[str, Dict[str, Any]]], session=None
+    ) -> None:
+        """Store (message_id, payload) pairs for `queue`. Ids already in the
+        outbox are left untouched, so writing a message twice is harmless."""
+        if not messages:
+            return
+        now = datetime.now()
+        operations = [
+            UpdateOne(
+                {"_id": message_id},
+                {
+                    "$setOnInsert": {
+                        "queue": queue,
+                        "payload": payload,
+                        "status": OutboxStatus.PENDING,
+                        "created_at": now,
+                        "sent_at": None,
+                    }
+                },
+                upsert=True,
+            )
+            for message_id, payload in messages
+        ]
+        try:
+            await OutboxModel.get_motor_collection().bulk_write(
+                operations, ordered=False, session=session
+            )
+        except BulkWriteError as e:
+            # Two writers upserting the same id at once: one of them wins
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+
+    async def get_pending(self, limit: int) -> List[Dict[str, Any]]:
+        """Oldest pending messages first"""
+        cursor = OutboxModel.get_motor_collection().find(
+            self.PENDING, {"queue": 1, "payload": 1}, sort=self.OLDEST_FIRST, limit=limit
+        )
+        return await cursor.to_list(length=limit)
+
+    async def mark_sent(self, message_ids: List[str]) -> int:
+        result = await OutboxModel.get_motor_collection().update_many(
+            *self._mark_sent_update(message_ids)
+        )
+        return result.modified_count
+
+    def _mark_sent_update(self, message_ids: List[str]):
+        """Build the filter and update of mark_sent"""
+        return (
+            {"_id": {"$in": message_ids}},
+            {"$set": {"status": OutboxStatus.SENT, "sent_at": datetime.now()}},
+        )
+
+
+class OutboxRelay:
+    """Publishes pending outbox messages and marks them sent.
+
+    Messages are read in batches of batch_size, published through
+    confirm-mode AsyncRabbitMQQueue publishers and marked sent with one
+    update once the broker has confirmed the whole batch. If confirms don't
+    arrive within confirm_timeout the batch stays pending and is published
+    again, so delivery is at-least-once. Run a single relay at a time
+    (workers/outbox_relay_worker.py holds a lease for that).
+    """
+
+    def __init__(
+        self,
+        repository: Optional[OutboxRepository] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        confirm_timeout: Optional[float] = None,
+    ):
+        self.repository = repository or OutboxRepository()
+        self._batch_size = batch_size or settings.outbox_batch_size
+        self._poll_interval = poll_interval or settings.outbox_poll_interval
+        self._confirm_timeout = confirm_timeout or settings.outbox_confirm_timeout
+        self._queues: Dict[str, AsyncRabbitMQQueue] = {}
+        self.running = False
+
+    def _queue(self, name: str) -> AsyncRabbitMQQueue:
+        if name not in self._queues:
+            self._queues[name] = AsyncRabbitMQQueue(name)
+        return self._queues[name]
+
+    async def relay_batch(self) -> int:
+        """Publish one batch of pending messages; returns how many were sent"""
+        messages = await self.repository.get_pending(self._batch_size)
+        if not messages:
+            return 0
+
+        used = set()
+        for message in messages:
+            queue = self._queue(message["queue"])
+            used.add(queue)
+            await queue.publish_async(message["payload"])
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.flush() for queue in used)),
+                self._confirm_timeout,
+            )
+        except asyncio.TimeoutError:
+            print(f"Timed out waiting for confirms of {len(messages)} outbox messages")
+            return 0
+
+        await self.repository.mark_sent([message["_id"] for message in messages])
+        return len(messages)
+
+    async def run(self) -> None:
+        """Relay until stopped, polling when the outbox is drained"""
+        self.running = True
+        try:
+            while self.running:
+                try:
+                    relayed = await self.relay_batch()
+                except Exception as e:
+                    print(f"Error relaying outbox messages: {str(e)}")
+                    relayed = 0
+                if relayed < self._batch_size:
+                    await asyncio.sleep(self._poll_interval)
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Flush and close every publisher"""
+        for queue in self._queues.values():
+            await queue.stop()
+        self._queues = {}
+
+    async def stop(self) -> None:
+        self.running = False
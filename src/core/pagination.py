@@ -0,0 +1,27 @@
+import base64
+import json
+from typing import Any, Dict
+from bson import ObjectId
+
+from src.core.exceptions import BadRequestException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Encode the sort key values of the last returned item into an opaque cursor"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise BadRequestException("Invalid pagination cursor")
+
+    if not isinstance(values, dict) or not ObjectId.is_valid(values.get("id")):
+        raise BadRequestException("Invalid pagination cursor")
+    return values
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from src.api.models import BookRentalModel, RentalStatus, StreamCheckpointModel
+from src.core.message_brokers.abc import QueueABC
+from src.core.config import get_settings
+
+settings = get_settings()
+
+# Server error codes meaning the stored resume token can't be used any more
+CHANGE_STREAM_HISTORY_LOST = 286
+INVALID_RESUME_TOKEN = 260
+
+
+class RentalChangeStream:
+    """Tails the book_rentals change stream and forwards rental changes.
+
+    The listener's rental_created(rental_id, due_date) is called for every
+    inserted rental and every update that leaves a rental active (e.g. a
+    new due date), and rental_returned(rental_id) for rentals that stopped
+    being active or were deleted. When a rental is returned a
+    "book_available" event is published on the availability queue.
+
+    The resume token is saved every checkpoint_interval seconds and on
+    exit, so a restarted stream continues where it left off. If the oplog
+    no longer holds the saved position the stream starts from now and
+    calls the listener's resync().
+    """
+
+    def __init__(
+        self,
+        listener: Any,
+        availability_queue: Optional[QueueABC] = None,
+        name: str = "book_rentals",
+        checkpoint_interval: Optional[float] = None,
+    ):
+        self.listener = listener
+        self.availability_queue = availability_queue
+        self.name = name
+        self._checkpoint_interval = (
+            checkpoint_interval or settings.change_stream_checkpoint_interval
+        )
+        self._resume_token: Optional[Dict[str, Any]] = None
+        self._saved_token: Optional[Dict[str, Any]] = None
+
+    async def run(self) -> None:
+        """Follow the change stream until cancelled, reconnecting on errors"""
+        checkpoint = await StreamCheckpointModel.get(self.name)
+        self._resume_token = checkpoint.resume_token if checkpoint else None
+        self._saved_token = self._resume_token
+        try:
+            while True:
+                try:
+                    await self._follow()
+                except OperationFailure as e:
+                    if e.code in (CHANGE_STREAM_HISTORY_LOST, INVALID_RESUME_TOKEN):
+                        print(f"Change stream '{self.name}' lost its position, resyncing")
+                        self._resume_token = None
+                        await self.listener.resync()
+                    else:
+                        print(f"Error in change stream '{self.name}': {str(e)}")
+                        await asyncio.sleep(1)
+                except PyMongoError as e:
+                    print(f"Error in change stream '{self.name}': {str(e)}")
+                    await asyncio.sleep(1)
+        finally:
+            await self._save_checkpoint()
+
+    async def _follow(self) -> None:
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}
+        ]
+        last_saved = time.monotonic()
+        async with BookRentalModel.get_motor_collection().watch(
+            pipeline,
+            full_document="updateLookup",
+            resume_after=self._resume_token,
+            max_await_time_ms=1000,
+        ) as stream:
+            print(f"Following change stream '{self.name}'")
+            while stream.alive:
+                change = await stream.try_next()
+                if change is not None:
+                    await self._handle(change)
+                self._resume_token = stream.resume_token
+
+                if time.monotonic() - last_saved >= self._checkpoint_interval:
+                    await self._save_checkpoint()
+                    last_saved = time.monotonic()
+
+    async def _handle(self, change: Dict[str, Any]) -> None:
+        rental_id = str(change["documentKey"]["_id"])
+        document = change.get("fullDocument")
+        if change["operationType"] == "delete" or document is None:
+            self.listener.rental_returned(rental_id)
+            return
+
+        if document["status"] == RentalStatus.ACTIVE:
+            self.listener.rental_created(rental_id, document["due_date"])
+            return
+
+        self.listener.rental_returned(rental_id)
+        updated = change.get("updateDescription", {}).get("updatedFields", {})
+        if (
+            self.availability_queue is not None
+            and updated.get("status") == RentalStatus.RETURNED
+        ):
+            await self.availability_queue.publish_async(
+                {
+                    "type": "book_available",
+                    "rental_id": rental_id,
+                    "book_id": document["book_id"],
+                    "timestamp": datetime.now().isoformat(),
+                }
+            )
+
+    async def _save_checkpoint(self) -> None:
+        """Store the resume token if it moved since the last save"""
+        if self._resume_token is None or self._resume_token == self._saved_token:
+            return
+        try:
+            await StreamCheckpointModel.get_motor_collection().update_one(
+                {"_id": self.name},
+                {"$set": {"resume_token": self._resume_token, "updated_at": datetime.now()}},
+                upsert=True,
+            )
+            self._saved_token = self._resume_token
+        except PyMongoError as e:
+            print(f"Error saving change stream checkpoint '{self.name}': {str(e)}")
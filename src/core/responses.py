@@ -0,0 +1,87 @@
+import functools
+import inspect
+from typing import Any, Callable, Dict, List, Optional, get_args, get_origin
+
+from fastapi import Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _dto_class(response_model: Any) -> Optional[type]:
+    """The DTO class of a `Dto` or `List[Dto]` response model, else None"""
+    if inspect.isclass(response_model) and issubclass(response_model, BaseModel):
+        return response_model
+    if get_origin(response_model) in (list, List):
+        (item,) = get_args(response_model) or (None,)
+        if inspect.isclass(item) and issubclass(item, BaseModel):
+            return item
+    return None
+
+
+class DtoRoute(APIRoute):
+    """APIRoute that doesn't validate DTOs the service has just built.
+
+    FastAPI dumps whatever the endpoint returns, validates it against the
+    response_model and encodes the result again. When the endpoint returns
+    an instance of exactly the response model (or a list of exactly its
+    item model) there is nothing to check, so the value is encoded straight
+    to JSON by pydantic instead. Anything else (dicts, subclasses,
+    Responses) goes through FastAPI as usual.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        self._dto_class: Optional[type] = None
+        self._many = False
+        self._adapter: Optional[TypeAdapter] = None
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = self._wrap(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+        if (
+            self.response_model_include is None
+            and self.response_model_exclude is None
+            and self.response_model_by_alias
+            and not self.response_model_exclude_unset
+            and not self.response_model_exclude_defaults
+            and not self.response_model_exclude_none
+        ):
+            self._dto_class = _dto_class(self.response_model)
+        if self._dto_class is not None:
+            self._many = self._dto_class is not self.response_model
+            self._adapter = TypeAdapter(self.response_model)
+
+    def _wrap(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(endpoint)
+        async def serialize_dtos(**values: Any) -> Any:
+            result = await endpoint(**values)
+            if not self._is_exact_dto(result):
+                return result
+            return self._render(result, values)
+
+        return serialize_dtos
+
+    def _is_exact_dto(self, result: Any) -> bool:
+        if self._dto_class is None:
+            return False
+        if self._many:
+            return isinstance(result, list) and all(
+                type(item) is self._dto_class for item in result
+            )
+        return type(result) is self._dto_class
+
+    def _render(self, result: Any, values: Dict[str, Any]) -> Response:
+        response = Response(
+            content=self._adapter.dump_json(result, by_alias=True),
+            media_type=JSON_MEDIA_TYPE,
+        )
+        if self.status_code is not None:
+            response.status_code = self.status_code
+        # Headers/status the endpoint set on an injected Response
+        for value in values.values():
+            if isinstance(value, Response):
+                if value.status_code:
+                    response.status_code = value.status_code
+                response.headers.raw.extend(value.headers.raw)
+        return response
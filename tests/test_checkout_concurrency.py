@@ -0,0 +1,170 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from src.api.models import BookModel, BookRentalModel, PersonModel
+from src.api.modules.Book.BookDtos import BookCreateDto
+from src.api.modules.Book.CachedBookRepository import CachedBookRepository
+from src.api.modules.Book.InMemoryBookRepository import InMemoryBookRepository
+from src.api.modules.BookRental.BookRentalDtos import (
+    BookRentalBatchCreateDto,
+    BookRentalCreateDto,
+)
+from src.api.modules.BookRental.BookRentalRepository import BookRentalRepository
+from src.api.modules.BookRental.InMemoryBookRentalRepository import (
+    InMemoryBookRentalRepository,
+)
+from src.api.modules.Person.CachedPersonRepository import CachedPersonRepository
+from src.api.modules.Person.InMemoryPersonRepository import InMemoryPersonRepository
+from src.api.modules.Person.PersonDtos import PersonCreateDto
+from src.core.container import ServiceContainer
+from src.core.exceptions import ConflictException
+from src.core.message_brokers.memory import InMemoryQueue
+
+COPIES = 50
+CHECKOUTS = 500
+
+
+async def mongo_repositories():
+    """The repositories the app uses, on mongomock-motor: stock changes go
+    through the guarded find-one-and-update / update_one filters"""
+    await init_beanie(
+        database=AsyncMongoMockClient()["test"],
+        document_models=[BookModel, PersonModel, BookRentalModel],
+    )
+    return CachedBookRepository(), CachedPersonRepository(), BookRentalRepository()
+
+
+async def in_memory_repositories():
+    books = InMemoryBookRepository()
+    persons = InMemoryPersonRepository()
+    return books, persons, InMemoryBookRentalRepository(books, persons)
+
+
+@pytest.fixture(params=[mongo_repositories, in_memory_repositories], ids=["mongo", "in_memory"])
+def repositories(request):
+    return request.param
+
+
+class Library:
+    """One popular book and one reader, with the book's stock sampled after
+    every checkout and return"""
+
+    def __init__(self, container, book_id, person_id):
+        self.service = container.rental_service
+        self.books = container.book_repository
+        self.book_id = book_id
+        self.person_id = person_id
+        self.stock = []
+
+    @classmethod
+    async def create(cls, repositories):
+        books, persons, rentals = await repositories()
+        container = ServiceContainer(
+            books, persons, rentals, InMemoryQueue("book_rental_notifications")
+        )
+        book = await books.create(
+            BookCreateDto(
+                title="Popular",
+                description="Everyone wants it",
+                isbn="978-0000000000",
+                author="Someone",
+                available_copies=COPIES,
+                total_copies=COPIES,
+            )
+        )
+        person = await persons.create(
+            PersonCreateDto(
+                name="Reader",
+                age=30,
+                email="reader@example.com",
+                phone="+44 20 7946 0000",
+                address="London",
+            )
+        )
+        return cls(container, str(book.id), str(person.id))
+
+    async def available_copies(self) -> int:
+        return (await self.books.get_by_id(self.book_id)).available_copies
+
+    async def sample(self) -> None:
+        self.stock.append(await self.available_copies())
+
+    def rental(self) -> BookRentalCreateDto:
+        return BookRentalCreateDto(
+            book_id=self.book_id,
+            person_id=self.person_id,
+            due_date=datetime.now() + timedelta(days=14),
+        )
+
+    async def checkout(self) -> bool:
+        await asyncio.sleep(0)  # let every checkout start before any finishes
+        try:
+            await self.service.create_rental(self.rental())
+            return True
+        except ConflictException:
+            return False
+        finally:
+            await self.sample()
+
+    async def checkout_batch(self, size: int) -> int:
+        await asyncio.sleep(0)
+        result = await self.service.create_rentals_batch(
+            BookRentalBatchCreateDto(
+                person_id=self.person_id,
+                book_ids=[self.book_id] * size,
+                due_date=datetime.now() + timedelta(days=14),
+            )
+        )
+        await self.sample()
+        return result.succeeded
+
+    async def give_back(self, rental_id: str) -> None:
+        await asyncio.sleep(0)
+        await self.service.return_book(rental_id)
+        await self.sample()
+
+
+def test_parallel_checkouts_never_oversell(repositories):
+    async def run():
+        library = await Library.create(repositories)
+        results = await asyncio.gather(*(library.checkout() for _ in range(CHECKOUTS)))
+        assert sum(results) == COPIES
+        assert await library.available_copies() == 0
+        assert min(library.stock) >= 0
+
+    asyncio.run(run())
+
+
+def test_parallel_checkouts_and_returns_keep_stock_in_bounds(repositories):
+    async def run():
+        library = await Library.create(repositories)
+        rentals = [
+            await library.service.create_rental(library.rental()) for _ in range(COPIES)
+        ]
+
+        results = await asyncio.gather(
+            *(library.give_back(rental.id) for rental in rentals),
+            *(library.checkout() for _ in range(CHECKOUTS)),
+        )
+        checked_out = sum(result is True for result in results[COPIES:])
+        assert await library.available_copies() == COPIES - checked_out
+        assert all(0 <= stock <= COPIES for stock in library.stock)
+
+    asyncio.run(run())
+
+
+def test_parallel_batch_checkouts_never_oversell(repositories):
+    async def run():
+        library = await Library.create(repositories)
+        succeeded = await asyncio.gather(
+            *(library.checkout_batch(5) for _ in range(CHECKOUTS // 5))
+        )
+        assert sum(succeeded) == COPIES
+        assert await library.available_copies() == 0
+        assert min(library.stock) >= 0
+
+    asyncio.run(run())
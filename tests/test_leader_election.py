@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from src.api.models import LeaseModel
+from src.core.leader_election import LeaderElector
+
+TTL = 0.3
+HEARTBEAT = 0.05
+
+
+class Leadership:
+    """Records which elector's leader task is running"""
+
+    def __init__(self):
+        self.leaders = set()
+        self.history = []
+
+    def task(self, owner: str):
+        async def lead():
+            self.leaders.add(owner)
+            self.history.append(owner)
+            try:
+                await asyncio.Event().wait()
+            finally:
+                self.leaders.discard(owner)
+
+        return lead
+
+
+async def wait_for(condition, timeout=2.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def campaign(owner: str, leadership: Leadership):
+    elector = LeaderElector("scheduler", TTL, HEARTBEAT, owner=owner)
+    return elector, asyncio.create_task(elector.run(leadership.task(owner)))
+
+
+def run(test):
+    async def with_db():
+        await init_beanie(
+            database=AsyncMongoMockClient()["test"],
+            document_models=[LeaseModel],
+        )
+        await test()
+
+    asyncio.run(with_db())
+
+
+def test_standby_takes_over_after_clean_stop():
+    async def test():
+        leadership = Leadership()
+        first, first_run = await campaign("first", leadership)
+        await wait_for(lambda: leadership.leaders == {"first"})
+
+        second, second_run = await campaign("second", leadership)
+        await asyncio.sleep(TTL * 2)
+        assert leadership.leaders == {"first"}
+        assert not second.is_leader
+
+        await first.stop()
+        await first_run
+        await wait_for(lambda: leadership.leaders == {"second"})
+        assert leadership.history == ["first", "second"]
+
+        await second.stop()
+        await second_run
+
+    run(test)
+
+
+def test_standby_takes_over_expired_lease():
+    async def test():
+        leadership = Leadership()
+        first, first_run = await campaign("first", leadership)
+        await wait_for(lambda: leadership.leaders == {"first"})
+
+        # The leader dies without releasing: its lease stays until it expires
+        first_run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first_run
+        assert await LeaseModel.get_motor_collection().find_one({"owner": "first"})
+
+        second, second_run = await campaign("second", leadership)
+        await asyncio.sleep(TTL / 2)
+        assert leadership.leaders == set()
+
+        await wait_for(lambda: leadership.leaders == {"second"}, timeout=TTL * 4)
+        assert not await first.try_acquire()
+
+        await second.stop()
+        await second_run
+
+    run(test)
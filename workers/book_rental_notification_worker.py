@@ -7,14 +7,14 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.core.config import get_settings
-from src.core.message_brokers.rabbitmq import RabbitMQQueue
+from src.core.message_brokers.rabbitmq import AsyncRabbitMQQueue
 from src.core.email.email_queue_service import EmailQueueService
 
 
 class BookRentalNotificationWorker:
     def __init__(self):
         self.settings = get_settings()
-        self.notification_queue = RabbitMQQueue("book_rental_notifications")
+        self.notification_queue = AsyncRabbitMQQueue("book_rental_notifications")
         self.email_service = EmailQueueService("events_email_queue")
         self._shutdown = False
         self._consuming_task = None
@@ -26,6 +26,7 @@ class BookRentalNotificationWorker:
             loop.add_signal_handler(sig, self._signal_handler)
 
         try:
+            await self.email_service.queue.start()
             self._consuming_task = asyncio.create_task(self._start_consuming())
             await self._consuming_task
         except asyncio.CancelledError:
@@ -41,6 +42,9 @@ class BookRentalNotificationWorker:
             try:
                 print(f"Processing notification: {message}")
 
+                if message.get("type", "overdue") != "overdue":
+                    return
+
                 person_email = message.get("person_email")
                 person_name = message.get("person_name")
                 book_title = message.get("book_title")
@@ -74,6 +78,7 @@ class BookRentalNotificationWorker:
                 "book_title": book_title,
                 "due_date": due_date,
             },
+            batch=True,
         )
 
     def _signal_handler(self):
@@ -94,6 +99,8 @@ class BookRentalNotificationWorker:
         if hasattr(self.notification_queue, "close"):
             self.notification_queue.close()
 
+        await self.email_service.queue.stop()
+
 
 async def main():
     worker = BookRentalNotificationWorker()
@@ -56,6 +56,8 @@ class EmailWorker:
         ):
             self.email_service.queue.close()
 
+        await self.email_service.aclose()
+
 
 async def main():
     worker = EmailWorker()
@@ -0,0 +1,89 @@
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.config import get_settings
+from src.core.db import init_db
+from src.core.leader_election import LeaderElector
+from src.core.message_brokers.rabbitmq import AsyncRabbitMQQueue
+from src.core.notification_scheduler import NotificationScheduler
+from src.api.modules.BookRental.BookRentalService import BookRentalService
+
+
+class NotificationSchedulerWorker:
+    """Runs the overdue notification scheduler outside the API.
+
+    Several instances can run side by side: they share the
+    notification_scheduler lease with any API process started with
+    NOTIFICATION_SCHEDULER_MODE=embedded, so only one schedules at a time.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.notification_queue = AsyncRabbitMQQueue("book_rental_notifications")
+        self.elector = LeaderElector("notification_scheduler")
+        self.scheduler = None
+        self._shutdown = False
+        self._election_task = None
+
+    async def start(self):
+        print("Starting notification scheduler worker...")
+        loop = asyncio.get_event_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._signal_handler)
+
+        try:
+            await init_db()
+            await self.notification_queue.start()
+            self.scheduler = NotificationScheduler(
+                BookRentalService(notification_queue=self.notification_queue)
+            )
+            self._election_task = asyncio.create_task(
+                self.elector.run(self.scheduler.start)
+            )
+            await self._election_task
+        except asyncio.CancelledError:
+            print("Notification scheduler worker cancelled")
+        except Exception as e:
+            print(f"Error in notification scheduler worker: {e}")
+            raise
+
+    def _signal_handler(self):
+        print("Received shutdown signal, stopping notification scheduler worker...")
+        self._shutdown = True
+        if self._election_task and not self._election_task.done():
+            self._election_task.cancel()
+
+    async def stop(self):
+        print("Stopping notification scheduler worker...")
+        if self.scheduler:
+            await self.scheduler.stop()
+        await self.elector.stop()
+
+        if self._election_task and not self._election_task.done():
+            self._election_task.cancel()
+            try:
+                await self._election_task
+            except asyncio.CancelledError:
+                pass
+
+        await self.notification_queue.stop()
+
+
+async def main():
+    worker = NotificationSchedulerWorker()
+
+    try:
+        await worker.start()
+    except KeyboardInterrupt:
+        print("\nReceived interrupt signal")
+    finally:
+        await worker.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.config import get_settings
+from src.core.db import init_db
+from src.core.leader_election import LeaderElector
+from src.core.outbox import OutboxRelay
+
+
+class OutboxRelayWorker:
+    """Publishes messages written to the outbox collection.
+
+    Several instances can run side by side; they share the outbox_relay
+    lease so only one relays at a time.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.relay = OutboxRelay()
+        self.elector = LeaderElector("outbox_relay")
+        self._shutdown = False
+        self._election_task = None
+
+    async def start(self):
+        print("Starting outbox relay worker...")
+        loop = asyncio.get_event_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._signal_handler)
+
+        try:
+            await init_db()
+            self._election_task = asyncio.create_task(self.elector.run(self.relay.run))
+            await self._election_task
+        except asyncio.CancelledError:
+            print("Outbox relay worker cancelled")
+        except Exception as e:
+            print(f"Error in outbox relay worker: {e}")
+            raise
+
+    def _signal_handler(self):
+        print("Received shutdown signal, stopping outbox relay worker...")
+        self._shutdown = True
+        if self._election_task and not self._election_task.done():
+            self._election_task.cancel()
+
+    async def stop(self):
+        print("Stopping outbox relay worker...")
+        await self.relay.stop()
+        await self.elector.stop()
+
+        if self._election_task and not self._election_task.done():
+            self._election_task.cancel()
+            try:
+                await self._election_task
+            except asyncio.CancelledError:
+                pass
+
+
+async def main():
+    worker = OutboxRelayWorker()
+
+    try:
+        await worker.start()
+    except KeyboardInterrupt:
+        print("\nReceived interrupt signal")
+    finally:
+        await worker.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())